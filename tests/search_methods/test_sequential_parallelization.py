@@ -1,5 +1,6 @@
 from tiralib.search_methods.sequential_parallelization import (
     parallelize_first_legal_outermost,
+    parallelize_first_legal_ranked,
 )
 from tiralib.tiramisu.tiramisu_actions.parallelization import Parallelization
 from tiralib.config import BaseConfig
@@ -14,3 +15,13 @@ def test_sequential_parallelization():
     optim = schedule.optims_list[0]
     assert isinstance(optim, Parallelization)
     assert optim.iterator_id == ("comp02", 0)
+
+
+def test_parallelize_first_legal_ranked():
+    BaseConfig.init()
+    test_program = benchmark_program_test_sample()
+
+    schedule = parallelize_first_legal_ranked(test_program, nbr_cores=64)
+    optim = schedule.optims_list[0]
+    assert isinstance(optim, Parallelization)
+    assert optim.iterator_id == ("comp02", 0)
@@ -0,0 +1,127 @@
+import tests.utils as test_utils
+from tiralib.tiramisu.action_space import ActionSpace
+from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.tiramisu_actions import (
+    Distribution,
+    Fusion,
+    Interchange,
+    Parallelization,
+    Reversal,
+    Skewing,
+    Tiling2D,
+    Tiling3D,
+    TilingGeneral,
+    TiramisuActionType,
+    Unrolling,
+    Vectorization,
+)
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+
+def _schedule_of_tree(tree: TiramisuTree) -> Schedule:
+    schedule = Schedule()
+    schedule.tree = tree
+    return schedule
+
+
+def _as_set(candidates) -> set:
+    return {tuple(candidate) for candidate in candidates}
+
+
+def test_enumerate():
+    tree = test_utils.tree_test_sample()
+    action_space = ActionSpace.enumerate(_schedule_of_tree(tree))
+
+    assert len(action_space) == len(action_space.offsets) - 1
+    assert action_space.count(TiramisuActionType.EXPANSION) == 0
+    assert action_space.get_candidates(TiramisuActionType.UNROLLING) == [
+        [("comp01", 1)],
+        [("comp03", 3)],
+        [("comp04", 3)],
+    ]
+
+    row = action_space.get_rows(TiramisuActionType.TILING_2D)[0]
+    assert action_space.get_type(row) == TiramisuActionType.TILING_2D
+    assert action_space.get_root(row) == ("comp01", 0)
+    assert action_space.get_operands(row) == [("comp03", 1), ("comp03", 2)]
+
+
+def test_enumerate_matches_get_candidates():
+    for tree in [
+        test_utils.tree_test_sample(),
+        test_utils.tree_test_sample_2(),
+        test_utils.fusion_sample().tree,
+    ]:
+        action_space = ActionSpace.enumerate(_schedule_of_tree(tree))
+
+        for action_type, action_class in [
+            (TiramisuActionType.INTERCHANGE, Interchange),
+            (TiramisuActionType.SKEWING, Skewing),
+            (TiramisuActionType.TILING_2D, Tiling2D),
+            (TiramisuActionType.TILING_3D, Tiling3D),
+            (TiramisuActionType.TILING_GENERAL, TilingGeneral),
+            (TiramisuActionType.PARALLELIZATION, Parallelization),
+        ]:
+            candidates = [
+                candidate
+                for root_candidates in action_class.get_candidates(tree).values()
+                for candidate in root_candidates
+            ]
+            assert _as_set(action_space.get_candidates(action_type)) == _as_set(
+                candidates
+            )
+
+        reversal_candidates = [
+            (candidate,)
+            for root_candidates in Reversal.get_candidates(tree).values()
+            for candidate in root_candidates
+        ]
+        assert _as_set(action_space.get_candidates(TiramisuActionType.REVERSAL)) == set(
+            reversal_candidates
+        )
+        assert _as_set(action_space.get_candidates(TiramisuActionType.UNROLLING)) == {
+            (candidate,) for candidate in Unrolling.get_candidates(tree)
+        }
+        assert _as_set(
+            action_space.get_candidates(TiramisuActionType.VECTORIZATION)
+        ) == {(candidate,) for candidate in Vectorization.get_candidates(tree)}
+        assert _as_set(
+            action_space.get_candidates(TiramisuActionType.DISTRIBUTION)
+        ) == {(candidate,) for candidate in Distribution.get_candidates(tree)}
+        assert _as_set(
+            action_space.get_candidates(TiramisuActionType.FUSION)
+        ) == _as_set(Fusion.get_candidates(tree))
+
+
+def test_enumerate_action_types():
+    tree = test_utils.tree_test_sample()
+    action_space = ActionSpace.enumerate(
+        _schedule_of_tree(tree),
+        [TiramisuActionType.INTERCHANGE, TiramisuActionType.PARALLELIZATION],
+    )
+
+    assert set(action_space.action_types.tolist()) == {
+        TiramisuActionType.INTERCHANGE.value,
+        TiramisuActionType.PARALLELIZATION.value,
+    }
+
+
+def test_enumerate_many_loops():
+    # 20 roots with 4 nests of 4 loops each
+    isl_ast = []
+    for root in range(20):
+        isl_ast.append("0|iterator|c0|0|c0 <= 7|1")
+        for nest in range(4):
+            isl_ast.append("1|iterator|c1|0|c1 <= 7|1")
+            for level in range(2, 5):
+                isl_ast.append(f"{level}|iterator|c{level}|0|c{level} <= 7|1")
+            isl_ast.append(f"5|computation|comp{root}_{nest}")
+    tree = TiramisuTree.from_isl_ast_string_list(isl_ast)
+
+    action_space = ActionSpace.enumerate(_schedule_of_tree(tree))
+
+    assert len(tree.iterators) == 340
+    assert action_space.count(TiramisuActionType.REVERSAL) == 340
+    assert action_space.count(TiramisuActionType.UNROLLING) == 80
+    # roots pairs and, in every root, pairs of loops of the same level
+    assert action_space.count(TiramisuActionType.FUSION) == 190 + 20 * 4 * 6
@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+import tests.utils as test_utils
+from tiralib.tiramisu.affine_bounds import (
+    AffineExpression,
+    AffineParsingError,
+    TripCountEstimator,
+)
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+
+def test_parse():
+    expression = AffineExpression.parse("2*i + j - (N - 1)")
+    assert expression.coefficients == {"i": 2, "j": 1, "N": -1}
+    assert expression.constant == 1
+    assert expression.evaluate({"i": 1, "j": 2, "N": 10}) == -5
+
+    assert AffineExpression.parse(32).is_constant()
+    assert AffineExpression.parse("-c0 + 31") == AffineExpression({"c0": -1}, 31)
+
+    with pytest.raises(AffineParsingError):
+        AffineExpression.parse("i * j")
+    with pytest.raises(AffineParsingError):
+        AffineExpression.parse("i +")
+
+
+def test_parse_bound():
+    kind, pieces = AffineExpression.parse_bound("min(255, c0 + 31)")
+    assert kind == "min"
+    assert pieces == [AffineExpression(constant=255), AffineExpression({"c0": 1}, 31)]
+
+    kind, pieces = AffineExpression.parse_bound("N - 1")
+    assert kind is None
+    assert pieces == [AffineExpression({"N": 1}, -1)]
+
+
+def test_trip_counts_from_isl():
+    tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c0|0|c0 <= 9|1",
+            "1|iterator|c1|0|c1 <= c0|1",
+            "2|computation|comp00",
+            "0|iterator|c0|0|c0 <= 255|32",
+            "1|iterator|c2|c0|c2 <= min(255, c0 + 31)|1",
+            "2|computation|comp01",
+            "0|iterator|i|0|i <= N - 1|1",
+            "1|computation|comp02",
+        ]
+    )
+
+    loop_trip_counts = TripCountEstimator.get_loop_trip_counts(tree)
+    assert loop_trip_counts[("comp00", 1)] == 5.5
+    assert loop_trip_counts[("comp01", 0)] == 8
+    assert loop_trip_counts[("comp01", 1)] == 32
+    assert math.isnan(loop_trip_counts[("comp02", 0)])
+
+    assert TripCountEstimator.get_computation_trip_counts(tree, {"N": 100}) == {
+        "comp00": 55,
+        "comp01": 256,
+        "comp02": 100,
+    }
+
+
+def test_trip_counts_from_annotations():
+    tree = test_utils.tree_test_sample()
+
+    computation_trip_counts = TripCountEstimator.get_computation_trip_counts(tree)
+    assert computation_trip_counts["comp01"] == 256 * 256
+    assert computation_trip_counts["comp03"] == 256 * 256 * 10 * 256
@@ -0,0 +1,76 @@
+import numpy as np
+
+import tests.utils as test_utils
+from tiralib.tiramisu.dependence_analysis import DependenceAnalysis
+from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.schedule_parser import ScheduleParser
+from tiralib.tiramisu.tiramisu_actions.interchange import Interchange
+from tiralib.tiramisu.tiramisu_actions.parallelization import Parallelization
+from tiralib.tiramisu.tiramisu_actions.reversal import Reversal
+from tiralib.tiramisu.tiramisu_program import TiramisuProgram
+
+
+def _load_program(name: str) -> TiramisuProgram:
+    data, cpps = test_utils.load_test_data()
+    return TiramisuProgram.from_dict(name, data[name], cpps[name])
+
+
+def _schedule_of_actions(program: TiramisuProgram, sched_str: str) -> Schedule:
+    schedule = Schedule()
+    schedule.tree = program.tree
+    schedule.optims_list = ScheduleParser.parse(sched_str)
+    return schedule
+
+
+def test_from_annotations():
+    # comp00 reads and writes buf00[i1] for every i0, a reduction over i0
+    program = _load_program("function552581")
+    analysis = DependenceAnalysis.from_annotations(program.annotations)
+
+    assert analysis.computations == ["comp00"]
+    assert analysis.depth == 2
+    np.testing.assert_array_equal(analysis.distances, [[1, 0]])
+
+    # the 3rd loop is not in the written indices: reduction samples
+    program = _load_program("function550013")
+    analysis = DependenceAnalysis.from_annotations(program.annotations)
+    assert [0, 0, 1] in analysis.distances.tolist()
+
+
+def test_get_illegal_candidates_mask():
+    program = _load_program("function552581")
+    analysis = program.get_dependence_analysis()
+    assert program.get_dependence_analysis() is analysis
+
+    schedule = Schedule(program)
+    candidates = [
+        Parallelization([("comp00", 0)]),
+        Parallelization([("comp00", 1)]),
+        Reversal([("comp00", 0)]),
+        Reversal([("comp00", 1)]),
+        Interchange([("comp00", 0), ("comp00", 1)]),
+    ]
+
+    mask = analysis.get_illegal_candidates_mask(schedule, candidates)
+    assert mask.tolist() == [True, False, True, False, False]
+    assert analysis.filter_candidates(schedule, candidates) == [
+        candidates[1],
+        candidates[3],
+        candidates[4],
+    ]
+
+
+def test_is_certainly_illegal():
+    # no legal schedule of the dataset is rejected
+    data, _ = test_utils.load_test_data()
+    nbr_rejected = 0
+    for name in data:
+        program = _load_program(name)
+        analysis = program.get_dependence_analysis()
+        for sched_str, legality in data[name]["schedules_legality"].items():
+            schedule = _schedule_of_actions(program, sched_str)
+            if analysis.is_certainly_illegal(schedule):
+                assert not legality, sched_str
+                nbr_rejected += 1
+
+    assert nbr_rejected > 0
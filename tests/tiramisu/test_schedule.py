@@ -1,7 +1,10 @@
 import tests.utils as test_utils
 from tiralib.tiramisu import tiramisu_actions
 from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.compiling_service import CompilingService
+from tiralib.tiramisu.tiramisu_actions.matrix import MatrixTransform
 from tiralib.tiramisu.tiramisu_actions.parallelization import Parallelization
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 from tiralib.config import BaseConfig
 from tests.utils import benchmark_program_test_sample
 
@@ -203,3 +206,173 @@ def test_from_sched_str():
 
     for idx, optim in enumerate(schedule.optims_list):
         assert optim == new_schedule.optims_list[idx]
+
+
+def test_deferred_tree_updates():
+    BaseConfig.init()
+    test_program = test_utils.tiling_2d_sample()
+
+    schedule = Schedule(test_program, defer_tree_updates=True)
+    assert schedule.tree
+    assert not schedule.tree_is_dirty
+
+    schedule.add_optimizations(
+        [tiramisu_actions.Tiling2D([("comp00", 0), ("comp00", 1), 32, 32])]
+    )
+
+    assert len(schedule.optims_list) == 1
+    assert schedule.tree_is_dirty
+
+    schedule = Schedule(test_program)
+    schedule.add_optimizations(
+        [tiramisu_actions.Tiling2D([("comp00", 0), ("comp00", 1), 32, 32])],
+        defer_tree_updates=True,
+    )
+
+    assert schedule.tree_is_dirty
+    assert not schedule.defer_tree_updates
+
+
+def test_canonical():
+    BaseConfig.init()
+    test_program = test_utils.interchange_example()
+
+    schedule = Schedule(test_program)
+    schedule.add_optimizations(
+        [
+            tiramisu_actions.Reversal([("comp00", 1)]),
+            tiramisu_actions.Reversal([("comp00", 1)]),
+            tiramisu_actions.Interchange([("comp00", 0), ("comp00", 1)]),
+            tiramisu_actions.Interchange([("comp00", 1), ("comp00", 0)]),
+            tiramisu_actions.Unrolling([("comp00", 2), 4]),
+            tiramisu_actions.Parallelization([("comp00", 0)]),
+        ]
+    )
+
+    canonical = schedule.canonical()
+
+    assert str(canonical) == ("P(L0,comps=['comp00'])|U(L2,4,comps=['comp00'])")
+    assert len(schedule) == 6
+
+    other = Schedule(test_program)
+    other.add_optimizations(
+        [
+            tiramisu_actions.Parallelization([("comp00", 0)]),
+            tiramisu_actions.Unrolling([("comp00", 2), 4]),
+        ]
+    )
+
+    assert other.canonical_hash() == schedule.canonical_hash()
+    assert other.canonical_hash() == canonical.canonical_hash()
+
+    # the computations resolved from the tree are hashed, not the given ones
+    explicit = Schedule(test_program)
+    explicit.add_optimizations(
+        [
+            tiramisu_actions.Parallelization([("comp00", 0)], comps=["comp00"]),
+            tiramisu_actions.Unrolling([("comp00", 2), 4], comps=["comp00"]),
+        ]
+    )
+
+    assert explicit.canonical_hash() == other.canonical_hash()
+
+    different = Schedule(test_program)
+    different.add_optimizations(
+        [
+            tiramisu_actions.Interchange([("comp00", 0), ("comp00", 1)]),
+            tiramisu_actions.Parallelization([("comp00", 0)]),
+        ]
+    )
+
+    assert different.canonical_hash() != schedule.canonical_hash()
+    assert Schedule.deduplicate([schedule, different, other]) == [
+        schedule,
+        different,
+    ]
+
+
+def test_compose_unimodular_actions():
+    BaseConfig.init()
+    test_program = test_utils.interchange_example()
+
+    schedule = Schedule(test_program)
+    schedule.add_optimizations(
+        [
+            tiramisu_actions.Interchange([("comp00", 1), ("comp00", 2)]),
+            tiramisu_actions.Reversal([("comp00", 0)]),
+            tiramisu_actions.Skewing([("comp00", 0), ("comp00", 1), 1, 2]),
+            tiramisu_actions.Parallelization([("comp00", 0)]),
+        ]
+    )
+
+    composed = schedule.compose_unimodular_actions()
+
+    # the skewing is left to Tiramisu and ends the run
+    assert len(composed) == 3
+    assert composed.optims_list[0].is_matrix()
+    assert (
+        composed.optims_list[0].tiramisu_optim_str
+        == "comp00.matrix_transform({{-1,0,0},{0,0,1},{0,1,0}});"
+    )
+    assert composed.optims_list[0].decompose() == schedule.optims_list[:2]
+    assert composed.optims_list[1:] == schedule.optims_list[2:]
+
+
+def test_compose_unimodular_actions_equivalence():
+    BaseConfig.init()
+    test_program = test_utils.interchange_example()
+
+    schedule = Schedule(test_program)
+    schedule.add_optimizations(
+        [
+            tiramisu_actions.Interchange([("comp00", 1), ("comp00", 2)]),
+            tiramisu_actions.Reversal([("comp00", 0)]),
+        ]
+    )
+    composed = schedule.compose_unimodular_actions()
+    assert composed.optims_list[0].is_matrix()
+
+    # the composed schedule generates the same loop nest
+    trees = [
+        TiramisuTree.from_isl_ast_string_list(
+            CompilingService.compile_isl_ast_tree(test_program, sched).split("\n")
+        )
+        for sched in (schedule, composed)
+    ]
+    assert _loop_bounds(trees[0]) == _loop_bounds(trees[1])
+    assert composed.is_legal() == schedule.is_legal()
+
+
+def _loop_bounds(tree: TiramisuTree) -> dict:
+    # the bounds of the loops around every computation, outermost first
+    bounds = {}
+    for comp in tree.computations:
+        node = tree.get_iterator_of_computation(comp)
+        comp_bounds = []
+        while node is not None:
+            comp_bounds.insert(0, (node.lower_bound, node.upper_bound))
+            parent = node.parent_iterator
+            node = tree.iterators[parent] if parent is not None else None
+        bounds[comp] = comp_bounds
+    return bounds
+
+
+def test_get_function_server():
+    BaseConfig.init()
+    test_program = test_utils.unrolling_sample()
+    schedule = Schedule(test_program)
+    assert schedule.get_function_server() is None
+
+    server = object()
+    test_program.server = server
+    schedule.add_optimizations([Parallelization([("comp00", 0)])])
+    assert schedule.get_function_server() is server
+
+    # the parser of the server does not support vectorizations
+    schedule.add_optimizations([tiramisu_actions.Vectorization([("comp00", 1), 8])])
+    assert schedule.get_function_server() is None
+
+    # nor matrix transforms
+    schedule = Schedule(test_program)
+    schedule.add_optimizations([MatrixTransform([0, 1, 1, 0], ["comp00"])])
+    assert schedule.get_function_server() is None
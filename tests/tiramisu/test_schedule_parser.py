@@ -0,0 +1,119 @@
+import pytest
+
+import tests.utils as test_utils
+from tiralib.config import BaseConfig
+from tiralib.tiramisu import tiramisu_actions
+from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.schedule_parser import ScheduleParser, ScheduleParsingError
+
+
+def test_tokenize():
+    tokens = ScheduleParser.tokenize("U(L12,-4,comps=['comp00'])")
+    assert tokens == [
+        ("name", "U"),
+        ("punct", "("),
+        ("loop", 12),
+        ("punct", ","),
+        ("int", -4),
+        ("punct", ","),
+        ("name", "comps"),
+        ("punct", "="),
+        ("punct", "["),
+        ("string", "comp00"),
+        ("punct", "]"),
+        ("punct", ")"),
+        ("end", None),
+    ]
+
+
+def test_parse_all_action_types():
+    actions = ScheduleParser.parse(
+        "P(L0,comps=['A_hat'])"
+        "|U(L1,4,comps=['x'])"
+        "|V(L1,8,comps=['x'])"
+        "|I(L0,L1,comps=['x_temp'])"
+        "|R(L0,comps=['x'])"
+        "|S(L0,L1,1,-2,comps=['x_temp'])"
+        "|T2(L0,L1,4,8,comps=['w'])"
+        "|T3(L0,L1,L2,4,4,4,comps=['comp00'])"
+        "|TG(L1,L2,L2,10,5,2,comps=['R_up_init', 'R_up', 'A_out'])"
+        "|F(L0,comps=['A_hat', 'x_temp'])"
+        "|D(L0,comps=[x],distribution=[['x', 'w'], ['y']])"
+        "|E(comps=['comp00'])"
+        "|M([1, 0, 0, 1],comps=['comp00'])"
+    )
+
+    assert actions == [
+        tiramisu_actions.Parallelization([("A_hat", 0)]),
+        tiramisu_actions.Unrolling([("x", 1), 4]),
+        tiramisu_actions.Vectorization([("x", 1), 8]),
+        tiramisu_actions.Interchange([("x_temp", 0), ("x_temp", 1)]),
+        tiramisu_actions.Reversal([("x", 0)]),
+        tiramisu_actions.Skewing([("x_temp", 0), ("x_temp", 1), 1, -2]),
+        tiramisu_actions.Tiling2D([("w", 0), ("w", 1), 4, 8]),
+        tiramisu_actions.Tiling3D(
+            [("comp00", 0), ("comp00", 1), ("comp00", 2), 4, 4, 4]
+        ),
+        tiramisu_actions.TilingGeneral(
+            [("R_up_init", 1), ("R_up", 2), ("A_out", 2), 10, 5, 2],
+            comps=["R_up_init", "R_up", "A_out"],
+        ),
+        tiramisu_actions.Fusion([("A_hat", 0), ("x_temp", 0)]),
+        tiramisu_actions.Distribution([("x", 0)], [["x", "w"], ["y"]]),
+        tiramisu_actions.Expansion(["comp00"]),
+        tiramisu_actions.MatrixTransform([1, 0, 0, 1], ["comp00"]),
+    ]
+
+
+def test_parse_legacy_format():
+    actions = ScheduleParser.parse("{comp00}:S(L0,L1,1,2)I(L0,L1)T2(L1,L0,32,32)")
+
+    assert actions == [
+        tiramisu_actions.Skewing([("comp00", 0), ("comp00", 1), 1, 2]),
+        tiramisu_actions.Interchange([("comp00", 0), ("comp00", 1)]),
+        tiramisu_actions.Tiling2D([("comp00", 1), ("comp00", 0), 32, 32]),
+    ]
+    assert ScheduleParser.parse("{comp00}:") == []
+
+
+def test_parse_dataset_schedules():
+    data, _ = test_utils.load_test_data()
+
+    for function in data.values():
+        for sched_str in function["schedules_legality"]:
+            actions = ScheduleParser.parse(sched_str)
+            assert len(actions) == sched_str.count("(")
+
+
+def test_parse_errors():
+    with pytest.raises(ScheduleParsingError):
+        ScheduleParser.parse("P(L0,comps=['comp00']")
+    with pytest.raises(ScheduleParsingError):
+        ScheduleParser.parse("X(L0,comps=['comp00'])")
+    with pytest.raises(ScheduleParsingError):
+        ScheduleParser.parse("P(L0)")
+    with pytest.raises(ScheduleParsingError):
+        ScheduleParser.parse("I(L0,comps=['comp00'])")
+
+
+def test_from_sched_strs():
+    BaseConfig.init()
+    test_program = test_utils.interchange_example()
+
+    sched_strs = [
+        "{comp00}:I(L0,L1)",
+        "{comp00}:I(L0,L1)P(L0)",
+        "{comp00}:R(L2)U(L2,4)",
+    ]
+    schedules = Schedule.from_sched_strs(sched_strs, test_program)
+
+    assert [str(schedule) for schedule in schedules] == [
+        "I(L0,L1,comps=['comp00'])",
+        "I(L0,L1,comps=['comp00'])|P(L0,comps=['comp00'])",
+        "R(L2,comps=['comp00'])|U(L2,4,comps=['comp00'])",
+    ]
+
+    for schedule in schedules:
+        assert Schedule.from_sched_str(str(schedule), test_program).optims_list == (
+            schedule.optims_list
+        )
@@ -0,0 +1,81 @@
+import tests.utils as test_utils
+from tiralib.config import BaseConfig
+from tiralib.tiramisu.compiling_service import CompilingService
+from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.skewing_solver_cache import SkewingSolverCache
+from tiralib.tiramisu.tiramisu_actions.interchange import Interchange
+from tiralib.tiramisu.tiramisu_actions.skewing import Skewing
+
+
+def _count_solver_calls(monkeypatch):
+    calls = []
+
+    def call_skewing_solver(schedule, loop_levels, comps_skewed_loops):
+        calls.append(tuple(loop_levels))
+        return None if loop_levels[0] == 1 else (1, loop_levels[0] + 1)
+
+    monkeypatch.setattr(CompilingService, "call_skewing_solver", call_skewing_solver)
+    return calls
+
+
+def test_get_factors(monkeypatch):
+    BaseConfig.init()
+    calls = _count_solver_calls(monkeypatch)
+    cache = SkewingSolverCache(max_size=2)
+    sample = test_utils.skewing_example()
+
+    schedule = Schedule(sample)
+    assert Skewing.get_factors(schedule, [0, 1], ["comp00"], cache) == (1, 1)
+    assert Skewing.get_factors(Schedule(sample), [0, 1], ["comp00"], cache) == (1, 1)
+    # queries without a solution are cached as well
+    assert Skewing.get_factors(schedule, [1, 2], ["comp00"], cache) is None
+    assert Skewing.get_factors(schedule, [1, 2], ["comp00"], cache) is None
+    assert calls == [(0, 1), (1, 2)]
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # the key depends on the schedule the loops are skewed after
+    schedule.add_optimizations([Interchange([("comp00", 0), ("comp00", 1)])])
+    assert Skewing.get_factors(schedule, [0, 1], ["comp00"], cache) == (1, 1)
+    assert calls == [(0, 1), (1, 2), (0, 1)]
+    # the least recently used result was dropped
+    assert len(cache) == 2
+    assert not cache.lookup(cache.get_key(Schedule(sample), [0, 1], ["comp00"]))[0]
+
+
+def test_persistent_store(monkeypatch, tmp_path):
+    BaseConfig.init()
+    calls = _count_solver_calls(monkeypatch)
+    store_path = str(tmp_path / "skewing.sqlite")
+    sample = test_utils.skewing_example()
+
+    cache = SkewingSolverCache(store_path=store_path)
+    assert cache.get_factors(Schedule(sample), [0, 1], ["comp00"]) == (1, 1)
+    assert cache.get_factors(Schedule(sample), [1, 2], ["comp00"]) is None
+    cache.close()
+
+    cache = SkewingSolverCache(store_path=store_path)
+    assert cache.get_factors(Schedule(sample), [0, 1], ["comp00"]) == (1, 1)
+    assert cache.get_factors(Schedule(sample), [1, 2], ["comp00"]) is None
+    assert len(calls) == 2
+    assert cache.hits == 2
+    cache.close()
+
+
+def test_prefetch_factors(monkeypatch):
+    BaseConfig.init()
+    calls = _count_solver_calls(monkeypatch)
+    cache = SkewingSolverCache()
+    sample = test_utils.skewing_example()
+    schedule = Schedule(sample)
+
+    candidates = Skewing.get_candidates(sample.tree)[("comp00", 0)]
+    factors = Skewing.prefetch_factors(schedule, candidates, cache, max_workers=2)
+    assert factors == {
+        (("comp00", 0), ("comp00", 1)): (1, 1),
+        (("comp00", 1), ("comp00", 2)): None,
+    }
+    assert sorted(calls) == [(0, 1), (1, 2)]
+
+    Skewing.prefetch_factors(schedule, candidates, cache)
+    assert Skewing.get_factors(schedule, [0, 1], ["comp00"], cache) == (1, 1)
+    assert len(calls) == 2
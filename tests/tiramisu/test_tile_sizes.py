@@ -0,0 +1,76 @@
+import tests.utils as test_utils
+from tiralib.tiramisu.tile_sizes import CacheSizes, TileSizeGenerator
+from tiralib.tiramisu.tiramisu_actions.tiling_2d import Tiling2D
+from tiralib.tiramisu.tiramisu_actions.tiling_general import TilingGeneral
+from tiralib.tiramisu.tiramisu_program import TiramisuProgram
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+
+def test_cache_sizes_from_sysfs(tmp_path):
+    for index, (level, cache_type, size) in enumerate(
+        [(1, "Data", "48K"), (1, "Instruction", "32K"), (2, "Unified", "2M")]
+    ):
+        index_path = tmp_path / f"index{index}"
+        index_path.mkdir()
+        (index_path / "level").write_text(f"{level}\n")
+        (index_path / "type").write_text(f"{cache_type}\n")
+        (index_path / "size").write_text(f"{size}\n")
+
+    cache_sizes = CacheSizes.from_sysfs(str(tmp_path))
+    assert cache_sizes.l1 == 48 * 1024
+    assert cache_sizes.l2 == 2 * 1024 * 1024
+    # missing levels keep their default size
+    assert cache_sizes.l3 == CacheSizes().l3
+
+    assert CacheSizes.from_sysfs(str(tmp_path / "missing")) == CacheSizes()
+
+
+def test_propose_without_annotations():
+    tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c0|0|c0 <= 99|1",
+            "1|iterator|c1|0|c1 <= 63|1",
+            "2|computation|comp00",
+        ]
+    )
+    generator = TileSizeGenerator(CacheSizes(l1=4096, l2=65536, l3=1 << 20))
+
+    proposals = generator.propose(tree, [("comp00", 0), ("comp00", 1)], top_k=3)
+    assert len(proposals) == 3
+    for proposal in proposals:
+        assert proposal.cache_level == 1
+        assert proposal.waste == 0
+        assert proposal.footprint <= 2048
+        # the tile sizes divide the loops
+        assert 100 % proposal.tile_sizes[0] == 0
+        assert 64 % proposal.tile_sizes[1] == 0
+    # larger tiles first
+    assert proposals[0].footprint >= proposals[-1].footprint
+
+
+def test_propose_with_annotations():
+    test_data, test_cpps = test_utils.load_test_data()
+    program = TiramisuProgram.from_dict(
+        "function550013",
+        test_data["function550013"],
+        test_cpps["function550013"],
+    )
+    assert program.tree
+    generator = TileSizeGenerator.from_program(
+        program, CacheSizes(l1=48 * 1024, l2=2 * 1024 * 1024, l3=32 * 1024 * 1024)
+    )
+
+    candidate = (("comp00", 0), ("comp00", 1))
+    proposals = generator.get_proposals(program.tree, [candidate], top_k=2)[candidate]
+    # buf00[i0, i1] with a stencil of radius 1 and buf01[i0] with radius 1
+    tile_i0, tile_i1 = proposals[0].tile_sizes
+    assert proposals[0].footprint == 8 * ((tile_i0 + 2) * (tile_i1 + 2) + tile_i0 + 2)
+    assert proposals[0].footprint <= 24 * 1024
+
+    tiling = Tiling2D.from_candidate(candidate, program.tree, generator)
+    assert tiling.tile_sizes == list(proposals[0].tile_sizes)
+
+    tiling = TilingGeneral.from_candidate(
+        ["i0", "i1"], program.tree, tile_size_generator=generator
+    )
+    assert tiling.tile_sizes == list(proposals[0].tile_sizes)
@@ -1,7 +1,10 @@
+import pytest
+
 import tests.utils as test_utils
 from tiralib.config import BaseConfig
 from tiralib.tiramisu import tiramisu_actions
 from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.server_result_cache import ServerResultCache
 from tiralib.tiramisu.tiramisu_program import TiramisuProgram
 
 
@@ -102,3 +105,36 @@ def test_get_skewing_factors():
     assert schedule.is_legal()
 
     assert schedule.optims_list[0].factors == [1, 1]
+
+
+def test_server_result_cache():
+    BaseConfig.init()
+
+    sample = TiramisuProgram.init_server(
+        "examples/function_gemver_MINI_generator.cpp",
+        load_isl_ast=True,
+        load_tree=True,
+        from_file=True,
+        reuse_server=True,
+    )
+
+    with ServerResultCache(sample) as cache:
+        cache.push(tiramisu_actions.Interchange(params=[("x_temp", 0), ("x_temp", 1)]))
+        assert cache.is_legal() is True
+        isl_ast = cache.get_isl_ast()
+
+        cache.push(tiramisu_actions.Tiling2D([("x_temp", 0), ("x_temp", 1), 4, 4]))
+        assert len(cache.get_tree().iterators) > len(sample.tree.iterators)
+
+        cache.pop()
+        assert len(cache) == 1
+        assert cache.get_isl_ast() == isl_ast
+        assert cache.schedule.legality is True
+
+
+def test_server_result_cache_without_server():
+    BaseConfig.init()
+    sample = test_utils.interchange_example()
+
+    with pytest.raises(Exception):
+        ServerResultCache(sample)
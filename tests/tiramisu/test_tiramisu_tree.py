@@ -1,4 +1,7 @@
+import copy
+
 import tests.utils as test_utils
+from tiralib.tiramisu.tiramisu_iterator_node import IteratorNode
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 from tiralib.config import BaseConfig
 
@@ -25,6 +28,86 @@ def test_from_annotations():
     }
 
 
+def test_from_annotations_ids_and_order():
+    annotations = {
+        "iterators": {
+            "i": {
+                "parent_iterator": None,
+                "lower_bound": "0",
+                "upper_bound": "N",
+                "child_iterators": ["j"],
+                "computations_list": ["comp02", "comp01"],
+            },
+            "j": {
+                "parent_iterator": "i",
+                "lower_bound": "0",
+                "upper_bound": "16",
+                "child_iterators": [],
+                "computations_list": ["comp00"],
+            },
+        },
+        "computations": {
+            "comp02": {"absolute_order": 3, "iterators": ["i"]},
+            "comp00": {"absolute_order": 1, "iterators": ["i", "j"]},
+            "comp01": {"absolute_order": 2, "iterators": ["i"]},
+        },
+    }
+    tiramisu_tree = TiramisuTree.from_annotations(annotations)
+
+    assert tiramisu_tree.computations == ["comp00", "comp01", "comp02"]
+    assert tiramisu_tree.roots == [("comp00", 0)]
+    assert tiramisu_tree.iterators[("comp00", 0)].computations_list == [
+        "comp01",
+        "comp02",
+    ]
+    assert tiramisu_tree.iterators[("comp00", 0)].upper_bound == "N"
+    assert tiramisu_tree.iterators[("comp00", 1)].parent_iterator == ("comp00", 0)
+    assert tiramisu_tree.iterators[("comp00", 1)].level == 1
+
+
+def test_from_isl_ast_string_list():
+    isl_ast = [
+        "0|iterator|i|0|i <= 9|1",
+        "1|iterator|j|0|j <= i + 1|1",
+        "2|computation|comp00",
+        "1|iterator|k|0|k <= 31|1",
+        "2|iterator|l|0|l <= 15|1",
+        "3|computation|comp01",
+        "2|computation|comp02",
+        "0|iterator|i|0|i <= 4|1",
+        "1|computation|comp03",
+    ]
+    tiramisu_tree = TiramisuTree.from_isl_ast_string_list(isl_ast)
+
+    assert tiramisu_tree.roots == [("comp00", 0), ("comp03", 0)]
+    assert tiramisu_tree.computations == ["comp00", "comp01", "comp02", "comp03"]
+    assert tiramisu_tree.iterators[("comp00", 1)].upper_bound == "i + 1"
+    assert tiramisu_tree.iterators[("comp01", 1)].child_iterators == [("comp01", 2)]
+    assert tiramisu_tree.iterators[("comp01", 1)].computations_list == ["comp02"]
+    assert tiramisu_tree.iterators[("comp03", 0)].name == "i_1"
+    assert tiramisu_tree.iterators[("comp03", 0)].upper_bound == 4
+
+    # subtree computations are returned by absolute order
+    assert tiramisu_tree.get_iterator_subtree_computations(("comp01", 1)) == [
+        "comp01",
+        "comp02",
+    ]
+    assert tiramisu_tree.get_iterator_subtree_computations(("comp00", 0)) == [
+        "comp00",
+        "comp01",
+        "comp02",
+    ]
+
+    # deep nests used to cost a forward scan per loop
+    depth = 5000
+    isl_ast = [f"{level}|iterator|c{level}|0|c{level} <= 7|1" for level in range(depth)]
+    isl_ast.append(f"{depth}|computation|comp00")
+    tiramisu_tree = TiramisuTree.from_isl_ast_string_list(isl_ast)
+
+    assert len(tiramisu_tree.iterators) == depth
+    assert tiramisu_tree.get_iterator_of_computation("comp00").level == depth - 1
+
+
 def test_get_candidate_sections():
     t_tree = test_utils.tree_test_sample()
 
@@ -43,6 +126,35 @@ def test_get_candidate_sections():
     assert candidate_sections[root_id][4] == [("comp04", 3)]
 
 
+def test_candidate_sections_are_memoized():
+    t_tree = test_utils.tree_test_sample()
+
+    candidate_sections = t_tree.get_candidate_sections()
+    assert t_tree.get_candidate_sections() is candidate_sections
+
+    # a computation added to ("comp03", 1) in place ends its section
+    t_tree.iterators[("comp03", 1)].add_computation("comp03")
+    t_tree.invalidate_node(("comp03", 1))
+    candidate_sections = t_tree.get_candidate_sections()
+    assert candidate_sections[("comp01", 0)][2] == [("comp03", 1)]
+
+    t_tree.add_root(("comp05", 0))
+    t_tree.add_iterator(
+        IteratorNode(
+            name="m",
+            id=("comp05", 0),
+            parent_iterator=None,
+            lower_bound=0,
+            upper_bound=8,
+            child_iterators=[],
+            computations_list=["comp05"],
+            level=0,
+        )
+    )
+    t_tree.add_computation("comp05")
+    assert t_tree.get_candidate_sections()[("comp05", 0)] == [[("comp05", 0)]]
+
+
 def test_get_candidate_computations():
     t_tree = test_utils.tree_test_sample()
 
@@ -99,6 +211,187 @@ def test_get_iterator_of_computation():
     assert t_tree.get_iterator_of_computation("comp03", level=1).name == "j"
 
 
+def test_indexed_lookups():
+    t_tree = test_utils.tree_test_sample()
+
+    assert t_tree.get_iterator_id_from_name("k") == ("comp03", 2)
+    assert t_tree.get_iterator_id_from_name("unknown") is None
+    assert t_tree.get_iterators_at_level(1) == [("comp01", 1), ("comp03", 1)]
+    assert t_tree.get_iterators_at_level(4) == []
+    assert t_tree.get_levels() == [0, 1, 2, 3]
+
+    # adding an iterator through the tree keeps the indexes consistent
+    t_tree.iterators[("comp04", 3)].computations_list = []
+    t_tree.add_iterator(
+        IteratorNode(
+            name="n",
+            id=("comp04", 4),
+            parent_iterator=("comp04", 3),
+            lower_bound=0,
+            upper_bound=8,
+            child_iterators=[],
+            computations_list=["comp04"],
+            level=4,
+        )
+    )
+    t_tree.iterators[("comp04", 3)].add_child(("comp04", 4))
+
+    assert t_tree.get_iterator_of_computation("comp04").name == "n"
+    assert t_tree.get_iterator_of_computation("comp04", 2).name == "k"
+    assert t_tree.get_root_of_node(("comp04", 4)) == ("comp01", 0)
+    assert t_tree.get_levels() == [0, 1, 2, 3, 4]
+
+
+def test_node_edits_invalidate_indexes():
+    t_tree = test_utils.tree_test_sample()
+    assert t_tree.get_iterator_of_computation("comp01").name == "i"
+    assert t_tree.get_iterator_subtree_computations(("comp01", 0)) == [
+        "comp01",
+        "comp03",
+        "comp04",
+    ]
+
+    # move comp01 to the root through the methods of the nodes
+    t_tree.iterators[("comp01", 1)].computations_list.remove("comp01")
+    t_tree.iterators[("comp01", 0)].add_computation("comp01")
+
+    assert t_tree.get_iterator_of_computation("comp01").name == "root"
+    assert t_tree.get_iterator_subtree_computations(("comp01", 1)) == []
+
+    # copies of the tree are indexed on their own
+    tree_copy = copy.deepcopy(t_tree)
+    tree_copy.iterators[("comp01", 1)].add_computation("comp05")
+    tree_copy.add_computation("comp05")
+    assert tree_copy.get_iterator_of_computation("comp05").name == "i"
+    assert "comp05" not in t_tree.get_iterator_subtree_computations(("comp01", 0))
+
+    # setting the ids from the names edits the nodes directly
+    analysis = t_tree.get_analysis("test", lambda tree: object())
+    t_tree.set_iterator_ids()
+    assert t_tree.get_analysis("test", lambda tree: object()) is not analysis
+    assert t_tree.get_iterator_of_computation("comp01").name == "root"
+
+
+def test_get_lowest_common_ancestor():
+    t_tree = test_utils.tree_test_sample()
+
+    assert t_tree.get_lowest_common_ancestor(("comp03", 3), ("comp04", 3)) == (
+        "comp03",
+        2,
+    )
+    assert t_tree.get_lowest_common_ancestor(("comp01", 1), ("comp04", 3)) == (
+        "comp01",
+        0,
+    )
+    assert t_tree.get_lowest_common_ancestor(("comp03", 1), ("comp04", 3)) == (
+        "comp03",
+        1,
+    )
+    assert t_tree.is_ancestor(("comp03", 1), ("comp03", 3))
+    assert not t_tree.is_ancestor(("comp03", 3), ("comp03", 1))
+
+    assert t_tree.get_shared_iterator_of_computations("comp03", "comp04").name == "k"
+    assert t_tree.get_shared_iterator_of_computations("comp01", "comp03").name == (
+        "root"
+    )
+
+    isl_ast = [
+        "0|iterator|i|0|i <= 9|1",
+        "1|computation|comp00",
+        "0|iterator|j|0|j <= 9|1",
+        "1|computation|comp01",
+    ]
+    t_tree = TiramisuTree.from_isl_ast_string_list(isl_ast)
+    assert t_tree.get_shared_iterator_of_computations("comp00", "comp01") is None
+
+
+def test_get_fingerprint():
+    t_tree = test_utils.tree_test_sample()
+    fingerprint = t_tree.get_fingerprint()
+
+    assert fingerprint == test_utils.tree_test_sample().get_fingerprint()
+    assert fingerprint == copy.deepcopy(t_tree).get_fingerprint()
+
+    # editing a node in place
+    t_tree.iterators[("comp03", 3)].upper_bound = 128
+    t_tree.invalidate_node(("comp03", 3))
+    assert t_tree.get_fingerprint() != fingerprint
+    t_tree.iterators[("comp03", 3)].upper_bound = 256
+    t_tree.invalidate_node(("comp03", 3))
+    assert t_tree.get_fingerprint() == fingerprint
+
+    # moving a computation
+    t_tree.iterators[("comp04", 3)].computations_list = []
+    t_tree.iterators[("comp03", 3)].computations_list.append("comp04")
+    t_tree.invalidate_indexes()
+    assert t_tree.get_fingerprint() != fingerprint
+
+    assert (
+        test_utils.tree_test_sample_2().get_fingerprint()
+        != test_utils.tree_test_sample().get_fingerprint()
+    )
+
+
+def test_diff():
+    t_tree = test_utils.tree_test_sample()
+    assert not t_tree.diff(copy.deepcopy(t_tree))
+
+    new_tree = copy.deepcopy(t_tree)
+    new_tree.iterators[("comp04", 3)].upper_bound = 5
+    new_tree.invalidate_node(("comp04", 3))
+    tree_diff = t_tree.diff(new_tree)
+    assert tree_diff.modified_iterators == {("comp04", 3)}
+    assert not tree_diff.moved_computations
+
+    # distributing the two computations of a loop nest
+    old_tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|i|0|i <= 9|1",
+            "1|iterator|j|0|j <= 9|1",
+            "2|computation|comp00",
+            "2|computation|comp01",
+        ]
+    )
+    new_tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|i|0|i <= 9|1",
+            "1|iterator|j|0|j <= 9|1",
+            "2|computation|comp00",
+            "0|iterator|i|0|i <= 9|1",
+            "1|iterator|j|0|j <= 9|1",
+            "2|computation|comp01",
+        ]
+    )
+    tree_diff = old_tree.diff(new_tree)
+    assert tree_diff.added_iterators == {("comp01", 0), ("comp01", 1)}
+    assert not tree_diff.removed_iterators
+    assert tree_diff.modified_iterators == {("comp00", 1)}
+    assert tree_diff.moved_computations == {"comp01": (("comp00", 1), ("comp01", 1))}
+    assert not tree_diff.reordered_computations
+
+    # the iterators kept under a new root are still compared
+    old_tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c0|0|c0 <= 9|1",
+            "1|iterator|c1|0|c1 <= 9|1",
+            "2|iterator|c2|0|c2 <= 9|1",
+            "3|computation|comp0",
+        ]
+    )
+    new_tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c0|0|c0 <= 9|1",
+            "1|computation|compX",
+            "1|iterator|c1|0|c1 <= 9|1",
+            "2|iterator|c2|0|c2 <= 15|1",
+            "3|computation|comp0",
+        ]
+    )
+    tree_diff = old_tree.diff(new_tree)
+    assert new_tree.roots == [("compX", 0)]
+    assert ("comp0", 2) in tree_diff.modified_iterators
+
+
 def test_depth():
     t_tree = test_utils.tree_test_sample()
 
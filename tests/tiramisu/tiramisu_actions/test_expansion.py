@@ -1,7 +1,10 @@
+import pytest
+
 import tests.utils as test_utils
 from tiralib.tiramisu.schedule import Schedule
-from tiralib.tiramisu.tiramisu_actions import Expansion, Parallelization
+from tiralib.tiramisu.tiramisu_actions import Expansion, Parallelization, Reversal
 from tiralib.config import BaseConfig
+from tiralib.tiramisu.compiling_service import CompilingService
 
 
 def test_expansion_init():
@@ -47,3 +50,76 @@ def test_expansion_application():
         [Expansion(["addition"]), Parallelization([("addition", 1)])]
     )
     assert schedule.is_legal()
+
+
+def test_get_candidates_batch(monkeypatch):
+    BaseConfig.init()
+    sample = test_utils.skewing_example()
+    runs = []
+
+    def run_cpp_code(cpp_code, output_path, run_args=None):
+        runs.append((cpp_code, run_args))
+        # the computation is no longer expandable once parallelized
+        return "".join(
+            f"{index}|comp00|{int('tag_parallel_level' not in cpp_code or index == '0')}\n"
+            for index in run_args
+        )
+
+    monkeypatch.setattr(CompilingService, "run_cpp_code", run_cpp_code)
+    Expansion.clear_candidates_cache()
+
+    schedule = Schedule(sample)
+    parallelized = Schedule(sample)
+    parallelized.add_optimizations([Parallelization([("comp00", 1)])])
+    assert Expansion.get_candidates_batch([schedule, parallelized, schedule]) == [
+        ["comp00"],
+        [],
+        ["comp00"],
+    ]
+    # a single program is compiled and run once per schedule
+    assert len(runs) == 1
+    assert runs[0][1] == ["0", "1"]
+    assert "if (schedule_index == 1) {" in runs[0][0]
+
+    # the results are cached per schedule string
+    assert Expansion.get_candidates(Schedule(sample)) == ["comp00"]
+    assert Expansion.get_candidates(parallelized) == []
+    assert len(runs) == 1
+
+    # equivalent schedules with other actions are evaluated on their own
+    reversed_twice = Schedule(sample)
+    reversed_twice.add_optimizations(
+        [Reversal([("comp00", 0)]), Reversal([("comp00", 0)])]
+    )
+    assert reversed_twice.canonical_hash() == schedule.canonical_hash()
+    assert Expansion.get_candidates(reversed_twice) == ["comp00"]
+    assert len(runs) == 2
+
+
+def test_get_candidates_batch_failures(monkeypatch):
+    BaseConfig.init()
+    sample = test_utils.skewing_example()
+    sample.original_str = sample.original_str.replace(
+        "int main(int argc, char **argv)", "int main(int, char **argv)"
+    )
+    runs = []
+
+    def run_cpp_code(cpp_code, output_path, run_args=None):
+        runs.append(cpp_code)
+        # the run of the second schedule crashed without output
+        return "0|comp00|1\n"
+
+    monkeypatch.setattr(CompilingService, "run_cpp_code", run_cpp_code)
+    Expansion.clear_candidates_cache()
+
+    parallelized = Schedule(sample)
+    parallelized.add_optimizations([Parallelization([("comp00", 1)])])
+    with pytest.raises(Exception, match="were not all reported"):
+        Expansion.get_candidates_batch([Schedule(sample), parallelized])
+    # the parameters of main are named in the generated program
+    assert "int main(int argc, char **argv)" in runs[0]
+
+    # nothing was cached for the schedules of the failed batch, the
+    # schedule is evaluated again on its own
+    assert Expansion.get_candidates(parallelized) == ["comp00"]
+    assert len(runs) == 2
@@ -2,13 +2,14 @@ import tests.utils as test_utils
 from tiralib.tiramisu.schedule import Schedule
 from tiralib.tiramisu.tiramisu_actions.fusion import Fusion
 from tiralib.tiramisu.tiramisu_actions.interchange import Interchange
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 from tiralib.config import BaseConfig
 
 
 def test_fusion_init():
     fusion = Fusion([("comp03", 3), ("comp04", 3)])
 
-    assert fusion.params == [("comp03", 3), ("comp04", 3)]
+    assert fusion.params == (("comp03", 3), ("comp04", 3))
     assert fusion.comps is None
 
 
@@ -17,7 +18,7 @@ def test_initialize_action_for_tree():
     sample = test_utils.fusion_sample()
     fusion = Fusion([("comp03", 3), ("comp04", 3)])
     fusion.initialize_action_for_tree(sample.tree)
-    assert fusion.params == [("comp03", 3), ("comp04", 3)]
+    assert fusion.params == (("comp03", 3), ("comp04", 3))
     assert fusion.comps == ["comp03", "comp04"]
 
 
@@ -124,3 +125,46 @@ def test_fusion_application():
     assert schedule.is_legal()
 
     assert schedule.execute()
+
+
+def test_generate_candidates():
+    BaseConfig.init()
+    sample = test_utils.fusion_sample()
+    candidates = Fusion.generate_candidates(sample.tree)
+    assert not isinstance(candidates, list)
+    assert list(candidates) == [
+        (("comp01", 1), ("comp03", 1)),
+        (("comp03", 3), ("comp04", 3)),
+    ]
+
+    # only adjacent siblings are proposed
+    tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            line
+            for index in range(4)
+            for line in [
+                f"0|iterator|c{index}|0|c{index} <= 9|1",
+                f"1|computation|comp0{index}",
+            ]
+        ]
+    )
+    assert len(tree.roots) == 4
+    assert list(Fusion.generate_candidates(tree)) == [
+        (("comp00", 0), ("comp01", 0)),
+        (("comp01", 0), ("comp02", 0)),
+        (("comp02", 0), ("comp03", 0)),
+    ]
+
+    # only the pairs of a producer and a consumer are kept
+    annotations = {
+        "computations": {
+            f"comp0{index}": {
+                "write_buffer_id": index,
+                "accesses": [{"buffer_id": read} for read in reads],
+            }
+            for index, reads in [(0, []), (1, [0]), (2, [7]), (3, [1])]
+        }
+    }
+    assert list(Fusion.generate_candidates(tree, annotations)) == [
+        (("comp00", 0), ("comp01", 0)),
+    ]
@@ -8,11 +8,11 @@ from tests.utils import interchange_example
 def test_interchange_init():
     BaseConfig.init()
     interchange = Interchange([("comp00", 0), ("comp00", 1)])
-    assert interchange.params == [("comp00", 0), ("comp00", 1)]
+    assert interchange.params == (("comp00", 0), ("comp00", 1))
     assert interchange.comps is None
 
     interchange = Interchange([("comp00", 0), ("comp00", 1)], ["comp00"])
-    assert interchange.params == [("comp00", 0), ("comp00", 1)]
+    assert interchange.params == (("comp00", 0), ("comp00", 1))
     assert interchange.comps == ["comp00"]
 
 
@@ -21,7 +21,7 @@ def test_initialize_action_for_tree():
     sample = interchange_example()
     interchange = Interchange([("comp00", 0), ("comp00", 1)])
     interchange.initialize_action_for_tree(sample.tree)
-    assert interchange.params == [("comp00", 0), ("comp00", 1)]
+    assert interchange.params == (("comp00", 0), ("comp00", 1))
     assert interchange.comps == ["comp00"]
 
 
@@ -1,15 +1,18 @@
+import pytest
+
 from tests.utils import interchange_example, load_test_data
 from tiralib.config import BaseConfig
 from tiralib.tiramisu import tiramisu_actions
 from tiralib.tiramisu.schedule import Schedule
 from tiralib.tiramisu.tiramisu_actions.matrix import MatrixTransform
+from tiralib.tiramisu.tiramisu_actions.tiramisu_action import CannotApplyException
 from tiralib.tiramisu.tiramisu_program import TiramisuProgram
 
 
 def test_matrix_init():
     BaseConfig.init()
     matrixTransform = MatrixTransform([1, 0, 0, 0, 0, 1, 0, 1, 0], ["comp00"])
-    assert matrixTransform.params == [1, 0, 0, 0, 0, 1, 0, 1, 0]
+    assert matrixTransform.params == (1, 0, 0, 0, 0, 1, 0, 1, 0)
     assert matrixTransform.comps == ["comp00"]
 
 
@@ -18,7 +21,7 @@ def test_initialize_action_for_tree():
     sample = interchange_example()
     matrix = MatrixTransform([1, 0, 0, 0, 0, 1, 0, 1, 0], ["comp00"])
     matrix.initialize_action_for_tree(sample.tree)
-    assert matrix.params == [1, 0, 0, 0, 0, 1, 0, 1, 0]
+    assert matrix.params == (1, 0, 0, 0, 0, 1, 0, 1, 0)
     assert matrix.comps == ["comp00"]
     matrix.tree is not None
 
@@ -47,6 +50,54 @@ def test_legality_check():
     assert legality_string == "comp00.matrix_transform({{1,0,0},{0,0,1},{0,1,0}});"
 
 
+def test_get_action_matrix():
+    interchange = tiramisu_actions.Interchange([("comp00", 0), ("comp00", 2)])
+    assert MatrixTransform.get_action_matrix(interchange, 3) == [
+        [0, 0, 1],
+        [0, 1, 0],
+        [1, 0, 0],
+    ]
+
+    reversal = tiramisu_actions.Reversal([("comp00", 1)])
+    assert MatrixTransform.get_action_matrix(reversal, 2) == [[1, 0], [0, -1]]
+
+    # Tiramisu completes the skewings itself, they are not composed
+    skewing = tiramisu_actions.Skewing([("comp00", 0), ("comp00", 1), 1, 2])
+    assert not MatrixTransform.is_composable(skewing)
+    with pytest.raises(CannotApplyException):
+        MatrixTransform.get_action_matrix(skewing, 2)
+    assert not MatrixTransform.is_composable(
+        tiramisu_actions.Parallelization([("comp00", 0)])
+    )
+
+
+def test_from_actions():
+    actions = [
+        tiramisu_actions.Interchange([("comp00", 1), ("comp00", 2)]),
+        tiramisu_actions.Reversal([("comp00", 0)]),
+    ]
+    matrix = MatrixTransform.from_actions(actions, "comp00", 3)
+
+    assert matrix.matrix == [[-1, 0, 0], [0, 0, 1], [0, 1, 0]]
+    assert matrix.comps == ["comp00"]
+    assert matrix.decompose() == actions
+
+
+def test_decompose():
+    BaseConfig.init()
+    sample = interchange_example()
+    matrix = MatrixTransform([0, -1, 0, 1, 0, 0, 0, 0, 1], ["comp00"])
+    matrix.initialize_action_for_tree(sample.tree)
+
+    actions = matrix.decompose()
+
+    assert actions == [
+        tiramisu_actions.Reversal([("comp00", 1)], comps=["comp00"]),
+        tiramisu_actions.Interchange([("comp00", 0), ("comp00", 1)], comps=["comp00"]),
+    ]
+    assert MatrixTransform.from_actions(actions, "comp00", 3).matrix == matrix.matrix
+
+
 def test_matrix_transform_application():
     BaseConfig.init()
     _, test_cpps = load_test_data()
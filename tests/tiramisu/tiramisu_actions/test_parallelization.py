@@ -1,6 +1,9 @@
+import pytest
+
 import tests.utils as test_utils
 from tiralib.tiramisu.schedule import Schedule
 from tiralib.tiramisu.tiramisu_actions.parallelization import Parallelization
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 from tiralib.config import BaseConfig
 
 
@@ -60,3 +63,29 @@ def test_legality_check():
         legality_string
         == "prepare_schedules_for_legality_checks(true);\n    is_legal &= loop_parallelization_is_legal(0, {&comp02});\n    comp02.tag_parallel_level(0);\n"  # noqa: E501
     )
+
+
+def test_rank_candidates():
+    tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c0|0|c0 <= 9|1",
+            "1|iterator|c1|0|c1 <= 4095|1",
+            "2|computation|comp00",
+            "0|iterator|c2|0|c2 <= 1023|1",
+            "1|iterator|c3|0|c3 <= c2|1",
+            "2|computation|comp01",
+        ]
+    )
+    ranked_candidates = Parallelization.rank_candidates(tree, nbr_cores=64)
+
+    # 10 iterations only use 10 of the 64 cores
+    (best, best_score), (other, other_score) = ranked_candidates[("comp00", 0)]
+    assert best == [("comp00", 1)]
+    assert other == [("comp00", 0)]
+    assert other_score == pytest.approx(10 / 64, rel=0.05)
+    assert 0 < other_score < best_score < 1
+
+    # the triangular inner loop makes the outer loop unbalanced
+    (best, best_score), _ = ranked_candidates[("comp01", 0)]
+    assert best == [("comp01", 0)]
+    assert best_score == pytest.approx(0.5, abs=0.01)
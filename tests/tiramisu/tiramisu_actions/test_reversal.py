@@ -42,3 +42,20 @@ def test_get_candidates():
             ("comp00", 1),
         ]
     }
+
+
+def test_transform_tree():
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    schedule = Schedule(sample)
+    reversal = Reversal([("comp00", 1)])
+    schedule.add_optimizations([reversal])
+    node = schedule.tree.iterators[("comp00", 1)]
+    bounds = (node.lower_bound, node.upper_bound)
+
+    transformed_tree = reversal.transform_tree(reversal.tree)
+    node = transformed_tree.iterators[("comp00", 1)]
+    assert (node.lower_bound, node.upper_bound) == (-bounds[1], -bounds[0])
+    # the tree shared with the schedule is left unchanged
+    node = schedule.tree.iterators[("comp00", 1)]
+    assert (node.lower_bound, node.upper_bound) == bounds
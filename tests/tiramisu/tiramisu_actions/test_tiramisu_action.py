@@ -2,6 +2,9 @@ import pytest
 
 import tiralib.tiramisu.tiramisu_actions as tiramisu_actions
 from tiralib.tiramisu.tiramisu_actions import TiramisuAction, TiramisuActionType
+import tests.utils as test_utils
+from tiralib.config import BaseConfig
+from tiralib.tiramisu.schedule import Schedule
 
 
 def test_initialize_action_for_tree():
@@ -71,7 +74,7 @@ def test_get_candidates():
 
 
 def test_get_types():
-    assert len(TiramisuAction.get_types()) == 12
+    assert len(TiramisuAction.get_types()) == 13
 
 
 def test_str():
@@ -106,3 +109,63 @@ def test_eq():
     )
 
     assert t_action != t_action2
+
+
+def test_hash():
+    t_action = tiramisu_actions.Unrolling([("comp00", 1), 4])
+    t_action2 = tiramisu_actions.Unrolling([("comp00", 1), 4], comps=["comp00"])
+    assert t_action.params == (("comp00", 1), 4)
+    assert t_action != t_action2
+    assert hash(t_action) == hash(t_action2)
+    assert not hasattr(t_action, "__dict__")
+
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    schedule = Schedule(sample)
+    seen = {t_action: 1}
+    schedule.add_optimizations([t_action])
+    # once initialized, the action equals the one given the computations
+    assert t_action.comps == ["comp00"]
+    assert t_action == t_action2
+    assert t_action in seen
+    assert seen[t_action2] == 1
+    assert (
+        len({t_action, t_action2, tiramisu_actions.Unrolling([("comp00", 1), 8])}) == 2
+    )
+
+    # an initialized action can not be modified
+    with pytest.raises(AttributeError):
+        t_action.comps = ["comp01"]
+    with pytest.raises(AttributeError):
+        t_action.iterator_id = ("comp00", 0)
+    with pytest.raises(AttributeError):
+        t_action2.params = (("comp00", 0), 4)
+
+
+def test_copy():
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    schedule = Schedule(sample)
+    t_action = tiramisu_actions.Parallelization([("comp00", 0)])
+    schedule.add_optimizations([t_action])
+
+    # an initialized action added to another schedule is copied
+    schedule_copy = schedule.copy()
+    assert schedule_copy.optims_list == schedule.optims_list
+    assert schedule_copy.optims_list[0] is not t_action
+    assert schedule_copy.optims_list[0].tree is schedule_copy.tree
+    assert t_action.tree is schedule.tree
+
+
+def test_lazy_string_representations():
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    schedule = Schedule(sample)
+    t_action = tiramisu_actions.Unrolling([("comp00", 1), 4])
+    schedule.add_optimizations([t_action])
+
+    # the tree is shared and the strings are derived when first read
+    assert t_action.tree is schedule.tree
+    assert t_action._str_representation == ""
+    assert str(t_action) == "U(L1,4,comps=['comp00'])"
+    assert t_action.tiramisu_optim_str == "comp00.unroll(1,4);"
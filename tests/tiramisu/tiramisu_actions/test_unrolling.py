@@ -1,6 +1,7 @@
 import tests.utils as test_utils
 from tiralib.tiramisu.schedule import Schedule
 from tiralib.tiramisu.tiramisu_actions.unrolling import Unrolling
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 from tiralib.config import BaseConfig
 
 
@@ -52,3 +53,29 @@ def test_get_candidates():
         ("comp03", 3),
         ("comp04", 3),
     ]
+
+
+def test_propose_factors():
+    tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c0|0|c0 <= 2|1",
+            "1|computation|comp00",
+            "0|iterator|c1|0|c1 <= 4095|1",
+            "1|computation|comp01",
+            "1|computation|comp02",
+            "0|iterator|c2|0|c2 <= N - 1|1",
+            "1|computation|comp03",
+            "0|iterator|c3|0|c3 <= 100|1",
+            "1|computation|comp04",
+        ]
+    )
+
+    # short loops are fully unrolled
+    assert Unrolling.propose_factors(tree, ("comp00", 0)) == [3, 2]
+    # the body of 2 computations limits the factor to 32
+    assert Unrolling.propose_factors(tree, ("comp01", 0)) == [32, 16, 8]
+    # symbolic bounds
+    assert Unrolling.propose_factors(tree, ("comp03", 0)) == [4, 8, 2]
+    assert Unrolling.propose_factors(tree, ("comp03", 0), {"N": 30}) == [30, 15, 10]
+    # no divisor, the shortest remainder first
+    assert Unrolling.propose_factors(tree, ("comp04", 0)) == [4, 2, 32]
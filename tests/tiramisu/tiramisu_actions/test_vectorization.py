@@ -0,0 +1,68 @@
+import copy
+
+import tests.utils as test_utils
+from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.tiramisu_actions.vectorization import Vectorization
+from tiralib.config import BaseConfig
+
+
+def test_vectorization_init():
+    vectorization = Vectorization([("comp00", 1), 8])
+    assert vectorization.iterator_id == ("comp00", 1)
+    assert vectorization.vector_width == 8
+    assert vectorization.comps is None
+
+    vectorization = Vectorization([("comp00", 1), 8], ["comp00"])
+    assert vectorization.iterator_id == ("comp00", 1)
+    assert vectorization.vector_width == 8
+    assert vectorization.comps == ["comp00"]
+
+
+def test_initialize_action_for_tree():
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    vectorization = Vectorization([("comp00", 1), 8])
+    vectorization.initialize_action_for_tree(sample.tree)
+    assert vectorization.iterator_id == ("comp00", 1)
+    assert vectorization.vector_width == 8
+    assert vectorization.comps == ["comp00"]
+
+
+def test_set_string_representations():
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    vectorization = Vectorization([("comp00", 1), 8])
+    schedule = Schedule(sample)
+    schedule.add_optimizations([vectorization])
+    assert vectorization.tiramisu_optim_str == "comp00.vectorize(1,8);"
+    assert str(vectorization) == "V(L1,8,comps=['comp00'])"
+    assert (
+        vectorization.legality_check_string
+        == "prepare_schedules_for_legality_checks(true);\n    is_legal &= loop_vectorization_is_legal(1, {&comp00});\n    comp00.vectorize(1,8);"  # noqa: E501
+    )
+
+
+def test_get_candidates():
+    BaseConfig.init()
+    sample = test_utils.unrolling_sample()
+    assert Vectorization.get_candidates(sample.tree) == [("comp00", 1)]
+    assert Vectorization.get_candidates(sample.tree, sample.annotations) == [
+        ("comp00", 1)
+    ]
+    # the innermost loop only runs 16 iterations
+    assert Vectorization.get_candidates(sample.tree, vector_width=32) == []
+
+    # transposed store, the innermost loop has a stride of 768 elements
+    annotations = copy.deepcopy(sample.annotations)
+    annotations["computations"]["comp00"]["accesses"][1]["access_matrix"] = [
+        [0, 1, 0],
+        [1, 0, 0],
+    ]
+    assert Vectorization.get_candidates(sample.tree, annotations) == []
+
+    tree = test_utils.tree_test_sample()
+    assert Vectorization.get_candidates(tree) == [
+        ("comp01", 1),
+        ("comp03", 3),
+        ("comp04", 3),
+    ]
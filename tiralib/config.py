@@ -31,6 +31,7 @@ class TiraLibConfig:
     env_vars: Dict[str, str] = field(default_factory=dict)
     tiralib_cpp: TiraLibCppConfig = field(default_factory=TiraLibCppConfig)
     dependencies: Dependencies = field(default_factory=Dependencies)
+    skewing_solver_cache: str | None = None
 
 
 def read_yaml_file(path):
@@ -64,6 +65,9 @@ def dict_to_config(parsed_yaml: Dict[Any, Any]) -> TiraLibConfig:
         env_vars=env_vars,
         tiralib_cpp=tiralibcpp,
         dependencies=deps,
+        skewing_solver_cache=parsed_yaml["skewing_solver_cache"]
+        if "skewing_solver_cache" in parsed_yaml
+        else None,
     )
 
 
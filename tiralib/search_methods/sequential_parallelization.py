@@ -1,30 +1,70 @@
+from __future__ import annotations
+
+import itertools
+from typing import Dict, Iterable, List
+
 from tiralib.tiramisu.schedule import Schedule
 from tiralib.tiramisu.tiramisu_actions.parallelization import Parallelization
+from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
 from tiralib.tiramisu.tiramisu_program import TiramisuProgram
 
 
 def parallelize_first_legal_outermost(
     tiramisu_program: TiramisuProgram,
-) -> Schedule:
-    schedule = Schedule(tiramisu_program)
+) -> Schedule | None:
     candidates_per_root = Parallelization.get_candidates(tiramisu_program.tree)
 
-    for root in tiramisu_program.tree.roots:
-        tmp_schedule = schedule.copy()
-        for candidate in candidates_per_root[tiramisu_program.tree.iterators[root].id]:
-            for node in candidate:
-                tmp_schedule.add_optimizations(
-                    [
-                        Parallelization(
-                            [
-                                (
-                                    node[0],
-                                    node[1],
-                                )
-                            ]
-                        )
-                    ]
+    return _parallelize_first_legal(
+        tiramisu_program,
+        {
+            root: candidates_per_root[tiramisu_program.tree.iterators[root].id]
+            for root in tiramisu_program.tree.roots
+        },
+    )
+
+
+def parallelize_first_legal_ranked(
+    tiramisu_program: TiramisuProgram,
+    nbr_cores: int | None = None,
+    min_score: float = 0.0,
+) -> Schedule | None:
+    """
+    Parallelizes, for each root, the candidate with the best score of
+    `Parallelization.rank_candidates` that is legal, ignoring the
+    candidates scoring below `min_score`.
+    """
+    ranked_candidates = Parallelization.rank_candidates(
+        tiramisu_program.tree, nbr_cores
+    )
+
+    return _parallelize_first_legal(
+        tiramisu_program,
+        {
+            root: (
+                candidate
+                for candidate, _ in itertools.takewhile(
+                    lambda ranked: ranked[1] >= min_score, ranked_candidates[root]
                 )
+            )
+            for root in tiramisu_program.tree.roots
+        },
+    )
+
+
+def _parallelize_first_legal(
+    tiramisu_program: TiramisuProgram,
+    candidates_per_root: Dict[IteratorIdentifier, Iterable[List[IteratorIdentifier]]],
+) -> Schedule | None:
+    # parallelizes the first legal candidate of each root, in the order
+    # the candidates are given
+    schedule = Schedule(tiramisu_program)
+
+    for root in tiramisu_program.tree.roots:
+        for candidate in candidates_per_root[root]:
+            tmp_schedule = schedule.copy()
+            tmp_schedule.add_optimizations(
+                [Parallelization([node]) for node in candidate]
+            )
             if tmp_schedule.is_legal():
                 schedule = tmp_schedule
                 break
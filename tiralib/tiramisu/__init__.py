@@ -2,17 +2,36 @@
 
 from tiralib.tiramisu import tiramisu_actions
 
+from .action_space import ActionSpace
+from .affine_bounds import AffineExpression, AffineParsingError, TripCountEstimator
+from .dependence_analysis import DependenceAnalysis
 from .compiling_service import CompilingService
 from .schedule import Schedule
+from .schedule_parser import ScheduleParser, ScheduleParsingError
+from .server_result_cache import ServerResultCache
+from .skewing_solver_cache import SkewingSolverCache
+from .tile_sizes import CacheSizes, TileSizeGenerator, TileSizeProposal
 from .tiramisu_iterator_node import IteratorIdentifier, IteratorNode
 from .tiramisu_program import TiramisuProgram
 from .tiramisu_tree import TiramisuTree
 
 __all__ = [
+    "ActionSpace",
+    "AffineExpression",
+    "AffineParsingError",
+    "CacheSizes",
     "CompilingService",
+    "DependenceAnalysis",
     "Schedule",
+    "ScheduleParser",
+    "ScheduleParsingError",
+    "ServerResultCache",
+    "SkewingSolverCache",
+    "TileSizeGenerator",
+    "TileSizeProposal",
     "TiramisuProgram",
     "TiramisuTree",
+    "TripCountEstimator",
     "IteratorNode",
     "tiramisu_actions",
     "IteratorIdentifier",
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from tiralib.tiramisu.tiramisu_actions.expansion import Expansion
+from tiralib.tiramisu.tiramisu_actions.tiling_general import TilingGeneral
+from tiralib.tiramisu.tiramisu_actions.tiramisu_action import TiramisuActionType
+from tiralib.tiramisu.tiramisu_actions.vectorization import Vectorization
+from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.schedule import Schedule
+
+
+class _ActionRows:
+    # Rows of the table accumulated in flat lists, converted to arrays once
+    # at the end as most blocks of rows are tiny
+    def __init__(self) -> None:
+        self.types: List[int] = []
+        self.roots: List[int] = []
+        self.widths: List[int] = []
+        self.operands: List[int] = []
+
+    def add(
+        self,
+        action_type: TiramisuActionType,
+        root: int,
+        rows: Iterable[Sequence[int]],
+    ) -> None:
+        nbr_rows = len(self.widths)
+        for row in rows:
+            self.widths.append(len(row))
+            self.operands.extend(row)
+        nbr_rows = len(self.widths) - nbr_rows
+        self.types.extend([action_type.value] * nbr_rows)
+        self.roots.extend([root] * nbr_rows)
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        offsets = np.zeros(len(self.widths) + 1, dtype=np.int64)
+        np.cumsum(np.array(self.widths, dtype=np.int64), out=offsets[1:])
+        return (
+            np.array(self.types, dtype=np.int8),
+            np.array(self.roots, dtype=np.int32),
+            offsets,
+            np.array(self.operands, dtype=np.int32),
+        )
+
+
+class ActionSpace:
+    """
+    Table of the candidate actions of a schedule, for all the action types.
+
+    Every row is a candidate of one action type with its operands: the
+    iterators it is applied to (the sibling iterators of a parallelization
+    group, the pair of a fusion, the 2 or 3 loops of a tiling...) or the
+    computation of an expansion. The candidates are the same as the ones of
+    the `get_candidates` methods of the actions, without the factors (tile
+    sizes, unrolling and skewing factors, vector widths) that are chosen
+    afterwards.
+
+    The rows are stored in NumPy arrays, iterators and computations being
+    referred to by their position in `iterator_ids` and `computations`:
+
+    Attributes:
+    ----------
+    `iterator_ids`: `list[IteratorIdentifier]`
+        The iterators of the tree, in the order of `TiramisuTree.iterators`.
+    `computations`: `list[str]`
+        The computations of the tree.
+    `action_types`: `np.ndarray`
+        The `TiramisuActionType` value of each row (int8).
+    `roots`: `np.ndarray`
+        The position of the root of the candidate in `iterator_ids`, -1 for
+        fusions of two roots (int32).
+    `offsets`: `np.ndarray`
+        The operands of row `i` are `operands[offsets[i]:offsets[i + 1]]`
+        (int64, one more element than the rows).
+    `operands`: `np.ndarray`
+        The positions of the operands in `iterator_ids`, or in
+        `computations` for expansions (int32).
+    """
+
+    # Action types whose candidates are found on the tree alone. Expansion
+    # candidates are found by compiling the program and matrix transforms
+    # have no candidates.
+    TREE_ACTION_TYPES = (
+        TiramisuActionType.INTERCHANGE,
+        TiramisuActionType.TILING_2D,
+        TiramisuActionType.TILING_3D,
+        TiramisuActionType.TILING_GENERAL,
+        TiramisuActionType.PARALLELIZATION,
+        TiramisuActionType.SKEWING,
+        TiramisuActionType.UNROLLING,
+        TiramisuActionType.FUSION,
+        TiramisuActionType.REVERSAL,
+        TiramisuActionType.DISTRIBUTION,
+        TiramisuActionType.VECTORIZATION,
+    )
+
+    def __init__(
+        self,
+        iterator_ids: List[IteratorIdentifier],
+        computations: List[str],
+        action_types: np.ndarray,
+        roots: np.ndarray,
+        offsets: np.ndarray,
+        operands: np.ndarray,
+    ):
+        self.iterator_ids = iterator_ids
+        self.computations = computations
+        self.action_types = action_types
+        self.roots = roots
+        self.offsets = offsets
+        self.operands = operands
+
+    @classmethod
+    def enumerate(
+        cls,
+        schedule: Schedule,
+        action_types: Iterable[TiramisuActionType] | None = None,
+    ) -> ActionSpace:
+        """
+        Enumerates the candidate actions of the tree of a schedule.
+
+        The tree is walked once for the actions on single loops and sibling
+        loops and the candidate sections (memoized on the tree) give the
+        actions on nested loops. The rows are converted to arrays at once.
+
+        Parameters
+        ----------
+        `schedule` : `Schedule`
+            The schedule whose tree is explored.
+        `action_types` : `Iterable[TiramisuActionType] | None`
+            The action types to enumerate, `TREE_ACTION_TYPES` by default.
+            Expansion candidates are only enumerated when requested as they
+            require compiling the program.
+        """
+        tree = schedule.tree
+        assert tree is not None
+        requested = set(cls.TREE_ACTION_TYPES if action_types is None else action_types)
+
+        iterator_ids = list(tree.iterators)
+        computations = list(tree.computations)
+        index_of_iterator = {
+            iterator_id: index for index, iterator_id in enumerate(iterator_ids)
+        }
+        rows = _ActionRows()
+
+        # loops of each level of every root, for fusion
+        root_levels: List[List[List[int]]] = []
+        for root in tree.roots:
+            root_index = index_of_iterator[root]
+            parallel_groups = [[root_index]]
+            loops: List[int] = []
+            leaves: List[int] = []
+            distributable: List[int] = []
+            levels: List[List[int]] = []
+
+            # pre-order walk of the loops of the root
+            nodes_to_visit = [root]
+            while nodes_to_visit:
+                node = tree.iterators[nodes_to_visit.pop()]
+                index = index_of_iterator[node.id]
+                loops.append(index)
+                depth = node.level - tree.iterators[root].level
+                if depth == len(levels):
+                    levels.append([])
+                levels[depth].append(index)
+                if node.child_iterators:
+                    parallel_groups.append(
+                        [index_of_iterator[child] for child in node.child_iterators]
+                    )
+                elif node.computations_list:
+                    leaves.append(index)
+                if len(node.computations_list) + len(node.child_iterators) > 1:
+                    distributable.append(index)
+                nodes_to_visit.extend(reversed(node.child_iterators))
+            root_levels.append(levels)
+
+            if TiramisuActionType.PARALLELIZATION in requested:
+                rows.add(
+                    TiramisuActionType.PARALLELIZATION, root_index, parallel_groups
+                )
+            if TiramisuActionType.REVERSAL in requested:
+                rows.add(TiramisuActionType.REVERSAL, root_index, [(i,) for i in loops])
+            if TiramisuActionType.UNROLLING in requested:
+                rows.add(
+                    TiramisuActionType.UNROLLING, root_index, [(i,) for i in leaves]
+                )
+            if TiramisuActionType.DISTRIBUTION in requested:
+                rows.add(
+                    TiramisuActionType.DISTRIBUTION,
+                    root_index,
+                    [(i,) for i in distributable],
+                )
+
+        if TiramisuActionType.FUSION in requested:
+            rows.add(
+                TiramisuActionType.FUSION,
+                -1,
+                itertools.combinations(
+                    [index_of_iterator[root] for root in tree.roots], 2
+                ),
+            )
+            # the root of a loop is alone on its level
+            for root, levels in zip(tree.roots, root_levels):
+                for level_loops in levels[1:]:
+                    rows.add(
+                        TiramisuActionType.FUSION,
+                        index_of_iterator[root],
+                        itertools.combinations(level_loops, 2),
+                    )
+
+        for root_id, sections in tree.get_candidate_sections().items():
+            root_index = index_of_iterator[root_id]
+            for section in sections:
+                # Only consider sections with more than one iterator
+                if len(section) < 2:
+                    continue
+                section_loops = [index_of_iterator[iterator] for iterator in section]
+                if TiramisuActionType.INTERCHANGE in requested:
+                    rows.add(
+                        TiramisuActionType.INTERCHANGE,
+                        root_index,
+                        itertools.combinations(section_loops, 2),
+                    )
+                if TiramisuActionType.SKEWING in requested:
+                    rows.add(
+                        TiramisuActionType.SKEWING,
+                        root_index,
+                        itertools.pairwise(section_loops),
+                    )
+                if TiramisuActionType.TILING_2D in requested:
+                    rows.add(
+                        TiramisuActionType.TILING_2D,
+                        root_index,
+                        itertools.pairwise(section_loops),
+                    )
+                if TiramisuActionType.TILING_3D in requested:
+                    rows.add(
+                        TiramisuActionType.TILING_3D,
+                        root_index,
+                        zip(section_loops, section_loops[1:], section_loops[2:]),
+                    )
+
+        if TiramisuActionType.TILING_GENERAL in requested:
+            for root, candidates in TilingGeneral.get_candidates(tree).items():
+                rows.add(
+                    TiramisuActionType.TILING_GENERAL,
+                    index_of_iterator[root],
+                    [
+                        [index_of_iterator[iterator] for iterator in candidate]
+                        for candidate in candidates
+                    ],
+                )
+
+        if TiramisuActionType.VECTORIZATION in requested:
+            program = schedule.tiramisu_program
+            for iterator_id in Vectorization.get_candidates(
+                tree, program.annotations if program else None
+            ):
+                rows.add(
+                    TiramisuActionType.VECTORIZATION,
+                    index_of_iterator[tree.get_root_of_node(iterator_id)],
+                    [(index_of_iterator[iterator_id],)],
+                )
+
+        if TiramisuActionType.EXPANSION in requested:
+            index_of_computation = {
+                comp: index for index, comp in enumerate(computations)
+            }
+            for comp in Expansion.get_candidates(schedule):
+                iterator = tree.get_iterator_of_computation(comp)
+                rows.add(
+                    TiramisuActionType.EXPANSION,
+                    index_of_iterator[tree.get_root_of_node(iterator.id)],
+                    [(index_of_computation[comp],)],
+                )
+
+        return cls(iterator_ids, computations, *rows.to_arrays())
+
+    def get_rows(self, action_type: TiramisuActionType) -> np.ndarray:
+        """
+        Returns the indices of the rows of an action type.
+        """
+        return np.flatnonzero(self.action_types == action_type.value)
+
+    def count(self, action_type: TiramisuActionType) -> int:
+        """
+        Returns the number of candidates of an action type.
+        """
+        return int(np.count_nonzero(self.action_types == action_type.value))
+
+    def get_type(self, row: int) -> TiramisuActionType:
+        return TiramisuActionType(int(self.action_types[row]))
+
+    def get_root(self, row: int) -> IteratorIdentifier | None:
+        root = self.roots[row]
+        return self.iterator_ids[root] if root >= 0 else None
+
+    def get_operands(self, row: int) -> list:
+        """
+        Returns the operands of a row: iterator identifiers, or computation
+        names for expansions.
+        """
+        positions = self.operands[self.offsets[row] : self.offsets[row + 1]]
+        if self.action_types[row] == TiramisuActionType.EXPANSION.value:
+            return [self.computations[position] for position in positions]
+        return [self.iterator_ids[position] for position in positions]
+
+    def get_candidates(self, action_type: TiramisuActionType) -> List[list]:
+        """
+        Returns the operands of all the candidates of an action type.
+        """
+        return [self.get_operands(row) for row in self.get_rows(action_type)]
+
+    def __len__(self) -> int:
+        return len(self.action_types)
+
+    def __str__(self) -> str:
+        counts = {
+            action_type.name: self.count(action_type)
+            for action_type in TiramisuActionType
+            if self.count(action_type)
+        }
+        return f"ActionSpace({len(self)} actions, {counts})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
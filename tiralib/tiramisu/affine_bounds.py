@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
+    from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+_TOKEN_REGEX = re.compile(r"\s*(?:(\d+)|([A-Za-z_]\w*)|(.))")
+
+
+class AffineParsingError(Exception):
+    """Raised when a bound is not an affine expression."""
+
+    pass
+
+
+class AffineExpression:
+    """
+    An affine expression `sum(coefficients[name] * name) + constant` over the
+    iterators and the parameters of a program.
+
+    Parameters
+    ----------
+    `coefficients` : `Dict[str, float]`
+        The coefficient of each variable.
+    `constant` : `float`
+        The constant term.
+    """
+
+    def __init__(
+        self, coefficients: Dict[str, float] | None = None, constant: float = 0
+    ):
+        self.coefficients = coefficients or {}
+        self.constant = constant
+
+    @classmethod
+    def parse(cls, expression: str | int) -> AffineExpression:
+        """
+        Parses an affine expression as emitted by ISL or in the annotations,
+        e.g. `N - 1`, `c0 + 31`, `2*i + j` or `floord(N - 1, 32)`.
+        `floord` and `ceild` by a constant are approximated by an exact
+        division.
+
+        Raises
+        ------
+        `AffineParsingError` if the expression is not affine.
+        """
+        if isinstance(expression, int):
+            return cls(constant=expression)
+        tokens = cls._tokenize(expression)
+        result, position = cls._parse_sum(tokens, 0, expression)
+        if position != len(tokens):
+            raise AffineParsingError(f"Unexpected token in {expression!r}")
+        return result
+
+    @classmethod
+    def parse_bound(cls, bound: str | int) -> Tuple[str | None, List[AffineExpression]]:
+        """
+        Parses a loop bound, which is either an affine expression or the
+        `min` or `max` of affine expressions (`min(255, c0 + 31)` in tiled
+        loops).
+
+        Returns
+        -------
+        The function (`"min"`, `"max"` or None) and the affine expressions
+        it is applied to.
+        """
+        if isinstance(bound, str):
+            match = re.fullmatch(r"\s*(min|max)\s*\((.*)\)\s*", bound)
+            if match:
+                tokens = cls._tokenize(match.group(2))
+                pieces = []
+                position = 0
+                while True:
+                    piece, position = cls._parse_sum(tokens, position, bound)
+                    pieces.append(piece)
+                    if position == len(tokens):
+                        break
+                    if tokens[position] != ",":
+                        raise AffineParsingError(f"Unexpected token in {bound!r}")
+                    position += 1
+                return match.group(1), pieces
+        return None, [cls.parse(bound)]
+
+    @classmethod
+    def _tokenize(cls, expression: str) -> list:
+        tokens: list = []
+        for number, name, symbol in _TOKEN_REGEX.findall(expression):
+            if number:
+                tokens.append(int(number))
+            elif name:
+                tokens.append(name)
+            elif symbol.strip():
+                tokens.append(symbol)
+        return tokens
+
+    @classmethod
+    def _parse_sum(
+        cls, tokens: list, position: int, expression: str
+    ) -> Tuple[AffineExpression, int]:
+        result, position = cls._parse_product(tokens, position, expression)
+        while position < len(tokens) and tokens[position] in ("+", "-"):
+            sign = 1 if tokens[position] == "+" else -1
+            term, position = cls._parse_product(tokens, position + 1, expression)
+            result = result + term * sign
+        return result, position
+
+    @classmethod
+    def _parse_product(
+        cls, tokens: list, position: int, expression: str
+    ) -> Tuple[AffineExpression, int]:
+        result, position = cls._parse_factor(tokens, position, expression)
+        while position < len(tokens) and tokens[position] in ("*", "/"):
+            operator = tokens[position]
+            factor, position = cls._parse_factor(tokens, position + 1, expression)
+            if operator == "*":
+                if factor.is_constant():
+                    result = result * factor.constant
+                elif result.is_constant():
+                    result = factor * result.constant
+                else:
+                    raise AffineParsingError(f"Product of variables in {expression!r}")
+            else:
+                if not factor.is_constant() or factor.constant == 0:
+                    raise AffineParsingError(
+                        f"Division by a non constant in {expression!r}"
+                    )
+                result = result * (1 / factor.constant)
+        return result, position
+
+    @classmethod
+    def _parse_factor(
+        cls, tokens: list, position: int, expression: str
+    ) -> Tuple[AffineExpression, int]:
+        if position >= len(tokens):
+            raise AffineParsingError(f"Unexpected end of {expression!r}")
+        token = tokens[position]
+        if isinstance(token, int):
+            return cls(constant=token), position + 1
+        if token == "-":
+            factor, position = cls._parse_factor(tokens, position + 1, expression)
+            return factor * -1, position
+        if token == "(":
+            result, position = cls._parse_sum(tokens, position + 1, expression)
+            return result, cls._expect(tokens, position, ")", expression)
+        if token in ("floord", "ceild"):
+            position = cls._expect(tokens, position + 1, "(", expression)
+            numerator, position = cls._parse_sum(tokens, position, expression)
+            position = cls._expect(tokens, position, ",", expression)
+            denominator, position = cls._parse_sum(tokens, position, expression)
+            if not denominator.is_constant() or denominator.constant == 0:
+                raise AffineParsingError(
+                    f"Division by a non constant in {expression!r}"
+                )
+            result = numerator * (1 / denominator.constant)
+            return result, cls._expect(tokens, position, ")", expression)
+        if isinstance(token, str) and (token[0].isalpha() or token[0] == "_"):
+            if position + 1 < len(tokens) and tokens[position + 1] == "(":
+                raise AffineParsingError(
+                    f"Unsupported function {token} in {expression!r}"
+                )
+            return cls({token: 1}), position + 1
+        raise AffineParsingError(f"Unexpected token {token!r} in {expression!r}")
+
+    @classmethod
+    def _expect(cls, tokens: list, position: int, token: str, expression: str) -> int:
+        if position >= len(tokens) or tokens[position] != token:
+            raise AffineParsingError(f"Expected {token!r} in {expression!r}")
+        return position + 1
+
+    def is_constant(self) -> bool:
+        return not any(self.coefficients.values())
+
+    def evaluate(self, values: Dict[str, float]) -> float:
+        """
+        Evaluates the expression, variables missing from `values` give NaN.
+        """
+        return self.constant + sum(
+            coefficient * values.get(name, np.nan)
+            for name, coefficient in self.coefficients.items()
+            if coefficient
+        )
+
+    def __add__(self, other: AffineExpression) -> AffineExpression:
+        coefficients = dict(self.coefficients)
+        for name, coefficient in other.coefficients.items():
+            coefficients[name] = coefficients.get(name, 0) + coefficient
+        return AffineExpression(coefficients, self.constant + other.constant)
+
+    def __mul__(self, factor: float) -> AffineExpression:
+        return AffineExpression(
+            {
+                name: coefficient * factor
+                for name, coefficient in self.coefficients.items()
+            },
+            self.constant * factor,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AffineExpression):
+            return NotImplemented
+        return self.constant == other.constant and {
+            name: coefficient
+            for name, coefficient in self.coefficients.items()
+            if coefficient
+        } == {
+            name: coefficient
+            for name, coefficient in other.coefficients.items()
+            if coefficient
+        }
+
+    def __str__(self) -> str:
+        terms = [
+            f"{coefficient}*{name}"
+            for name, coefficient in self.coefficients.items()
+            if coefficient
+        ]
+        if self.constant or not terms:
+            terms.append(str(self.constant))
+        return " + ".join(terms)
+
+    def __repr__(self) -> str:
+        return f"AffineExpression({self})"
+
+
+class TripCountEstimator:
+    """
+    Estimates the iteration counts of the loops of a tree without compiling
+    anything.
+
+    The bounds of each loop are parsed as affine expressions of the
+    enclosing iterators and of the program parameters. The average trip
+    count of a loop is the difference of its bounds evaluated at the mean
+    values of the enclosing iterators, which is exact for triangular loops
+    inside rectangular ones and an estimate for deeper non-rectangular
+    nests and for `min`/`max` bounds. Loop increments (tile loops in the
+    ISL AST) are taken into account. All the loops of a level are
+    evaluated at once with NumPy. Loops with unknown bounds or unknown
+    parameters get NaN.
+    """
+
+    @classmethod
+    def get_loop_trip_counts(
+        cls, tree: TiramisuTree, parameters: Dict[str, int] | None = None
+    ) -> Dict[IteratorIdentifier, float]:
+        """
+        Returns the average number of iterations of each loop, for one
+        iteration of its enclosing loops.
+
+        Parameters
+        ----------
+        `tree` : `TiramisuTree`
+            The tree of the program.
+        `parameters` : `Dict[str, int] | None`
+            The values of the symbolic parameters used in the bounds.
+        """
+        trip_counts, _ = cls._estimate(tree, parameters)
+        return trip_counts
+
+    @classmethod
+    def get_computation_trip_counts(
+        cls, tree: TiramisuTree, parameters: Dict[str, int] | None = None
+    ) -> Dict[str, float]:
+        """
+        Returns the estimated number of times each computation is executed,
+        the product of the trip counts of its enclosing loops.
+        """
+        _, total_counts = cls._estimate(tree, parameters)
+        computation_trip_counts: Dict[str, float] = {}
+        for comp in tree.computations:
+            try:
+                iterator = tree.get_iterator_of_computation(comp)
+            except ValueError:
+                # the computation is not in a loop
+                computation_trip_counts[comp] = 1.0
+                continue
+            computation_trip_counts[comp] = total_counts[iterator.id]
+        return computation_trip_counts
+
+    @classmethod
+    def _estimate(
+        cls, tree: TiramisuTree, parameters: Dict[str, int] | None
+    ) -> Tuple[Dict[IteratorIdentifier, float], Dict[IteratorIdentifier, float]]:
+        parameters = parameters or {}
+        iterator_ids = list(tree.iterators)
+        column_of_iterator = {
+            iterator_id: column for column, iterator_id in enumerate(iterator_ids)
+        }
+        parameter_names = list(parameters)
+        column_of_parameter = {
+            name: len(iterator_ids) + column
+            for column, name in enumerate(parameter_names)
+        }
+        nbr_columns = len(iterator_ids) + len(parameter_names)
+
+        # mean value of every iterator followed by the parameter values
+        values = np.full(nbr_columns, np.nan)
+        values[len(iterator_ids) :] = [parameters[name] for name in parameter_names]
+        trip_counts = np.full(len(iterator_ids), np.nan)
+        total_counts = np.full(len(iterator_ids), np.nan)
+        inclusive = 1 if tree.upper_bounds_are_inclusive else 0
+
+        for level in tree.get_levels():
+            level_ids = tree.get_iterators_at_level(level)
+            lower_rows = cls._bound_rows(
+                tree, level_ids, "lower_bound", column_of_iterator, column_of_parameter
+            )
+            upper_rows = cls._bound_rows(
+                tree, level_ids, "upper_bound", column_of_iterator, column_of_parameter
+            )
+            lower_bounds = cls._evaluate_rows(
+                lower_rows, values, nbr_columns, np.maximum
+            )
+            upper_bounds = cls._evaluate_rows(
+                upper_rows, values, nbr_columns, np.minimum
+            )
+
+            columns = np.array(
+                [column_of_iterator[iterator_id] for iterator_id in level_ids]
+            )
+            steps = np.array(
+                [tree.iterators[iterator_id].step for iterator_id in level_ids]
+            )
+            # lower_bound, lower_bound + step, ... up to the last value
+            # reached before the (exclusive) upper bound. Strided loops
+            # always run a whole number of times, while the mean extent of
+            # a non-rectangular loop may be fractional.
+            extents = (upper_bounds - lower_bounds + inclusive) / steps
+            level_trip_counts = np.maximum(
+                np.where(steps > 1, np.ceil(extents), extents), 0
+            )
+            trip_counts[columns] = level_trip_counts
+            values[columns] = lower_bounds + steps * (level_trip_counts - 1) / 2
+
+            parents = [
+                tree.iterators[iterator_id].parent_iterator for iterator_id in level_ids
+            ]
+            parent_totals = np.array(
+                [
+                    total_counts[column_of_iterator[parent]]
+                    if parent in column_of_iterator
+                    else 1.0
+                    for parent in parents
+                ]
+            )
+            total_counts[columns] = parent_totals * level_trip_counts
+
+        return (
+            dict(zip(iterator_ids, trip_counts.tolist())),
+            dict(zip(iterator_ids, total_counts.tolist())),
+        )
+
+    @classmethod
+    def _bound_rows(
+        cls,
+        tree: TiramisuTree,
+        level_ids: List[IteratorIdentifier],
+        bound_name: str,
+        column_of_iterator: Dict[IteratorIdentifier, int],
+        column_of_parameter: Dict[str, int],
+    ) -> List[Tuple[List[Tuple[int, float]], float]]:
+        # one list of (column, coefficient) pairs and a constant per affine
+        # piece, grouped by iterator (an empty group means NaN)
+        rows: list = []
+        for iterator_id in level_ids:
+            iterator = tree.iterators[iterator_id]
+            try:
+                _, pieces = AffineExpression.parse_bound(getattr(iterator, bound_name))
+            except AffineParsingError:
+                rows.append([])
+                continue
+
+            enclosing_iterators = cls._get_enclosing_iterators(tree, iterator_id)
+            group = []
+            for piece in pieces:
+                row = []
+                constant = piece.constant
+                for name, coefficient in piece.coefficients.items():
+                    if name in enclosing_iterators:
+                        row.append(
+                            (column_of_iterator[enclosing_iterators[name]], coefficient)
+                        )
+                    elif name in column_of_parameter:
+                        row.append((column_of_parameter[name], coefficient))
+                    elif coefficient:
+                        constant = np.nan
+                group.append((row, constant))
+            rows.append(group)
+        return rows
+
+    @classmethod
+    def _evaluate_rows(
+        cls, groups: list, values: np.ndarray, nbr_columns: int, reduce
+    ) -> np.ndarray:
+        offsets = []
+        nbr_rows = sum(max(len(group), 1) for group in groups)
+        matrix = np.zeros((nbr_rows, nbr_columns))
+        constants = np.zeros(nbr_rows)
+        row_index = 0
+        for group in groups:
+            offsets.append(row_index)
+            if not group:
+                constants[row_index] = np.nan
+                row_index += 1
+                continue
+            for row, constant in group:
+                for column, coefficient in row:
+                    matrix[row_index, column] += coefficient
+                constants[row_index] = constant
+                row_index += 1
+
+        # unknown values only matter where their coefficient is not zero
+        used = matrix != 0
+        evaluated = np.where(used, matrix * np.nan_to_num(values), 0).sum(axis=1)
+        unknown = (used & np.isnan(values)).any(axis=1)
+        evaluated = np.where(unknown, np.nan, evaluated + constants)
+        return reduce.reduceat(evaluated, offsets)
+
+    @classmethod
+    def _get_enclosing_iterators(
+        cls, tree: TiramisuTree, iterator_id: IteratorIdentifier
+    ) -> Dict[str, IteratorIdentifier]:
+        # the names under which the bounds refer to the enclosing iterators,
+        # the innermost iterator wins. Iterators renamed because of duplicate
+        # names in the ISL AST (i_1) are also found by their original name.
+        enclosing_iterators: Dict[str, IteratorIdentifier] = {}
+        parent = tree.iterators[iterator_id].parent_iterator
+        while parent is not None:
+            name = tree.iterators[parent].name
+            enclosing_iterators.setdefault(name, parent)
+            base_name, _, suffix = name.rpartition("_")
+            if base_name and suffix.isdigit():
+                enclosing_iterators.setdefault(base_name, parent)
+            parent = tree.iterators[parent].parent_iterator
+        return enclosing_iterators
@@ -4,6 +4,7 @@ import logging
 import os
 import re
 import subprocess
+import threading
 from typing import TYPE_CHECKING, List
 
 from tiralib.config import BaseConfig
@@ -79,7 +80,7 @@ class CompilingService:
         """
         assert schedule.tiramisu_program
         assert schedule.tiramisu_program.original_str
-        assert schedule.tree
+        assert schedule.tiramisu_program.tree
 
         # Add code to the original file to get legality result
         legality_check_lines = """
@@ -189,12 +190,18 @@ class CompilingService:
         return cls.run_cpp_code(cpp_code=cpp_code, output_path=output_path)
 
     @classmethod
-    def run_cpp_code(cls, cpp_code: str, output_path: str):
+    def run_cpp_code(
+        cls, cpp_code: str, output_path: str, run_args: List[str] | None = None
+    ):
         """Compile and run the generated code.
 
         Args:
             cpp_code (str): The code to compile and run
             output_path (str): The path of the output file
+            run_args (List[str], optional): The arguments of each run of the
+                compiled program, the program is run once with no argument
+                by default. The outputs of the runs are concatenated and a
+                failing run fails the whole call.
 
         Returns:
             str: The output of the code
@@ -212,10 +219,15 @@ class CompilingService:
             "$CXX -Wl,--no-as-needed -ldl -g -fno-rtti -lpthread -fopenmp -std=c++17 -O0 {}.o -o {}.out -ltiramisu -ltiramisu_auto_scheduler -lHalide -lisl".format(
                 output_path, output_path
             ),
-            # Run the program
-            "{}.out".format(output_path),
+            # Run the program once per set of arguments, stopping at the
+            # first failing run whose status is the status of the script
+            " && ".join(
+                f"{output_path}.out {args}".rstrip() for args in run_args or [""]
+            ),
+            "status=$?",
             # Clean generated files
             "rm {}.out {}.o".format(output_path, output_path),
+            "exit $status",
         ]
         try:
             compiler = subprocess.run(
@@ -281,6 +293,9 @@ class CompilingService:
         legality_cpp_code = re.sub(
             r"is_legal &= loop_unrolling_is_legal.*\n", "", legality_cpp_code
         )
+        legality_cpp_code = re.sub(
+            r"is_legal &= loop_vectorization_is_legal.*\n", "", legality_cpp_code
+        )
 
         solver_lines = (
             header
@@ -323,7 +338,9 @@ class CompilingService:
         logger.debug("Skewing Solver Code:\n" + solver_code)
         output_path = os.path.join(
             BaseConfig.base_config.workspace,
-            f"{schedule.tiramisu_program.name}_skewing_solver",
+            # the solver can run for several queries of a program in parallel
+            f"{schedule.tiramisu_program.name}_skewing_solver"
+            f"_{os.getpid()}_{threading.get_ident()}",
         )
 
         result_str = cls.run_cpp_code(cpp_code=solver_code, output_path=output_path)
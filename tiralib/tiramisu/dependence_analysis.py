@@ -0,0 +1,488 @@
+from __future__ import annotations
+
+import itertools
+import math
+import re
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from tiralib.tiramisu.affine_bounds import AffineExpression, AffineParsingError
+from tiralib.tiramisu.tiramisu_actions.matrix import MatrixTransform
+from tiralib.tiramisu.tiramisu_actions.tiramisu_action import (
+    TiramisuAction,
+    TiramisuActionType,
+)
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.schedule import Schedule
+    from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+_WRITE_ACCESS_REGEX = re.compile(r"\{\s*\w+\[(.*)\]\s*->\s*\w+\[(.*)\]\s*\}")
+
+# Free distances (loops that do not appear in the accessed indices, like
+# the reduction loops) are represented by these sample distances
+_FREE_DISTANCES = (-1, 0, 1)
+# Beyond this number of free loops in a dependence, they are left unknown
+_MAX_FREE_LOOPS = 4
+
+# Actions that do not reorder the iterations of the loops they apply to
+_ORDER_PRESERVING_ACTIONS = (
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.UNROLLING,
+    TiramisuActionType.VECTORIZATION,
+)
+
+
+class DependenceAnalysis:
+    """
+    Uniform dependences of a program, extracted from the access matrices of
+    its annotations, used to reject illegal candidates before the legality
+    check of the compiler.
+
+    A dependence links two computations accessing the same buffer element,
+    one of them writing it. Its distance vector is the difference of the
+    iterations of the two accesses on their shared loops, padded with zeros
+    to the depth of the deepest computation and made lexicographically
+    positive. Distances that depend on non-uniform accesses are NaN. Loops
+    that do not appear in the accessed indices take the sample distances
+    -1, 0 and 1, each sample being a separate row. Dependences that can not
+    be described this way are left out, which only makes the filter less
+    selective: a candidate is rejected only if a known dependence certainly
+    becomes lexicographically negative (interchange, reversal and matrix
+    transforms) or is certainly carried by a parallelized loop.
+
+    Attributes:
+    ----------
+    `computations`: `list[str]`
+        The computations of the program.
+    `sources`: `np.ndarray`
+        The position of the first computation of each dependence.
+    `sinks`: `np.ndarray`
+        The position of the second computation of each dependence.
+    `distances`: `np.ndarray`
+        The distance vector of each dependence, one per row.
+    """
+
+    def __init__(
+        self,
+        computations: List[str],
+        sources: np.ndarray,
+        sinks: np.ndarray,
+        distances: np.ndarray,
+    ):
+        self.computations = computations
+        self.sources = sources
+        self.sinks = sinks
+        self.distances = distances
+        self._index_of_computation = {
+            comp: index for index, comp in enumerate(computations)
+        }
+
+    @property
+    def depth(self) -> int:
+        return self.distances.shape[1]
+
+    @classmethod
+    def from_annotations(cls, annotations: dict) -> DependenceAnalysis:
+        """
+        Extracts the dependences of a program from its annotations.
+
+        Parameters
+        ----------
+        `annotations` : `dict`
+            The program annotations, with the access matrices of the
+            computations.
+        """
+        computations = list(annotations["computations"])
+        iterators = annotations["iterators"]
+        depth = max(
+            (len(comp["iterators"]) for comp in annotations["computations"].values()),
+            default=0,
+        )
+
+        # (buffer id, access matrix) of the write and of all the accesses
+        writes: Dict[str, Tuple[int, np.ndarray] | None] = {}
+        accesses: Dict[str, List[Tuple[int, np.ndarray]]] = {}
+        for comp, comp_dict in annotations["computations"].items():
+            write = cls._parse_write_access(comp_dict)
+            writes[comp] = write
+            accesses[comp] = [
+                (access["buffer_id"], np.array(access["access_matrix"], dtype=float))
+                for access in comp_dict["accesses"]
+            ]
+            if write is not None:
+                accesses[comp].append(write)
+
+        rows = set()
+        for source, sink in itertools.product(range(len(computations)), repeat=2):
+            write = writes[computations[source]]
+            if write is None:
+                continue
+            source_dict = annotations["computations"][computations[source]]
+            sink_dict = annotations["computations"][computations[sink]]
+            shared_loops = 0
+            for source_iterator, sink_iterator in zip(
+                source_dict["iterators"], sink_dict["iterators"]
+            ):
+                if source_iterator != sink_iterator:
+                    break
+                shared_loops += 1
+            extents = [
+                cls._get_extent(iterators.get(iterator))
+                for iterator in source_dict["iterators"][:shared_loops]
+            ]
+            for buffer_id, access_matrix in accesses[computations[sink]]:
+                if buffer_id != write[0]:
+                    continue
+                for distance in cls._get_distances(
+                    write[1],
+                    access_matrix,
+                    len(source_dict["iterators"]),
+                    len(sink_dict["iterators"]),
+                    shared_loops,
+                    extents,
+                ):
+                    padded = distance + (0.0,) * (depth - len(distance))
+                    normalized = cls._normalize(np.array(padded))
+                    if normalized is not None:
+                        rows.add(
+                            (min(source, sink), max(source, sink), tuple(normalized))
+                        )
+
+        # sorting makes the analysis deterministic, NaN is sorted as inf
+        sorted_rows = sorted(
+            rows,
+            key=lambda row: (
+                row[0],
+                row[1],
+                tuple(math.inf if math.isnan(value) else value for value in row[2]),
+            ),
+        )
+        return cls(
+            computations,
+            np.array([row[0] for row in sorted_rows], dtype=np.int32),
+            np.array([row[1] for row in sorted_rows], dtype=np.int32),
+            np.array([row[2] for row in sorted_rows], dtype=float).reshape(
+                len(sorted_rows), depth
+            ),
+        )
+
+    @classmethod
+    def _parse_write_access(cls, comp_dict: dict) -> Tuple[int, np.ndarray] | None:
+        # the write access is only given as an ISL relation,
+        # e.g. { comp00[i0, i1] -> buf00[i0, i1 + 1] }
+        match = _WRITE_ACCESS_REGEX.search(comp_dict.get("write_access_relation", ""))
+        if match is None:
+            return None
+        iterators = [name.strip() for name in match.group(1).split(",")]
+        if iterators != comp_dict["iterators"]:
+            return None
+        matrix = []
+        for index in match.group(2).split(","):
+            try:
+                expression = AffineExpression.parse(index.strip())
+            except AffineParsingError:
+                return None
+            if not set(expression.coefficients) <= set(iterators):
+                # the index depends on a parameter
+                return None
+            matrix.append(
+                [expression.coefficients.get(name, 0) for name in iterators]
+                + [expression.constant]
+            )
+        return comp_dict["write_buffer_id"], np.array(matrix, dtype=float)
+
+    @classmethod
+    def _get_extent(cls, iterator: dict | None) -> int | None:
+        # number of iterations of a loop with constant bounds
+        try:
+            return int(iterator["upper_bound"]) - int(iterator["lower_bound"])
+        except (TypeError, KeyError, ValueError):
+            return None
+
+    @classmethod
+    def _get_distances(
+        cls,
+        write_matrix: np.ndarray,
+        access_matrix: np.ndarray,
+        nbr_write_loops: int,
+        nbr_access_loops: int,
+        shared_loops: int,
+        extents: List[int | None],
+    ) -> List[Tuple[float, ...]]:
+        # Solves write(x) = access(y) for d = y - x on the shared loops, when
+        # both accesses have the same linear part, one row (buffer dimension)
+        # at a time. Returns the sample distances, empty if there is no
+        # dependence or it can not be described.
+        if write_matrix.shape[0] != access_matrix.shape[0]:
+            return []
+        distances: List[float | None] = [None] * shared_loops
+        linked_loops = set()
+        for write_row, access_row in zip(write_matrix, access_matrix):
+            if write_row[shared_loops:nbr_write_loops].any():
+                return []
+            if access_row[shared_loops:nbr_access_loops].any():
+                return []
+            coefficients = write_row[:shared_loops]
+            if not np.array_equal(coefficients, access_row[:shared_loops]):
+                return []
+            difference = write_row[-1] - access_row[-1]
+            nonzero = np.flatnonzero(coefficients)
+            if len(nonzero) == 0:
+                if difference != 0:
+                    # different elements of the buffer
+                    return []
+                continue
+            if len(nonzero) > 1:
+                gcd = math.gcd(*(int(value) for value in coefficients[nonzero]))
+                if difference % gcd:
+                    return []
+                linked_loops.update(nonzero.tolist())
+                continue
+            loop = nonzero[0]
+            distance = difference / coefficients[loop]
+            if distance != int(distance):
+                return []
+            if distances[loop] is not None and distances[loop] != distance:
+                return []
+            extent = extents[loop]
+            if extent is not None and abs(distance) >= extent:
+                return []
+            distances[loop] = distance
+
+        free_loops = [
+            loop
+            for loop in range(shared_loops)
+            if distances[loop] is None and loop not in linked_loops
+        ]
+        for loop in linked_loops:
+            distances[loop] = math.nan
+        if len(free_loops) > _MAX_FREE_LOOPS:
+            for loop in free_loops:
+                distances[loop] = math.nan
+            free_loops = []
+
+        samples = []
+        for free_distances in itertools.product(
+            *(
+                _FREE_DISTANCES if extents[loop] is None or extents[loop] > 1 else (0,)
+                for loop in free_loops
+            )
+        ):
+            for loop, distance in zip(free_loops, free_distances):
+                distances[loop] = distance
+            samples.append(tuple(float(distance) for distance in distances))
+        return samples
+
+    @classmethod
+    def _normalize(cls, distance: np.ndarray) -> np.ndarray | None:
+        # Makes the distance lexicographically positive. Zero distances (the
+        # same iteration or an order given by the textual order) are dropped.
+        # When the sign of the leading distance is unknown, the following
+        # distances are unknown too.
+        nonzero = np.flatnonzero(distance != 0)
+        if len(nonzero) == 0:
+            return None
+        leading = nonzero[0]
+        if np.isnan(distance[leading]):
+            distance[leading:] = np.nan
+        elif distance[leading] < 0:
+            distance = -distance
+        return distance
+
+    def get_illegal_candidates_mask(
+        self, schedule: Schedule, candidates: List[TiramisuAction]
+    ) -> np.ndarray:
+        """
+        Returns a boolean mask of the candidate actions that are certainly
+        illegal when added to the schedule.
+
+        Parameters
+        ----------
+        `schedule` : `Schedule`
+            The schedule the candidates would be added to.
+        `candidates` : `List[TiramisuAction]`
+            The candidate actions, initialized or not.
+        """
+        tree = schedule.tree
+        state = self._get_distances_after(schedule.optims_list, tree)
+        return self._get_illegal_mask(state, tree, candidates)
+
+    def _get_illegal_mask(
+        self,
+        state: Tuple[np.ndarray, np.ndarray] | None,
+        tree: TiramisuTree | None,
+        candidates: List[TiramisuAction],
+    ) -> np.ndarray:
+        mask = np.zeros(len(candidates), dtype=bool)
+        if state is None or not len(state[0]) or not candidates:
+            return mask
+        distances, reordered = state
+
+        nbr_candidates = len(candidates)
+        # transformation matrix and parallelized level of each candidate
+        matrices = np.tile(np.eye(self.depth), (nbr_candidates, 1, 1))
+        parallel_levels = np.full(nbr_candidates, -1)
+        checked = np.zeros(nbr_candidates, dtype=bool)
+        relevant = np.zeros((nbr_candidates, len(distances)), dtype=bool)
+        for index, candidate in enumerate(candidates):
+            matrix = self._get_matrix(candidate)
+            if matrix is not None:
+                matrices[index] = matrix
+            elif candidate.type == TiramisuActionType.PARALLELIZATION:
+                parallel_levels[index] = candidate.params[0][1]
+            else:
+                continue
+            comps = self._get_action_comps(candidate, tree)
+            if comps is None:
+                continue
+            checked[index] = True
+            relevant[index] = self._get_relevant_dependences(comps)
+
+        # all the candidates against all the dependences at once
+        transformed = np.einsum("aij,mj->ami", matrices, np.nan_to_num(distances))
+        unknown = np.einsum(
+            "aij,mj->ami", (matrices != 0).astype(float), np.isnan(distances)
+        )
+        transformed[unknown > 0] = np.nan
+        violated = self._is_lexicographically_negative(transformed)
+
+        # The legality check of the compiler does not follow the distances
+        # for parallelizations of reordered loops, they are left to it
+        parallel = parallel_levels >= 0
+        if parallel.any():
+            levels = np.arange(self.depth)
+            before = levels[None, :] < parallel_levels[:, None]
+            at = levels[None, :] == parallel_levels[:, None]
+            outer_zero = ~((distances[None, :, :] != 0) & before[:, None, :]).any(
+                axis=2
+            )
+            carried = (
+                (distances[None, :, :] != 0)
+                & ~np.isnan(distances[None, :, :])
+                & at[:, None, :]
+            ).any(axis=2) & ~reordered[None, :]
+            violated = np.where(parallel[:, None], outer_zero & carried, violated)
+
+        mask[checked] = (violated & relevant).any(axis=1)[checked]
+        return mask
+
+    def filter_candidates(
+        self, schedule: Schedule, candidates: List[TiramisuAction]
+    ) -> List[TiramisuAction]:
+        """
+        Returns the candidate actions that are not certainly illegal when
+        added to the schedule, the ones to send to the legality check.
+        """
+        mask = self.get_illegal_candidates_mask(schedule, candidates)
+        return [
+            candidate
+            for candidate, is_illegal in zip(candidates, mask)
+            if not is_illegal
+        ]
+
+    def is_certainly_illegal(self, schedule: Schedule) -> bool:
+        """
+        Checks if the actions of a schedule certainly violate a dependence.
+        """
+        # the actions of a schedule know their computations, the tree is only
+        # read if it is up to date
+        tree = None if schedule.tree_is_dirty else schedule.tree
+        state = self.distances, np.zeros(len(self), dtype=bool)
+        for action in schedule.optims_list:
+            if self._get_illegal_mask(state, tree, [action])[0]:
+                return True
+            state = self._get_distances_after([action], tree, state)
+            if state is None:
+                return False
+        return False
+
+    def _get_distances_after(
+        self,
+        actions: List[TiramisuAction],
+        tree: TiramisuTree | None,
+        state: Tuple[np.ndarray, np.ndarray] | None = None,
+    ) -> Tuple[np.ndarray, np.ndarray] | None:
+        # the distances once the actions are applied and which of them were
+        # reordered, None if an action changes the loop structure
+        if state is None:
+            state = self.distances, np.zeros(len(self), dtype=bool)
+        distances, reordered = state[0].copy(), state[1].copy()
+        for action in actions:
+            if action.type in _ORDER_PRESERVING_ACTIONS:
+                continue
+            matrix = self._get_matrix(action)
+            comps = self._get_action_comps(action, tree)
+            if matrix is None or comps is None:
+                return None
+            relevant = self._get_relevant_dependences(comps)
+            inside = np.isin(self.sources, comps) | np.isin(self.sinks, comps)
+            transformed = distances[relevant] @ matrix.T
+            unknown = np.isnan(distances[relevant]) @ (matrix.T != 0)
+            transformed[unknown] = np.nan
+            distances[relevant] = transformed
+            # dependences between a transformed computation and another one
+            distances[inside & ~relevant] = np.nan
+            reordered |= inside
+        return distances, reordered
+
+    def _get_matrix(self, action: TiramisuAction) -> np.ndarray | None:
+        # the unimodular matrix of an action on the loop levels, None if the
+        # action is not a loop transformation
+        depth = self.depth
+        if MatrixTransform.is_composable(action):
+            try:
+                return np.array(MatrixTransform.get_action_matrix(action, depth))
+            except IndexError:
+                return None
+        if action.is_matrix():
+            size = math.isqrt(len(action.params))
+            if size * size != len(action.params) or size > depth:
+                return None
+            matrix = np.eye(depth)
+            matrix[:size, :size] = np.array(action.params).reshape(size, size)
+            return matrix
+        return None
+
+    def _get_action_comps(
+        self, action: TiramisuAction, tree: TiramisuTree | None
+    ) -> List[int] | None:
+        # the positions of the computations an action applies to
+        comps = action.comps
+        if not comps and tree is not None:
+            iterator_id = action.params[0]
+            try:
+                if iterator_id not in tree.iterators:
+                    iterator_id = tree.get_iterator_of_computation(*iterator_id).id
+            except (ValueError, KeyError, TypeError):
+                return None
+            comps = tree.get_iterator_subtree_computations(iterator_id)
+        if not comps or isinstance(comps[0], list):
+            return None
+        if any(comp not in self._index_of_computation for comp in comps):
+            return None
+        return [self._index_of_computation[comp] for comp in comps]
+
+    def _get_relevant_dependences(self, comps: List[int]) -> np.ndarray:
+        # dependences between two computations of the action
+        return np.isin(self.sources, comps) & np.isin(self.sinks, comps)
+
+    @classmethod
+    def _is_lexicographically_negative(cls, distances: np.ndarray) -> np.ndarray:
+        # certainly negative: the leading non-zero distance is known and < 0
+        nonzero = (distances != 0) | np.isnan(distances)
+        leading = np.argmax(nonzero, axis=-1)
+        leading_distance = np.take_along_axis(
+            distances, leading[..., None], axis=-1
+        ).squeeze(-1)
+        return nonzero.any(axis=-1) & (leading_distance < 0)
+
+    def __len__(self) -> int:
+        return len(self.distances)
+
+    def __str__(self) -> str:
+        return f"DependenceAnalysis({len(self)} dependences, depth={self.depth})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-import ast
-import re
+import hashlib
 from copy import deepcopy
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, List
 
 from tiralib.tiramisu.compiling_service import CompilingService
+from tiralib.tiramisu.schedule_parser import ScheduleParser
+from tiralib.tiramisu.tiramisu_actions.matrix import MatrixTransform
+from tiralib.tiramisu.tiramisu_actions.skewing import Skewing
 from tiralib.tiramisu.tiramisu_actions.tiramisu_action import TiramisuActionType
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
 if TYPE_CHECKING:
+    from .function_server import FunctionServer, ResultInterface
     from .tiramisu_actions.tiramisu_action import TiramisuAction
 
-from tiralib.tiramisu import tiramisu_actions
 from tiralib.tiramisu.tiramisu_program import TiramisuProgram
 
 
@@ -28,20 +30,55 @@ class Schedule:
         The list of optimizations to be applied to the Tiramisu program.
     """
 
-    def __init__(self, tiramisu_program: TiramisuProgram | None = None) -> None:
+    def __init__(
+        self,
+        tiramisu_program: TiramisuProgram | None = None,
+        defer_tree_updates: bool = False,
+    ) -> None:
         self.tiramisu_program = tiramisu_program
         self.optims_list: List[TiramisuAction] = []
+        # When set, structural actions only mark the tree as dirty and the
+        # tree is recomputed from the ISL AST the next time it is read
+        self.defer_tree_updates = defer_tree_updates
+        self._tree_is_dirty = False
         if tiramisu_program:
             self.tree = deepcopy(tiramisu_program.tree)
         else:
             self.tree = None
         self.legality: bool | None = None
 
+    @property
+    def tree(self) -> TiramisuTree | None:
+        """
+        The schedule tree. If structural actions were added in deferred mode,
+        the tree is recomputed from the ISL AST before being returned.
+        """
+        if self._tree_is_dirty:
+            self.update_tree_from_isl_ast()
+        return self._tree
+
+    @tree.setter
+    def tree(self, tree: TiramisuTree | None) -> None:
+        self._tree = tree
+        self._tree_is_dirty = False
+
+    @property
+    def tree_is_dirty(self) -> bool:
+        """
+        Whether the schedule tree is stale and has to be recomputed from
+        the ISL AST before being used.
+        """
+        return self._tree_is_dirty
+
     def set_tiramisu_program(self, tiramisu_program: TiramisuProgram) -> None:
         self.tiramisu_program = tiramisu_program
         self.tree = deepcopy(tiramisu_program.tree)
 
-    def add_optimizations(self, list_optim_cmds: List[TiramisuAction]) -> None:
+    def add_optimizations(
+        self,
+        list_optim_cmds: List[TiramisuAction],
+        defer_tree_updates: bool | None = None,
+    ) -> None:
         """
         Adds a list of optimizations to the schedule while maintaining the
         schedule tree. The order of the optimizations in the list is important.
@@ -49,15 +86,36 @@ class Schedule:
         Parameters
         ----------
         `list_optim_cmds` : `List[TiramisuAction]`
-            The list of optimizations to be added to the schedule.
+            The list of optimizations to be added to the schedule. The
+            actions that are already initialized for a tree are copied.
+        `defer_tree_updates` : `bool | None`
+            If True, structural actions (fusion, distribution and tiling) only
+            mark the tree as dirty instead of recomputing it from the ISL AST.
+            The tree is then recomputed once, the next time an action is
+            initialized or `schedule.tree` is read. Defaults to the value
+            given to the constructor.
+
+            Consecutive structural actions are not coalesced into a single
+            ISL query: an action is initialized on the tree left by the
+            previous ones (its computations and the code it generates depend
+            on it), so each structural action followed by another action
+            still costs one query.
         """
-        if self.tree is None:
+        if self._tree is None:
             raise Exception("No Tiramisu program to apply the schedule to")
 
+        if defer_tree_updates is None:
+            defer_tree_updates = self.defer_tree_updates
+
         self.legality = None
 
         for optim_cmd in list_optim_cmds:
+            # actions are initialized once, the ones already initialized
+            # for a tree (shared with another schedule) are copied
+            if optim_cmd.tree is not None:
+                optim_cmd = optim_cmd.copy()
             # initialize action for the schedule tree
+            # (reading self.tree materializes it if it is dirty)
             optim_cmd.initialize_action_for_tree(self.tree)
 
             self.optims_list.append(optim_cmd)
@@ -69,14 +127,20 @@ class Schedule:
                 or optim_cmd.is_distribution()
                 or optim_cmd.is_any_tiling()
             ):
-                self.update_tree_from_isl_ast()
+                if defer_tree_updates:
+                    self._tree_is_dirty = True
+                else:
+                    self.update_tree_from_isl_ast()
 
     def pop_optimization(self) -> TiramisuAction:
         """
         Removes the last optimization from the schedule and returns it.
         """
         action = self.optims_list.pop()
-        self.update_tree_from_isl_ast()
+        if self.defer_tree_updates:
+            self._tree_is_dirty = True
+        else:
+            self.update_tree_from_isl_ast()
         return action
 
     def execute(
@@ -119,8 +183,9 @@ class Schedule:
         if self.tiramisu_program is None:
             raise Exception("No Tiramisu program to apply the schedule to")
 
-        if self.tiramisu_program.server:
-            result = self.tiramisu_program.server.run(
+        server = self.get_function_server()
+        if server:
+            result = server.run(
                 operation="execution",
                 schedule=self,
                 nbr_executions=min_runs,
@@ -157,27 +222,24 @@ class Schedule:
         if self.tiramisu_program is None:
             raise Exception("No Tiramisu program to apply the schedule to")
 
-        if self.tiramisu_program.server:
-            result = self.tiramisu_program.server.run("legality", self)
+        # schedules that certainly violate a dependence of the program are
+        # rejected without compiling anything
+        if (
+            self.tiramisu_program.annotations
+            and self.tiramisu_program.get_dependence_analysis().is_certainly_illegal(
+                self
+            )
+        ):
+            self.legality = False
+            return False
+
+        server = self.get_function_server()
+        if server:
+            result = server.run("legality", self)
             self.tree = TiramisuTree.from_isl_ast_string_list(
                 isl_ast_string_list=result.isl_ast.split("\n")
             )
-            self.legality = result.legality
-
-            # Update the skewing factors if they are not set
-            if result.additional_info:
-                if "skewing_factors" in result.additional_info:
-                    for action in self.optims_list:
-                        if action.type == TiramisuActionType.SKEWING:
-                            if action.params[2] == 0:
-                                factors = result.additional_info.replace(
-                                    "skewing_factors:", ""
-                                ).split(",")
-                                factors = [int(factor) for factor in factors]
-                                action.params[2] = factors[0]
-                                action.params[3] = factors[1]
-                                action.factors = factors
-                                action.set_string_representations(self.tree)
+            self.set_legality_from_server_result(result)
             return result.legality
 
         legality, new_tree = CompilingService.compile_legality(self, with_ast=with_ast)
@@ -189,6 +251,53 @@ class Schedule:
             self.tree = new_tree
         return self.legality
 
+    def get_function_server(self) -> FunctionServer | None:
+        """
+        Returns the function server to run the schedule on, or None if the
+        schedule has to be compiled with the `CompilingService`: when the
+        program has no server or the schedule has actions that the parser
+        of the server does not support (vectorizations and matrix
+        transforms).
+        """
+        if self.tiramisu_program is None or self.tiramisu_program.server is None:
+            return None
+        if any(
+            action.is_vectorization() or action.is_matrix()
+            for action in self.optims_list
+        ):
+            return None
+        return self.tiramisu_program.server
+
+    def set_legality_from_server_result(self, result: ResultInterface) -> None:
+        """
+        Sets the legality of the schedule from the result of a legality run
+        of the function server and fills in the skewing factors that were
+        left for the server to find.
+
+        Parameters
+        ----------
+        `result` : `ResultInterface`
+            The result of `FunctionServer.run("legality", schedule)`.
+        """
+        self.legality = result.legality
+
+        # Replace the skewings whose factors were not set, actions are
+        # immutable
+        if result.additional_info:
+            if "skewing_factors" in result.additional_info:
+                for index, action in enumerate(self.optims_list):
+                    if action.type == TiramisuActionType.SKEWING:
+                        if action.params[2] == 0:
+                            factors = result.additional_info.replace(
+                                "skewing_factors:", ""
+                            ).split(",")
+                            factors = [int(factor) for factor in factors]
+                            skewing = Skewing(
+                                [*action.params[:2], *factors], action.comps
+                            )
+                            skewing.initialize_action_for_tree(action.tree)
+                            self.optims_list[index] = skewing
+
     def update_tree_from_isl_ast(self):
         """
         Updates the schedule tree from the isl ast.
@@ -196,8 +305,9 @@ class Schedule:
         if self.tiramisu_program is None:
             raise Exception("No Tiramisu program to apply the schedule to")
 
-        if self.tiramisu_program.server:
-            result = self.tiramisu_program.server.run("legality", self)
+        server = self.get_function_server()
+        if server:
+            result = server.run("legality", self)
             self.tree = TiramisuTree.from_isl_ast_string_list(
                 isl_ast_string_list=result.isl_ast.split("\n")
             )
@@ -211,205 +321,179 @@ class Schedule:
     def from_sched_str(
         cls, sched_str: str, tiramisu_program: TiramisuProgram
     ) -> "Schedule":
-        schedule = cls(tiramisu_program)
+        """
+        Creates a schedule from its string representation.
+
+        Parameters
+        ----------
+        `sched_str` : `str`
+            The string representation of the schedule, either as produced by
+            `str(schedule)` or in the legacy dataset format
+            (`{comp00}:I(L0,L1)P(L0)`).
+        `tiramisu_program` : `TiramisuProgram`
+            The Tiramisu program to which the schedule will be applied.
+        """
+        # Replaying a schedule only needs the tree when an action is
+        # initialized, so the tree updates are deferred and a trailing
+        # structural action does not query the ISL AST
+        schedule = cls(tiramisu_program, defer_tree_updates=True)
         assert schedule.tree
-        for optimization_str in sched_str.split("|"):
-            if optimization_str == "":
-                continue
-            if optimization_str[0] == "P":
-                # extract loop level and comps using P\(L(\d),comps=\[([\w',]*)
-                regex = r"P\(L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Parallelization(
-                                [(comps[0], loop_level)],
-                            )
-                        ]
-                    )
-
-            elif optimization_str[0] == "U":
-                # extract loop level, factor and comps using
-                # U\(L(\d),(\d+),comps=\[([\w',]*)\]\)
-                regex = r"U\(L(\d),(\d+),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    factor = int(match.group(2))
-                    comps = match.group(3).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Unrolling(
-                                [
-                                    (comps[0], loop_level),
-                                    factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "I":
-                regex = r"I\(L(\d),L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    first_loop_level = int(match.group(1))
-                    second_loop_level = int(match.group(2))
-                    comps = match.group(3).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Interchange(
-                                [
-                                    (comps[0], first_loop_level),
-                                    (comps[0], second_loop_level),
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "R":
-                regex = r"R\(L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Reversal(
-                                [(comps[0], loop_level)],
-                            )
-                        ]
-                    )
-            elif optimization_str[:2] == "T2":
-                regex = r"T2\(L(\d),L(\d),(\d+),(\d+),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    outer_loop_level = int(match.group(1))
-                    inner_loop_level = int(match.group(2))
-                    outer_loop_factor = int(match.group(3))
-                    inner_loop_factor = int(match.group(4))
-                    comps = match.group(5).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Tiling2D(
-                                [
-                                    (comps[0], outer_loop_level),
-                                    (comps[0], inner_loop_level),
-                                    outer_loop_factor,
-                                    inner_loop_factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[:2] == "T3":
-                regex = (
-                    r"T3\(L(\d),L(\d),L(\d),(\d+),(\d+),(\d+),comps=\[([\w', ]*)\]\)"  # noqa: E501
-                )
-                match = re.match(regex, optimization_str)
-                if match:
-                    outer_loop_level = int(match.group(1))
-                    middle_loop_level = int(match.group(2))
-                    inner_loop_level = int(match.group(3))
-                    outer_loop_factor = int(match.group(4))
-                    middle_loop_factor = int(match.group(5))
-                    inner_loop_factor = int(match.group(6))
-                    comps = match.group(7).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Tiling3D(
-                                [
-                                    (comps[0], outer_loop_level),
-                                    (comps[0], middle_loop_level),
-                                    (comps[0], inner_loop_level),
-                                    outer_loop_factor,
-                                    middle_loop_factor,
-                                    inner_loop_factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "S":
-                regex = r"S\(L(\d),L(\d),(-?\d+),(-?\d+),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    outer_loop_level = int(match.group(1))
-                    inner_loop_level = int(match.group(2))
-                    outer_loop_factor = int(match.group(3))
-                    inner_loop_factor = int(match.group(4))
-                    comps = match.group(5).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Skewing(
-                                [
-                                    (comps[0], outer_loop_level),
-                                    (comps[0], inner_loop_level),
-                                    outer_loop_factor,
-                                    inner_loop_factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "F":
-                regex = r"F\(L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Fusion(
-                                [
-                                    (comps[0], loop_level),
-                                    (comps[1], loop_level),
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "D":
-                regex = r"D\(L(\d),comps=\[([\w', ]*)\],distribution=([\[\]'\w, ]*)\)"  # noqa: E501
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    distribution = ast.literal_eval(match.group(3))
-                    assert isinstance(distribution, list)
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Distribution(
-                                [
-                                    (comps[0], loop_level),
-                                ],
-                                distribution,
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "E":
-                regex = r"E\(comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    comp = match.group(1).strip("' ")
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Expansion(
-                                [comp],
-                            )
-                        ]
-                    )
-            elif optimization_str[:2] == "TG":
-                raise NotImplementedError
-                # regex =
+        schedule.add_optimizations(ScheduleParser.parse(sched_str))
 
+        schedule.defer_tree_updates = False
         return schedule
 
+    @classmethod
+    def from_sched_strs(
+        cls, sched_strs: List[str], tiramisu_program: TiramisuProgram
+    ) -> List["Schedule"]:
+        """
+        Creates schedules from a list of string representations.
+
+        The schedules are replayed in deferred mode and the trees obtained
+        after structural actions are shared between schedules with the same
+        prefix, so each distinct prefix costs at most one ISL query.
+
+        Parameters
+        ----------
+        `sched_strs` : `List[str]`
+            The string representations of the schedules.
+        `tiramisu_program` : `TiramisuProgram`
+            The Tiramisu program to which the schedules will be applied.
+
+        Returns
+        -------
+        The list of schedules in the same order as `sched_strs`.
+        """
+        # trees obtained after replaying a given prefix of actions
+        trees_cache: Dict[str, TiramisuTree] = {}
+        schedules: List[Schedule] = []
+
+        for sched_str in sched_strs:
+            schedule = cls(tiramisu_program, defer_tree_updates=True)
+            assert schedule.tree
+            dirty_prefix: str | None = None
+
+            for action in ScheduleParser.parse(sched_str):
+                if dirty_prefix is not None:
+                    # the tree is read by the next action anyway,
+                    # so materialize it once and share it
+                    trees_cache[dirty_prefix] = deepcopy(schedule.tree)
+                    dirty_prefix = None
+
+                schedule.add_optimizations([action])
+
+                if schedule.tree_is_dirty:
+                    prefix = str(schedule)
+                    if prefix in trees_cache:
+                        schedule.tree = deepcopy(trees_cache[prefix])
+                    else:
+                        dirty_prefix = prefix
+
+            schedule.defer_tree_updates = False
+            schedules.append(schedule)
+
+        return schedules
+
+    def canonical(self) -> Schedule:
+        """
+        Returns an equivalent schedule in normal form.
+
+        The normal form cancels adjacent reversals of the same loop and
+        adjacent interchanges of the same pair of loops, and orders runs of
+        consecutive parallelizations, unrollings and vectorizations, which
+        commute when they target different loops, by the loop they target.
+        Schedules that only differ by these syntactic variations have the
+        same canonical form.
+        """
+        canonical_schedule = Schedule(self.tiramisu_program, defer_tree_updates=True)
+        canonical_schedule.add_optimizations(self._get_canonical_actions())
+        canonical_schedule.defer_tree_updates = self.defer_tree_updates
+        return canonical_schedule
+
+    def canonical_hash(self) -> str:
+        """
+        Returns a hash of the canonical form of the schedule that is stable
+        across processes. Equivalent schedules have the same hash, the
+        actions being compared on the computations resolved from the tree.
+        """
+        canonical_keys = tuple(
+            action.canonical_key() for action in self._get_canonical_actions()
+        )
+        return hashlib.sha256(repr(canonical_keys).encode()).hexdigest()
+
+    @classmethod
+    def deduplicate(cls, schedules: List[Schedule]) -> List[Schedule]:
+        """
+        Removes the schedules that are equivalent to a previous schedule of
+        the list, keeping the first occurrence of each canonical form.
+        """
+        seen_hashes = set()
+        unique_schedules = []
+        for schedule in schedules:
+            schedule_hash = schedule.canonical_hash()
+            if schedule_hash not in seen_hashes:
+                seen_hashes.add(schedule_hash)
+                unique_schedules.append(schedule)
+        return unique_schedules
+
+    def compose_unimodular_actions(self) -> Schedule:
+        """
+        Returns an equivalent schedule where every run of consecutive
+        interchanges and reversals applied to the same computations is
+        folded into one `MatrixTransform` per computation. A single
+        `matrix_transform` call and legality snippet then replaces the
+        snippets of every action of the run. The original actions can be
+        recovered with `MatrixTransform.decompose`.
+        """
+        actions: List[TiramisuAction] = []
+        run: List[TiramisuAction] = []
+        for action in self.optims_list:
+            if MatrixTransform.is_composable(action) and (
+                not run or action.comps == run[0].comps
+            ):
+                run.append(action)
+                continue
+            actions.extend(_fold_unimodular_run(run))
+            run = [action] if MatrixTransform.is_composable(action) else []
+            if not run:
+                actions.append(action)
+        actions.extend(_fold_unimodular_run(run))
+
+        composed_schedule = Schedule(self.tiramisu_program, defer_tree_updates=True)
+        composed_schedule.add_optimizations(actions)
+        composed_schedule.defer_tree_updates = self.defer_tree_updates
+        return composed_schedule
+
+    def _get_canonical_actions(self) -> List[TiramisuAction]:
+        # Cancel adjacent actions that undo each other
+        actions: List[TiramisuAction] = []
+        for action in self.optims_list:
+            if actions and _cancel_each_other(actions[-1], action):
+                actions.pop()
+            else:
+                actions.append(action)
+
+        # Order the runs of parallelizations, unrollings and vectorizations
+        # by the loop they target. The sort is stable so actions on the same
+        # loop keep their relative order.
+        canonical_actions: List[TiramisuAction] = []
+        run: List[TiramisuAction] = []
+        for action in actions:
+            if (
+                action.is_parallelization()
+                or action.is_unrolling()
+                or action.is_vectorization()
+            ):
+                run.append(action)
+                continue
+            canonical_actions.extend(sorted(run, key=_loop_key))
+            run = []
+            canonical_actions.append(action)
+        canonical_actions.extend(sorted(run, key=_loop_key))
+
+        return canonical_actions
+
     def __str__(self) -> str:
         """
         Generates a string representation of the schedule.
@@ -435,3 +519,33 @@ class Schedule:
 
     def __bool__(self) -> bool:
         return bool(self.optims_list)
+
+
+def _loop_key(action: TiramisuAction) -> tuple:
+    # the loop targeted by a parallelization, an unrolling or a vectorization
+    return (action.iterator_id[1], action.iterator_id[0])
+
+
+def _cancel_each_other(first: TiramisuAction, second: TiramisuAction) -> bool:
+    if first.comps != second.comps:
+        return False
+    if first.is_reversal() and second.is_reversal():
+        return first.iterator_id == second.iterator_id
+    if first.is_interchange() and second.is_interchange():
+        return sorted(param[1] for param in first.params) == sorted(
+            param[1] for param in second.params
+        )
+    return False
+
+
+def _fold_unimodular_run(run: List[TiramisuAction]) -> List[TiramisuAction]:
+    if len(run) < 2:
+        return run
+    # the tree the first action of the run was initialized with
+    tree = run[0].tree
+    return [
+        MatrixTransform.from_actions(
+            run, comp, tree.get_iterator_of_computation(comp).level + 1
+        )
+        for comp in run[0].comps
+    ]
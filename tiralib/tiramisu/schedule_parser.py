@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import re
+from typing import Any, List, Tuple
+
+from tiralib.tiramisu import tiramisu_actions
+from tiralib.tiramisu.tiramisu_actions.tiramisu_action import TiramisuAction
+
+# A single master regex is used to tokenize the whole schedule string in one
+# pass. The order of the alternatives matters: loop levels (L0, L12) must be
+# matched before generic names.
+_TOKEN_REGEX = re.compile(
+    r"""
+    (?P<loop>L(?P<loop_level>-?\d+)(?![\w]))
+    |(?P<int>-?\d+)
+    |(?P<name>[A-Za-z_]\w*)
+    |'(?P<squote>[^']*)'
+    |"(?P<dquote>[^"]*)"
+    |(?P<punct>[()\[\]{},:=|])
+    |(?P<space>\s+)
+    |(?P<error>.)
+    """,
+    re.VERBOSE,
+)
+
+# Token kinds
+LOOP = "loop"
+INT = "int"
+NAME = "name"
+STRING = "string"
+PUNCT = "punct"
+END = "end"
+
+Token = Tuple[str, Any]
+
+ACTION_NAMES = {"P", "U", "V", "I", "R", "S", "T2", "T3", "TG", "F", "D", "E", "M"}
+
+
+class ScheduleParsingError(Exception):
+    """Raised when a schedule string cannot be parsed."""
+
+    pass
+
+
+class ScheduleParser:
+    """Single pass parser that turns schedule strings into lists of actions.
+
+    The parser accepts the string representation produced by
+    `Schedule.__str__` (actions separated by `|`, e.g.
+    `P(L0,comps=['comp00'])|U(L1,4,comps=['comp00'])`) as well as the legacy
+    dataset representation where the computations are given once as a prefix
+    and actions are concatenated, e.g. `{comp00}:I(L0,L1)T2(L1,L0,32,32)`.
+
+    Parsing never touches the schedule tree: the returned actions still need
+    to be added to a `Schedule` to be initialized.
+    """
+
+    @classmethod
+    def tokenize(cls, sched_str: str) -> List[Token]:
+        """Split a schedule string into a list of `(kind, value)` tokens."""
+        tokens: List[Token] = []
+        append = tokens.append
+        for match in _TOKEN_REGEX.finditer(sched_str):
+            kind = match.lastgroup
+            if kind == "space":
+                continue
+            if kind == "loop":
+                append((LOOP, int(match.group("loop_level"))))
+            elif kind == "int":
+                append((INT, int(match.group("int"))))
+            elif kind == "name":
+                append((NAME, match.group("name")))
+            elif kind == "squote":
+                append((STRING, match.group("squote")))
+            elif kind == "dquote":
+                append((STRING, match.group("dquote")))
+            elif kind == "punct":
+                append((PUNCT, match.group("punct")))
+            else:
+                raise ScheduleParsingError(
+                    f"Unexpected character {match.group()!r} at position "
+                    f"{match.start()} in schedule {sched_str!r}"
+                )
+        append((END, None))
+        return tokens
+
+    @classmethod
+    def parse(cls, sched_str: str) -> List[TiramisuAction]:
+        """
+        Parses a schedule string into a list of uninitialized actions.
+
+        Parameters
+        ----------
+        `sched_str` : `str`
+            The schedule string to parse.
+
+        Returns
+        -------
+        The list of `TiramisuAction` objects in the order they appear
+        in the string.
+        """
+        tokens = cls.tokenize(sched_str)
+        actions: List[TiramisuAction] = []
+        default_comps: List[str] | None = None
+        position = 0
+
+        while tokens[position][0] != END:
+            kind, value = tokens[position]
+            if kind == PUNCT and value == "|":
+                position += 1
+            elif kind == PUNCT and value == "{":
+                # legacy prefix giving the computations of the next actions
+                default_comps, position = cls._parse_sequence(
+                    tokens, position + 1, "}", sched_str
+                )
+                default_comps = [str(comp) for comp in default_comps]
+                position = cls._expect(tokens, position, ":", sched_str)
+            elif kind == NAME and value in ACTION_NAMES:
+                arguments, keywords, position = cls._parse_arguments(
+                    tokens, position + 1, sched_str
+                )
+                actions.append(
+                    cls._build_action(
+                        value, arguments, keywords, default_comps, sched_str
+                    )
+                )
+            else:
+                raise ScheduleParsingError(
+                    f"Unexpected token {value!r} in schedule {sched_str!r}"
+                )
+
+        return actions
+
+    @classmethod
+    def _expect(
+        cls, tokens: List[Token], position: int, punct: str, sched_str: str
+    ) -> int:
+        kind, value = tokens[position]
+        if kind != PUNCT or value != punct:
+            raise ScheduleParsingError(
+                f"Expected {punct!r} but found {value!r} in schedule {sched_str!r}"
+            )
+        return position + 1
+
+    @classmethod
+    def _parse_value(
+        cls, tokens: List[Token], position: int, sched_str: str
+    ) -> Tuple[Any, int]:
+        kind, value = tokens[position]
+        if kind == LOOP:
+            # loop levels are kept as ("L", level) to tell them apart
+            # from integer factors
+            return ("L", value), position + 1
+        if kind in (INT, STRING, NAME):
+            return value, position + 1
+        if kind == PUNCT and value == "[":
+            return cls._parse_sequence(tokens, position + 1, "]", sched_str)
+        if kind == PUNCT and value == "(":
+            sequence, position = cls._parse_sequence(
+                tokens, position + 1, ")", sched_str
+            )
+            return tuple(sequence), position
+        raise ScheduleParsingError(
+            f"Unexpected token {value!r} in schedule {sched_str!r}"
+        )
+
+    @classmethod
+    def _parse_sequence(
+        cls, tokens: List[Token], position: int, closing: str, sched_str: str
+    ) -> Tuple[list, int]:
+        sequence: list = []
+        if tokens[position] == (PUNCT, closing):
+            return sequence, position + 1
+        while True:
+            value, position = cls._parse_value(tokens, position, sched_str)
+            sequence.append(value)
+            kind, punct = tokens[position]
+            if kind == PUNCT and punct == ",":
+                position += 1
+            elif kind == PUNCT and punct == closing:
+                return sequence, position + 1
+            else:
+                raise ScheduleParsingError(
+                    f"Expected ',' or {closing!r} but found {punct!r} "
+                    f"in schedule {sched_str!r}"
+                )
+
+    @classmethod
+    def _parse_arguments(
+        cls, tokens: List[Token], position: int, sched_str: str
+    ) -> Tuple[list, dict, int]:
+        position = cls._expect(tokens, position, "(", sched_str)
+        arguments: list = []
+        keywords: dict = {}
+        if tokens[position] == (PUNCT, ")"):
+            return arguments, keywords, position + 1
+        while True:
+            kind, value = tokens[position]
+            if kind == NAME and tokens[position + 1] == (PUNCT, "="):
+                keywords[value], position = cls._parse_value(
+                    tokens, position + 2, sched_str
+                )
+            else:
+                argument, position = cls._parse_value(tokens, position, sched_str)
+                arguments.append(argument)
+            kind, punct = tokens[position]
+            if kind == PUNCT and punct == ",":
+                position += 1
+            elif kind == PUNCT and punct == ")":
+                return arguments, keywords, position + 1
+            else:
+                raise ScheduleParsingError(
+                    f"Expected ',' or ')' but found {punct!r} in schedule {sched_str!r}"
+                )
+
+    @classmethod
+    def _build_action(  # noqa: C901
+        cls,
+        action_name: str,
+        arguments: list,
+        keywords: dict,
+        default_comps: List[str] | None,
+        sched_str: str,
+    ) -> TiramisuAction:
+        comps = keywords.get("comps", default_comps)
+        if not comps:
+            raise ScheduleParsingError(
+                f"No computations given for {action_name} in schedule {sched_str!r}"
+            )
+        comps = [str(comp) for comp in comps]
+
+        levels = [arg[1] for arg in arguments if isinstance(arg, tuple)]
+        factors = [arg for arg in arguments if isinstance(arg, int)]
+
+        try:
+            if action_name == "P":
+                return tiramisu_actions.Parallelization([(comps[0], levels[0])])
+            elif action_name == "U":
+                return tiramisu_actions.Unrolling([(comps[0], levels[0]), factors[0]])
+            elif action_name == "V":
+                return tiramisu_actions.Vectorization(
+                    [(comps[0], levels[0]), factors[0]]
+                )
+            elif action_name == "I":
+                return tiramisu_actions.Interchange(
+                    [(comps[0], levels[0]), (comps[0], levels[1])]
+                )
+            elif action_name == "R":
+                return tiramisu_actions.Reversal([(comps[0], levels[0])])
+            elif action_name == "S":
+                return tiramisu_actions.Skewing(
+                    [(comps[0], levels[0]), (comps[0], levels[1]), *factors[:2]]
+                )
+            elif action_name == "T2":
+                return tiramisu_actions.Tiling2D(
+                    [(comps[0], levels[0]), (comps[0], levels[1]), *factors[:2]]
+                )
+            elif action_name == "T3":
+                return tiramisu_actions.Tiling3D(
+                    [
+                        (comps[0], levels[0]),
+                        (comps[0], levels[1]),
+                        (comps[0], levels[2]),
+                        *factors[:3],
+                    ]
+                )
+            elif action_name == "TG":
+                return tiramisu_actions.TilingGeneral(
+                    cls._tiling_general_iterators(levels, comps) + factors,
+                    comps=comps,
+                )
+            elif action_name == "F":
+                return tiramisu_actions.Fusion(
+                    [(comps[0], levels[0]), (comps[1], levels[0])]
+                )
+            elif action_name == "D":
+                return tiramisu_actions.Distribution(
+                    [(comps[0], levels[0])], keywords.get("distribution")
+                )
+            elif action_name == "E":
+                return tiramisu_actions.Expansion([comps[0]])
+            elif action_name == "M":
+                return tiramisu_actions.MatrixTransform(arguments[0], comps)
+        except (IndexError, AssertionError) as error:
+            raise ScheduleParsingError(
+                f"Invalid arguments for {action_name} in schedule {sched_str!r}"
+            ) from error
+
+        raise ScheduleParsingError(
+            f"Unknown action {action_name} in schedule {sched_str!r}"
+        )
+
+    @classmethod
+    def _tiling_general_iterators(
+        cls, levels: List[int], comps: List[str]
+    ) -> List[Tuple[str, int]]:
+        # The string representation of a general tiling only keeps the levels
+        # of the iterators and the computations of the tiled iterators (in the
+        # order of the iterators). Iterators without computations are the
+        # outermost ones, so the computations are aligned to the innermost
+        # iterators and the remaining ones are identified by the first
+        # computation, which is nested in all of them.
+        nbr_missing = max(len(levels) - len(comps), 0)
+        aligned_comps = [comps[0]] * nbr_missing + comps[
+            max(len(comps) - len(levels), 0) :
+        ]
+        return [(comp, level) for comp, level in zip(aligned_comps, levels)]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
+
+from tiralib.tiramisu.schedule import Schedule
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.function_server import ResultInterface
+    from tiralib.tiramisu.tiramisu_actions.tiramisu_action import TiramisuAction
+    from tiralib.tiramisu.tiramisu_program import TiramisuProgram
+
+
+class ServerResultCache:
+    """
+    A cache of the results of the function server of a Tiramisu program,
+    used to explore one search path by pushing and popping actions.
+
+    The cache keeps the schedule of the current state in deferred mode and
+    the result of every state already queried, keyed by the schedule string.
+    The server is still run, as a new process, once for each new state:
+    that run answers the legality query, the ISL AST query and the tree
+    update needed by structural actions of the state, and popping an action
+    restores the tree of the previous state without running the server
+    again.
+
+    Parameters
+    ----------
+    `tiramisu_program` : `TiramisuProgram`
+        The Tiramisu program, initialized with a function server.
+    `actions` : `List[TiramisuAction] | None`
+        Actions to push when the cache is created.
+    """
+
+    def __init__(
+        self,
+        tiramisu_program: TiramisuProgram,
+        actions: List[TiramisuAction] | None = None,
+    ) -> None:
+        if tiramisu_program.server is None:
+            raise Exception("No function server to cache the results of")
+
+        self.tiramisu_program = tiramisu_program
+        self.schedule = Schedule(tiramisu_program, defer_tree_updates=True)
+        # tree of the schedule before each pushed action
+        self._trees_stack: List[TiramisuTree] = []
+        # server results of the states already queried
+        self._results: Dict[str, ResultInterface] = {}
+
+        for action in actions or []:
+            self.push(action)
+
+    def push(self, action: TiramisuAction) -> None:
+        """
+        Applies an action on top of the current state.
+
+        Parameters
+        ----------
+        `action` : `TiramisuAction`
+            The action to apply. It is initialized for the current tree.
+            Vectorizations are rejected, the server does not support them.
+        """
+        if action.is_vectorization():
+            raise Exception(
+                "Vectorizations are not supported by the function server, "
+                "use a schedule compiled with the CompilingService instead"
+            )
+        tree = self.get_tree()
+        self.schedule.add_optimizations([action])
+        self._trees_stack.append(tree)
+
+    def pop(self) -> TiramisuAction:
+        """
+        Removes the last pushed action and returns it.
+        """
+        if not self._trees_stack:
+            raise Exception("No action to pop from the cache")
+
+        action = self.schedule.optims_list.pop()
+        self.schedule.tree = self._trees_stack.pop()
+        result = self._results.get(str(self.schedule))
+        self.schedule.legality = result.legality if result else None
+        return action
+
+    def is_legal(self) -> bool:
+        """
+        Checks if the schedule of the current state is legal.
+        """
+        result = self._get_result()
+        # the tree is refreshed from the same result before it is read
+        # to update the skewing factors
+        self.get_tree()
+        self.schedule.set_legality_from_server_result(result)
+        return result.legality
+
+    def get_isl_ast(self) -> str:
+        """
+        Returns the ISL AST of the current state.
+        """
+        return self._get_result().isl_ast
+
+    def get_tree(self) -> TiramisuTree:
+        """
+        Returns the tree of the current state, recomputing it from the ISL
+        AST if the last structural action left it dirty.
+        """
+        if self.schedule.tree_is_dirty:
+            self.schedule.tree = TiramisuTree.from_isl_ast_string_list(
+                self.get_isl_ast().split("\n")
+            )
+        return self.schedule.tree
+
+    def close(self) -> None:
+        """
+        Drops the cached results and the pushed actions.
+        """
+        self._results.clear()
+        while self._trees_stack:
+            self.pop()
+
+    def _get_result(self) -> ResultInterface:
+        sched_str = str(self.schedule)
+        if sched_str not in self._results:
+            assert self.tiramisu_program.server
+            self._results[sched_str] = self.tiramisu_program.server.run(
+                "legality", self.schedule
+            )
+        return self._results[sched_str]
+
+    def __enter__(self) -> ServerResultCache:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.schedule)
+
+    def __str__(self) -> str:
+        return f"ServerResultCache({self.schedule})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
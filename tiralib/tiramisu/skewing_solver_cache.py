@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from tiralib.config import BaseConfig
+from tiralib.tiramisu.compiling_service import CompilingService
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.schedule import Schedule
+
+logger = logging.getLogger(__name__)
+
+# (program hash, canonical hash of the schedule, loop levels, computations)
+SolverKey = Tuple[str, str, Tuple[int, ...], Tuple[str, ...]]
+SolverQuery = Tuple[List[int], List[str]]
+
+
+class SkewingSolverCache:
+    """
+    Memoises the results of the skewing solver.
+
+    The solver compiles and runs a whole generator to get two factors, and
+    the same query is repeated often during a search. The results, including
+    the queries without a solution, are kept in an LRU keyed by the hash of
+    the program, the canonical hash of the schedule the loops are skewed
+    after, the levels of the loops and the skewed computations. When a
+    `store_path` is given, the results are also persisted in a sqlite
+    database and shared between runs.
+
+    Attributes:
+    ----------
+
+    `max_size`: `int`
+        The number of results kept in memory.
+
+    `store_path`: `str | None`
+        The path of the sqlite database the results are persisted in.
+
+    `hits`: `int`
+        The number of queries answered from the memory or the store.
+
+    `misses`: `int`
+        The number of queries the solver was called for.
+    """
+
+    _default: SkewingSolverCache | None = None
+
+    def __init__(self, max_size: int = 4096, store_path: str | None = None):
+        self.max_size = max_size
+        self.store_path = store_path
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[SolverKey, Tuple[int, int] | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        if store_path is not None:
+            self._connection = sqlite3.connect(store_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS skewing_factors "
+                "(key TEXT PRIMARY KEY, factor_1 INTEGER, factor_2 INTEGER)"
+            )
+            self._connection.commit()
+
+    @classmethod
+    def get_default(cls) -> SkewingSolverCache:
+        """
+        Returns the cache shared by the skewing actions, created on first use
+        with the store configured in `skewing_solver_cache` if any.
+        """
+        if cls._default is None:
+            store_path = (
+                BaseConfig.base_config.skewing_solver_cache
+                if BaseConfig.base_config
+                else None
+            )
+            cls._default = cls(store_path=store_path)
+        return cls._default
+
+    @classmethod
+    def set_default(cls, cache: SkewingSolverCache | None):
+        """Replaces the shared cache, `None` creates a new one on next use."""
+        cls._default = cache
+
+    @classmethod
+    def get_key(
+        cls,
+        schedule: Schedule,
+        loop_levels: List[int],
+        comps_skewed_loops: List[str],
+    ) -> SolverKey:
+        assert schedule.tiramisu_program
+        return (
+            schedule.tiramisu_program.get_source_hash(),
+            schedule.canonical_hash(),
+            tuple(loop_levels),
+            tuple(comps_skewed_loops),
+        )
+
+    def lookup(self, key: SolverKey) -> Tuple[bool, Tuple[int, int] | None]:
+        """
+        Returns whether the result of the query is known and the result.
+        The results found in the store are brought back into memory.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return True, self._results[key]
+            if self._connection is None:
+                return False, None
+            row = self._connection.execute(
+                "SELECT factor_1, factor_2 FROM skewing_factors WHERE key = ?",
+                (self._serialize_key(key),),
+            ).fetchone()
+            if row is None:
+                return False, None
+            factors = None if row[0] is None else (row[0], row[1])
+            self._remember(key, factors)
+            self.hits += 1
+            return True, factors
+
+    def store(self, key: SolverKey, factors: Tuple[int, int] | None):
+        with self._lock:
+            self._remember(key, factors)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO skewing_factors VALUES (?, ?, ?)",
+                    (
+                        self._serialize_key(key),
+                        *(factors if factors is not None else (None, None)),
+                    ),
+                )
+                self._connection.commit()
+
+    def get_factors(
+        self,
+        schedule: Schedule,
+        loop_levels: List[int],
+        comps_skewed_loops: List[str],
+    ) -> Tuple[int, int] | None:
+        """
+        Returns the factors of the skewing solver for the loops, calling the
+        solver only when the query is not cached.
+        """
+        key = self.get_key(schedule, loop_levels, comps_skewed_loops)
+        found, factors = self.lookup(key)
+        if found:
+            return factors
+        return self._solve(key, schedule, loop_levels, comps_skewed_loops)
+
+    def prefetch(
+        self,
+        schedule: Schedule,
+        queries: List[SolverQuery],
+        max_workers: int | None = None,
+    ) -> Dict[SolverKey, Tuple[int, int] | None]:
+        """
+        Solves the queries, given as pairs of loop levels and computations,
+        that are not cached yet in parallel, the solver being run in its own
+        process for each query. Returns the results of all the queries.
+        """
+        results: Dict[SolverKey, Tuple[int, int] | None] = {}
+        missing: Dict[SolverKey, SolverQuery] = {}
+        for loop_levels, comps_skewed_loops in queries:
+            key = self.get_key(schedule, loop_levels, comps_skewed_loops)
+            if key in results or key in missing:
+                continue
+            found, factors = self.lookup(key)
+            if found:
+                results[key] = factors
+            else:
+                missing[key] = (loop_levels, comps_skewed_loops)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    key: executor.submit(self._solve, key, schedule, *query)
+                    for key, query in missing.items()
+                }
+                for key, future in futures.items():
+                    results[key] = future.result()
+
+        return results
+
+    def clear(self):
+        """Empties the memory, the store is kept."""
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def _solve(
+        self,
+        key: SolverKey,
+        schedule: Schedule,
+        loop_levels: List[int],
+        comps_skewed_loops: List[str],
+    ) -> Tuple[int, int] | None:
+        with self._lock:
+            self.misses += 1
+        factors = CompilingService.call_skewing_solver(
+            schedule, loop_levels, comps_skewed_loops
+        )
+        if factors is not None:
+            factors = tuple(factors)
+        logger.debug(f"Skewing solver result for {key[2:]}: {factors}")
+        self.store(key, factors)
+        return factors
+
+    def _remember(self, key: SolverKey, factors: Tuple[int, int] | None):
+        self._results[key] = factors
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    @classmethod
+    def _serialize_key(cls, key: SolverKey) -> str:
+        return json.dumps([key[0], key[1], list(key[2]), list(key[3])])
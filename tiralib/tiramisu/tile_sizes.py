@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from tiralib.tiramisu.affine_bounds import TripCountEstimator
+from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.tiramisu_program import TiramisuProgram
+
+_CPU_CACHE_PATH = "/sys/devices/system/cpu/cpu0/cache"
+
+_DATA_TYPE_SIZES = {
+    "float64": 8,
+    "float32": 4,
+    "int64": 8,
+    "uint64": 8,
+    "int32": 4,
+    "uint32": 4,
+    "int16": 2,
+    "uint16": 2,
+    "int8": 1,
+    "uint8": 1,
+    "bool": 1,
+}
+
+# Above this number of tile shapes, the sizes of each loop are trimmed
+_MAX_TILE_SHAPES = 20000
+
+
+@dataclass
+class CacheSizes:
+    """Sizes in bytes of the data caches of a core."""
+
+    l1: int = 32 * 1024
+    l2: int = 1024 * 1024
+    l3: int = 32 * 1024 * 1024
+
+    @classmethod
+    def from_sysfs(cls, cache_path: str = _CPU_CACHE_PATH) -> "CacheSizes":
+        """
+        Reads the cache sizes of the first CPU from sysfs, the default sizes
+        are kept for the levels that can not be read.
+        """
+        cache_sizes = cls()
+        for index in sorted(Path(cache_path).glob("index*")):
+            try:
+                level = int((index / "level").read_text())
+                cache_type = (index / "type").read_text().strip()
+                size = cls._parse_size((index / "size").read_text())
+            except (OSError, ValueError):
+                continue
+            if cache_type == "Instruction" or level not in (1, 2, 3):
+                continue
+            setattr(cache_sizes, f"l{level}", size)
+        return cache_sizes
+
+    @classmethod
+    def _parse_size(cls, size_str: str) -> int:
+        # e.g. 48K, 2048K or 32M
+        match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)\s*", size_str)
+        if match is None:
+            raise ValueError(f"Unknown cache size {size_str!r}")
+        unit = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}[match.group(2)]
+        return int(match.group(1)) * unit
+
+    def as_list(self) -> List[int]:
+        return [self.l1, self.l2, self.l3]
+
+
+@dataclass
+class TileSizeProposal:
+    """
+    Tile sizes for the loops of a tiling candidate.
+
+    Attributes:
+    ----------
+    `tile_sizes`: `Tuple[int, ...]`
+        The size of the tile on each loop of the candidate.
+    `footprint`: `int`
+        The estimated number of bytes accessed by one tile.
+    `cache_level`: `int`
+        The smallest cache level the footprint fits in, 4 if it does not
+        fit in the L3 cache.
+    `waste`: `float`
+        The fraction of the iterations of the full tiles that fall outside
+        the loops (partial tiles).
+    """
+
+    tile_sizes: Tuple[int, ...]
+    footprint: int
+    cache_level: int
+    waste: float = field(default=0.0)
+
+
+class TileSizeGenerator:
+    """
+    Proposes tile sizes for the tiling candidates of a program.
+
+    The tile sizes of a loop are the powers of two and the divisors of its
+    trip count that are smaller than it. The tile shapes are ranked by the
+    smallest cache their footprint fits in, then by the remainder waste of
+    the partial tiles and then by decreasing footprint, larger tiles giving
+    more reuse. All the shapes of a candidate are evaluated at once with
+    NumPy.
+
+    The footprint of a tile is the bounding box of the accesses of each
+    buffer, from the access matrices of the annotations, over the tiled
+    loops and the loops nested in the tile. The columns of the access
+    matrices are matched with the levels of the loops, which is exact on
+    trees that were not reordered. Without annotations, every computation
+    is assumed to access one buffer with all of its loops.
+
+    Parameters
+    ----------
+    `cache_sizes` : `CacheSizes | None`
+        The cache sizes, read from sysfs by default.
+    `annotations` : `dict | None`
+        The annotations of the program, for the accesses and the data types.
+    `cache_occupancy` : `float`
+        The fraction of each cache a tile may use, the rest being left for
+        conflicts and for the other data.
+    `max_tile_size` : `int`
+        The largest tile size proposed.
+    """
+
+    def __init__(
+        self,
+        cache_sizes: CacheSizes | None = None,
+        annotations: dict | None = None,
+        cache_occupancy: float = 0.5,
+        max_tile_size: int = 1024,
+    ):
+        self.cache_sizes = cache_sizes or CacheSizes.from_sysfs()
+        self.annotations = annotations
+        self.cache_occupancy = cache_occupancy
+        self.max_tile_size = max_tile_size
+        # (buffer id, access matrix, element size) of every computation
+        self._accesses: Dict[str, List[Tuple[int, np.ndarray, int]]] = {}
+        if annotations:
+            for comp, comp_dict in annotations["computations"].items():
+                element_size = _DATA_TYPE_SIZES.get(comp_dict.get("data_type"), 8)
+                self._accesses[comp] = [
+                    (
+                        access["buffer_id"],
+                        np.array(access["access_matrix"], dtype=np.int64),
+                        element_size,
+                    )
+                    for access in comp_dict["accesses"]
+                ]
+
+    @classmethod
+    def from_program(
+        cls, program: TiramisuProgram, cache_sizes: CacheSizes | None = None
+    ) -> "TileSizeGenerator":
+        """
+        Returns a generator using the annotations of a program, if they
+        were already loaded.
+        """
+        return cls(cache_sizes=cache_sizes, annotations=program.annotations)
+
+    def propose(
+        self,
+        tree: TiramisuTree,
+        iterators: List[IteratorIdentifier],
+        top_k: int = 5,
+    ) -> List[TileSizeProposal]:
+        """
+        Returns the `top_k` best tile sizes for a tiling candidate.
+
+        Parameters
+        ----------
+        `tree` : `TiramisuTree`
+            The tree of the program.
+        `iterators` : `List[IteratorIdentifier]`
+            The loops to tile, as given by the tiling candidates.
+        `top_k` : `int`
+            The number of proposals to return.
+        """
+        trip_counts = TripCountEstimator.get_loop_trip_counts(tree)
+        extents = [trip_counts.get(iterator, math.nan) for iterator in iterators]
+        sizes_per_loop = self._get_tile_sizes_per_loop(extents)
+
+        # one column per tile shape
+        grids = np.meshgrid(*sizes_per_loop, indexing="ij")
+        shapes = np.stack([grid.ravel() for grid in grids])
+        footprints = self._get_footprints(tree, iterators, shapes, trip_counts)
+        wastes = self._get_wastes(extents, shapes)
+
+        limits = np.array(self.cache_sizes.as_list()) * self.cache_occupancy
+        cache_levels = 1 + np.searchsorted(limits, footprints, side="left")
+        order = np.lexsort((-footprints, np.round(wastes, 2), cache_levels))
+
+        return [
+            TileSizeProposal(
+                tile_sizes=tuple(int(size) for size in shapes[:, index]),
+                footprint=int(footprints[index]),
+                cache_level=int(cache_levels[index]),
+                waste=float(wastes[index]),
+            )
+            for index in order[:top_k]
+        ]
+
+    def get_proposals(
+        self,
+        tree: TiramisuTree,
+        candidates: List[List[IteratorIdentifier]],
+        top_k: int = 5,
+    ) -> Dict[Tuple[IteratorIdentifier, ...], List[TileSizeProposal]]:
+        """
+        Returns the `top_k` best tile sizes of every tiling candidate.
+        """
+        return {
+            tuple(candidate): self.propose(tree, list(candidate), top_k)
+            for candidate in candidates
+        }
+
+    def _get_tile_sizes_per_loop(self, extents: List[float]) -> List[np.ndarray]:
+        sizes_per_loop = []
+        for extent in extents:
+            powers = [2**power for power in range(1, self.max_tile_size.bit_length())]
+            if math.isnan(extent):
+                sizes = powers
+            else:
+                divisors = [
+                    divisor
+                    for divisor in range(
+                        2, min(int(extent) // 2, self.max_tile_size) + 1
+                    )
+                    if int(extent) % divisor == 0
+                ]
+                sizes = sorted(
+                    {size for size in powers + divisors if size < extent}
+                ) or [max(int(extent), 1)]
+            sizes_per_loop.append(np.array(sizes, dtype=np.int64))
+
+        nbr_shapes = math.prod(len(sizes) for sizes in sizes_per_loop)
+        if nbr_shapes > _MAX_TILE_SHAPES:
+            # keep the sizes with the least waste on each loop
+            max_sizes = max(2, int(_MAX_TILE_SHAPES ** (1 / len(sizes_per_loop))))
+            trimmed = []
+            for extent, sizes in zip(extents, sizes_per_loop):
+                if len(sizes) > max_sizes:
+                    wastes = self._get_wastes([extent], sizes[None, :])
+                    keep = np.lexsort((-sizes, wastes))[:max_sizes]
+                    sizes = np.sort(sizes[keep])
+                trimmed.append(sizes)
+            sizes_per_loop = trimmed
+        return sizes_per_loop
+
+    def _get_wastes(self, extents: List[float], shapes: np.ndarray) -> np.ndarray:
+        # 1 - useful iterations / iterations of the full tiles, loops with
+        # unknown trip counts have no waste
+        useful = np.ones(shapes.shape[1])
+        for extent, sizes in zip(extents, shapes):
+            if math.isnan(extent) or extent <= 0:
+                continue
+            padded = np.ceil(extent / sizes) * sizes
+            useful *= extent / padded
+        return 1 - useful
+
+    def _get_footprints(
+        self,
+        tree: TiramisuTree,
+        iterators: List[IteratorIdentifier],
+        shapes: np.ndarray,
+        trip_counts: Dict[IteratorIdentifier, float],
+    ) -> np.ndarray:
+        # bounding box of the accesses of each buffer in one tile, summed
+        # over the buffers
+        tiled = {iterator: row for row, iterator in enumerate(iterators)}
+        nbr_shapes = shapes.shape[1]
+        # (buffer, linear part) -> extents, constants and element size
+        boxes: Dict[int, List[Tuple[np.ndarray, np.ndarray, int]]] = {}
+
+        for comp in tree.get_iterator_subtree_computations(iterators[0]):
+            # extent of each loop of the computation in one tile: tiled
+            # loops span a tile, loops outside of the band one iteration and
+            # loops nested in the band all of their iterations
+            enclosing = self._get_enclosing_iterators(tree, comp)
+            loop_extents = np.ones((len(enclosing), nbr_shapes))
+            innermost_tiled = max(
+                (level for level, it in enumerate(enclosing) if it in tiled),
+                default=-1,
+            )
+            for level, iterator in enumerate(enclosing):
+                if iterator in tiled:
+                    loop_extents[level] = shapes[tiled[iterator]]
+                elif level > innermost_tiled:
+                    trip_count = trip_counts.get(iterator, math.nan)
+                    loop_extents[level] = 1 if math.isnan(trip_count) else trip_count
+
+            accesses = self._accesses.get(comp)
+            if accesses is None:
+                # one buffer accessed with all the loops
+                accesses = [
+                    (
+                        -1 - len(boxes),
+                        np.hstack(
+                            [np.eye(len(enclosing)), np.zeros((len(enclosing), 1))]
+                        ),
+                        8,
+                    )
+                ]
+            for buffer_id, matrix, element_size in accesses:
+                nbr_loops = min(matrix.shape[1] - 1, len(enclosing))
+                coefficients = np.abs(matrix[:, :nbr_loops])
+                # extent of each buffer dimension for every shape
+                dimension_extents = 1 + coefficients @ (loop_extents[:nbr_loops] - 1)
+                boxes.setdefault(buffer_id, []).append(
+                    (dimension_extents, matrix[:, -1], element_size)
+                )
+
+        footprints = np.zeros(nbr_shapes)
+        for buffer_boxes in boxes.values():
+            if len({len(constants) for _, constants, _ in buffer_boxes}) > 1:
+                # accesses of different dimensions, counted separately
+                for dimension_extents, _, element_size in buffer_boxes:
+                    footprints += dimension_extents.prod(axis=0) * element_size
+                continue
+            # the union of shifted accesses is their bounding box
+            extents = np.max([box[0] for box in buffer_boxes], axis=0)
+            constants = np.array([box[1] for box in buffer_boxes])
+            spread = constants.max(axis=0) - constants.min(axis=0)
+            element_size = max(box[2] for box in buffer_boxes)
+            footprints += (extents + spread[:, None]).prod(axis=0) * element_size
+        return footprints
+
+    @classmethod
+    def _get_enclosing_iterators(
+        cls, tree: TiramisuTree, comp: str
+    ) -> List[IteratorIdentifier]:
+        # the loops of a computation from the outermost one
+        enclosing = []
+        iterator_id = tree.get_iterator_of_computation(comp).id
+        while iterator_id is not None:
+            enclosing.append(iterator_id)
+            iterator_id = tree.iterators[iterator_id].parent_iterator
+        return enclosing[::-1]
@@ -15,6 +15,7 @@ from .tiramisu_action import (
     TiramisuActionType,
 )
 from .unrolling import Unrolling
+from .vectorization import Vectorization
 
 __all__ = [
     "TiramisuAction",
@@ -28,6 +29,7 @@ __all__ = [
     "Parallelization",
     "Skewing",
     "Unrolling",
+    "Vectorization",
     "Fusion",
     "Reversal",
     "Expansion",
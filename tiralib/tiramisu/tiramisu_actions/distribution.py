@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import itertools
 
 from tiralib.tiramisu.tiramisu_iterator_node import (
@@ -19,6 +18,8 @@ class Distribution(TiramisuAction):
     Distribution optimization command.
     """
 
+    __slots__ = ("iterator_id", "children")
+
     def __init__(
         self,
         params: list[IteratorIdentifier],
@@ -36,8 +37,7 @@ class Distribution(TiramisuAction):
         )
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
         self.iterator_id = self.tree.get_iterator_of_computation(*self.iterator_id).id
 
         if self.children is None:
@@ -66,14 +66,15 @@ class Distribution(TiramisuAction):
                         child_list.pop(index)
                         child_list.extend(tmp_iterator_comps)
 
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         self.tiramisu_optim_str = ""
 
-        ordered_computations = tiramisu_tree.computations
-        ordered_computations.sort(
-            key=lambda x: tiramisu_tree.computations_absolute_order[x]
+        ordered_computations = sorted(
+            tiramisu_tree.computations,
+            key=lambda x: tiramisu_tree.computations_absolute_order[x],
         )
 
         fusion_levels = self.get_fusion_levels(
@@ -113,38 +114,15 @@ class Distribution(TiramisuAction):
         # get the shared iterator level
         for comp1, comp2 in itertools.pairwise(ordered_computations):
             # get the shared iterator level
-            iter_comp_1 = tiramisu_tree.get_iterator_of_computation(comp1)
-            iter_comp_2 = tiramisu_tree.get_iterator_of_computation(comp2)
-            fusion_level: int | None = None
-
-            # get the shared iterator level
-            while iter_comp_1.name != iter_comp_2.name:
-                if iter_comp_1.level > iter_comp_2.level:
-                    # if parent is None then
-                    # the iterators don't have a common parent
-                    if iter_comp_1.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_1 = tiramisu_tree.iterators[
-                            iter_comp_1.parent_iterator
-                        ]
-                else:
-                    if iter_comp_2.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_2 = tiramisu_tree.iterators[
-                            iter_comp_2.parent_iterator
-                        ]
-
-            # same iterator
-            if fusion_level is None:
-                fusion_level = iter_comp_1.level
+            shared_iterator = tiramisu_tree.get_shared_iterator_of_computations(
+                comp1, comp2
+            )
+            # -1 if the computations don't have a common iterator
+            fusion_level = shared_iterator.level if shared_iterator else -1
 
             if (
                 fusion_level == distributed_iterator.level
-                and iter_comp_1.name == distributed_iterator.name
+                and shared_iterator.name == distributed_iterator.name
             ):
                 no_distribution = False
                 for child_list in self.children:
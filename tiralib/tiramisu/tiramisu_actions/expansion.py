@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import copy
 import os
-from typing import TYPE_CHECKING, List
+import re
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 from tiralib.tiramisu.compiling_service import CompilingService
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
@@ -16,12 +17,20 @@ from tiralib.tiramisu.tiramisu_actions.tiramisu_action import (
     TiramisuActionType,
 )
 
+# The number of schedules whose expansion candidates are kept
+_CANDIDATES_CACHE_SIZE = 1024
+
 
 class Expansion(TiramisuAction):
     """
     Expansion optimization command.
     """
 
+    __slots__ = ("computation",)
+
+    # Expansion candidates by program hash and string of the schedule
+    _candidates_cache: OrderedDict[Tuple[str, str], List[str]] = OrderedDict()
+
     def __init__(self, params: List[str]):
         # Expansion takes as a parameter the computation to expand
         assert len(params) == 1
@@ -31,10 +40,10 @@ class Expansion(TiramisuAction):
         super().__init__(type=TiramisuActionType.EXPANSION, params=params, comps=None)
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
 
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.computation is not None
@@ -48,32 +57,107 @@ class Expansion(TiramisuAction):
 
     @classmethod
     def get_candidates(cls, schedule: Schedule) -> List[str]:
-        candidates = []
-        candidates_code = ""
-
-        for optim in schedule.optims_list:
-            candidates_code += "    " + optim.tiramisu_optim_str
+        """
+        Returns the computations of the program that can be expanded after
+        the actions of the schedule.
+        """
+        return cls.get_candidates_batch([schedule])[0]
 
-        for comp in schedule.tree.computations:
-            candidates_code += (
-                f'    std::cout << "{comp}|" << {comp}.expandable() << std::endl;\n'  # noqa
+    @classmethod
+    def get_candidates_batch(cls, schedules: List[Schedule]) -> List[List[str]]:
+        """
+        Returns the expansion candidates of each schedule. The results are
+        cached per program and schedule string, and the schedules of a program that are not cached yet are all evaluated by
+        a single generated program, compiled once and run for each schedule.
+        """
+        keys = [
+            (
+                schedule.tiramisu_program.get_source_hash(),
+                str(schedule),
             )
+            for schedule in schedules
+        ]
+
+        # the schedules to evaluate, grouped by program
+        missing: Dict[str, Dict[Tuple[str, str], Schedule]] = {}
+        for key, schedule in zip(keys, schedules):
+            if key in cls._candidates_cache:
+                cls._candidates_cache.move_to_end(key)
+            else:
+                missing.setdefault(key[0], {}).setdefault(key, schedule)
+
+        results: Dict[Tuple[str, str], List[str]] = {}
+        for program_schedules in missing.values():
+            program_results = cls._evaluate_candidates(list(program_schedules.values()))
+            for key, candidates in zip(program_schedules, program_results):
+                results[key] = candidates
+                cls._candidates_cache[key] = candidates
+        while len(cls._candidates_cache) > _CANDIDATES_CACHE_SIZE:
+            cls._candidates_cache.popitem(last=False)
+
+        return [
+            list(results[key] if key in results else cls._candidates_cache[key])
+            for key in keys
+        ]
+
+    @classmethod
+    def clear_candidates_cache(cls):
+        cls._candidates_cache.clear()
 
-        cpp_code = schedule.tiramisu_program.original_str.replace(
-            schedule.tiramisu_program.code_gen_line, candidates_code
+    @classmethod
+    def _evaluate_candidates(cls, schedules: List[Schedule]) -> List[List[str]]:
+        # every schedule is applied in its own branch, selected by the
+        # argument of the run
+        tiramisu_program = schedules[0].tiramisu_program
+        candidates_code = (
+            "    int schedule_index = argc > 1 ? std::atoi(argv[1]) : 0;\n"
+        )
+
+        for index, schedule in enumerate(schedules):
+            candidates_code += f"    if (schedule_index == {index}) {{\n"
+            for optim in schedule.optims_list:
+                candidates_code += "    " + optim.tiramisu_optim_str
+            for comp in schedule.tree.computations:
+                candidates_code += f'    std::cout << "{index}|{comp}|" << {comp}.expandable() << std::endl;\n'  # noqa
+            candidates_code += "    }\n"
+
+        cpp_code = tiramisu_program.original_str.replace(
+            tiramisu_program.code_gen_line, candidates_code
+        )
+        # the parameters of main may be unnamed in the original code
+        cpp_code = re.sub(
+            r"int main\([\w\s,*]*\)",
+            "int main(int argc, char **argv)",
+            cpp_code,
+            count=1,
         )
 
         output_path = os.path.join(
             BaseConfig.base_config.workspace,
-            f"{schedule.tiramisu_program.name}_expansion_candidates",
+            f"{tiramisu_program.name}_expansion_candidates",
         )
 
         candidates_results_str = CompilingService.run_cpp_code(
-            cpp_code=cpp_code, output_path=output_path
+            cpp_code=cpp_code,
+            output_path=output_path,
+            run_args=[str(index) for index in range(len(schedules))],
         )
+
+        reported: List[Dict[str, bool]] = [{} for _ in schedules]
         for str_line in candidates_results_str.split("\n"):
             if str_line:
-                computation_name, is_expandable = str_line.split("|")
-                if is_expandable == "1":
-                    candidates.append(computation_name)
-        return candidates
+                index, computation_name, is_expandable = str_line.split("|")
+                reported[int(index)][computation_name] = is_expandable == "1"
+
+        # the results are cached, so a run that did not report every
+        # computation must not be taken for a schedule without candidates
+        for schedule, is_expandable in zip(schedules, reported):
+            if set(is_expandable) != set(schedule.tree.computations):
+                raise Exception(
+                    f"The expansion candidates of {schedule} were not all "
+                    "reported by the generated program"
+                )
+        return [
+            [comp for comp, expandable in is_expandable.items() if expandable]
+            for is_expandable in reported
+        ]
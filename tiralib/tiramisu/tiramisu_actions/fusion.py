@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-import copy
 import itertools
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Set, Tuple
 
 from tiralib.tiramisu.tiramisu_iterator_node import (
     IteratorIdentifier,
@@ -21,6 +20,8 @@ class Fusion(TiramisuAction):
     Fusion optimization command.
     """
 
+    __slots__ = ("iterators", "itertors_computations", "main_fusion_level")
+
     def __init__(self, params: List[IteratorIdentifier]):
         # Fusion takes 2 parameters the iterators to be fused
         assert len(params) == 2
@@ -35,8 +36,7 @@ class Fusion(TiramisuAction):
         super().__init__(type=TiramisuActionType.FUSION, params=params, comps=None)
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
 
         self.comps = []
         self.iterators: List[IteratorNode] = []
@@ -57,7 +57,8 @@ class Fusion(TiramisuAction):
             key=lambda comp: tiramisu_tree.computations_absolute_order[comp]
         )
 
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.comps is not None
@@ -117,24 +118,15 @@ perform_full_dependency_analysis();
             # get all the possible combinations of 2 of roots
             candidates.extend(itertools.combinations(program_tree.roots, 2))
 
-        # Check the different levels of the iterators
-        levels = set([iterator.level for iterator in program_tree.iterators.values()])
-
         # For each level, we will try to fuse all possible nodes
         # that have the same level and have the same root
-        for level in levels:
-            # get all iterator nodes that have the same level
-            iterators = [
-                iterator
-                for iterator in program_tree.iterators.values()
-                if iterator.level == level
-            ]
-
+        for level in program_tree.get_levels():
             # filter the iterators that have the same root into dict
             iterators_dict: Dict[str, List[str]] = {}
             for root in program_tree.roots:
                 iterators_dict[root] = []
-            for iterator in iterators:
+            for iterator_id in program_tree.get_iterators_at_level(level):
+                iterator = program_tree.iterators[iterator_id]
                 iterators_dict[program_tree.get_root_of_node(iterator.id)].append(
                     iterator.id
                 )
@@ -151,6 +143,63 @@ perform_full_dependency_analysis();
 
         return candidates
 
+    @classmethod
+    def generate_candidates(
+        cls, program_tree: TiramisuTree, annotations: dict | None = None
+    ) -> Iterator[Tuple[IteratorIdentifier, IteratorIdentifier]]:
+        """
+        Lazily generates the fusion candidates of the tree, a scalable
+        alternative to `get_candidates`: only the pairs of sibling loops that
+        are adjacent in execution order are proposed, the roots included.
+
+        When the annotations of the program are given, a pair is only
+        proposed if it is a producer and a consumer: a computation of the
+        first loop writes a buffer that a computation of the second loop
+        reads. Pairs with computations missing from the annotations are kept.
+
+        Parameters:
+        ----------
+        `program_tree`: `TiramisuTree`
+            The tree of the program.
+        `annotations`: `dict | None`
+            The annotations of the program, to filter the pairs that share
+            no data.
+        """
+        written_buffers: Dict[str, int] = {}
+        read_buffers: Dict[str, Set[int]] = {}
+        if annotations:
+            for comp, comp_dict in annotations["computations"].items():
+                written_buffers[comp] = comp_dict["write_buffer_id"]
+                read_buffers[comp] = {
+                    access["buffer_id"] for access in comp_dict["accesses"]
+                }
+
+        for siblings in program_tree.get_sibling_groups():
+            for producer, consumer in itertools.pairwise(siblings):
+                if annotations and not cls._is_producer_consumer(
+                    program_tree.get_iterator_subtree_computations(producer),
+                    program_tree.get_iterator_subtree_computations(consumer),
+                    written_buffers,
+                    read_buffers,
+                ):
+                    continue
+                yield producer, consumer
+
+    @classmethod
+    def _is_producer_consumer(
+        cls,
+        producer_comps: List[str],
+        consumer_comps: List[str],
+        written_buffers: Dict[str, int],
+        read_buffers: Dict[str, Set[int]],
+    ) -> bool:
+        if any(comp not in written_buffers for comp in producer_comps + consumer_comps):
+            return True
+        produced = {written_buffers[comp] for comp in producer_comps}
+        return any(
+            not produced.isdisjoint(read_buffers[comp]) for comp in consumer_comps
+        )
+
     def reorder_computations(
         self,
         tiramisu_tree: TiramisuTree,
@@ -194,42 +243,20 @@ perform_full_dependency_analysis();
         for index, comp in enumerate(fusion_comps_to_move):
             new_absolute_order[comp] = max_order + index + 1
 
-        computations = tiramisu_tree.computations
-        computations.sort(key=lambda x: new_absolute_order[x])
+        computations = sorted(
+            tiramisu_tree.computations, key=lambda x: new_absolute_order[x]
+        )
 
         fusion_levels: List[int] = []
         # for every pair of successive computations
         # get the shared iterator level
         for comp1, comp2 in itertools.pairwise(computations):
             # get the shared iterator level
-            iter_comp_1 = tiramisu_tree.get_iterator_of_computation(comp1)
-            iter_comp_2 = tiramisu_tree.get_iterator_of_computation(comp2)
-            fusion_level: int | None = None
-
-            # get the shared iterator level
-            while iter_comp_1.id != iter_comp_2.id:
-                if iter_comp_1.level > iter_comp_2.level:
-                    # if parent is None
-                    # then the iterators don't have a common parent
-                    if iter_comp_1.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_1 = tiramisu_tree.iterators[
-                            iter_comp_1.parent_iterator
-                        ]
-                else:
-                    if iter_comp_2.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_2 = tiramisu_tree.iterators[
-                            iter_comp_2.parent_iterator
-                        ]
-
-            # same iterator
-            if fusion_level is None:
-                fusion_level = iter_comp_1.level
+            shared_iterator = tiramisu_tree.get_shared_iterator_of_computations(
+                comp1, comp2
+            )
+            # -1 if the computations don't have a common iterator
+            fusion_level = shared_iterator.level if shared_iterator else -1
 
             if comp1 in fused_computations and comp2 in fused_computations:
                 if fusion_level <= main_fusion_level:
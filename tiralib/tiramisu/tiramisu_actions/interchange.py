@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import itertools
 from typing import Dict, List, Tuple
 
@@ -18,6 +17,8 @@ class Interchange(TiramisuAction):
     Interchange optimization command.
     """
 
+    __slots__ = ("iterators",)
+
     def __init__(
         self, params: List[IteratorIdentifier], comps: List[str] | None = None
     ):
@@ -33,7 +34,7 @@ class Interchange(TiramisuAction):
         )
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
 
         # if comps are none get them from the tree
         if self.comps is None:
@@ -50,7 +51,8 @@ class Interchange(TiramisuAction):
                 innermost_iterator.id
             )
 
-        self.set_string_representations(self.tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.comps is not None
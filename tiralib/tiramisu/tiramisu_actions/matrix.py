@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import math
 from typing import TYPE_CHECKING, List
 
@@ -10,6 +9,7 @@ if TYPE_CHECKING:
     from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
 from tiralib.tiramisu.tiramisu_actions.tiramisu_action import (
+    CannotApplyException,
     TiramisuAction,
     TiramisuActionType,
 )
@@ -20,6 +20,8 @@ class MatrixTransform(TiramisuAction):
     Matrix optimization command.
     """
 
+    __slots__ = ("matrix", "composed_actions")
+
     def __init__(self, params: List[int], comps: List[str]):
         # MatrixTransform takes the list of parameters of the polyhedral transformation matrix
         # assert that len(params) is a square number (square matrix)
@@ -33,15 +35,18 @@ class MatrixTransform(TiramisuAction):
         self.params = params
         self.comps = comps
         self.matrix = matrix
+        # The unimodular actions this transform was composed from, if any
+        self.composed_actions: List[TiramisuAction] | None = None
         super().__init__(
             type=TiramisuActionType.MATRIX_TRANSFORM, params=params, comps=comps
         )
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
 
         # if comps are none get them from the tree
-        self.set_string_representations(self.tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         self.tiramisu_optim_str = ""
@@ -53,4 +58,117 @@ class MatrixTransform(TiramisuAction):
         self.tiramisu_optim_str = f"{self.comps[0]}.matrix_transform({mat_vect});"
         self.legality_check_string = self.tiramisu_optim_str
 
-        self.str_representation = f"M({self.params},comps={self.comps})"
+        self.str_representation = f"M({list(self.params)},comps={self.comps})"
+
+    @classmethod
+    def is_composable(cls, action: TiramisuAction) -> bool:
+        """
+        Whether the action is a unimodular transformation that can be
+        expressed as a matrix (interchange and reversal). Skewings are not
+        composed: Tiramisu completes the skewing of the two loops into a
+        unimodular transformation itself, and the second row of the matrix
+        it applies is not known here.
+        """
+        return action.is_interchange() or action.is_reversal()
+
+    @classmethod
+    def get_action_matrix(cls, action: TiramisuAction, depth: int) -> List[List[int]]:
+        """
+        Returns the `depth` x `depth` matrix of an interchange or a reversal.
+        """
+        matrix = [[int(row == col) for col in range(depth)] for row in range(depth)]
+
+        if action.is_interchange():
+            first, second = (param[1] for param in action.params)
+            matrix[first], matrix[second] = matrix[second], matrix[first]
+        elif action.is_reversal():
+            level = action.iterator_id[1]
+            matrix[level][level] = -1
+        else:
+            raise CannotApplyException(f"{action.type} is not a matrix transform")
+
+        return matrix
+
+    @classmethod
+    def from_actions(
+        cls, actions: List[TiramisuAction], comp: str, depth: int
+    ) -> MatrixTransform:
+        """
+        Composes a sequence of interchanges and reversals applied to the
+        computation `comp` into a single matrix transform.
+
+        Parameters
+        ----------
+        `actions` : `List[TiramisuAction]`
+            The actions to compose, in the order they are applied.
+        `comp` : `str`
+            The computation the matrix transform will be applied to.
+        `depth` : `int`
+            The number of loop levels of the computation.
+        """
+        composed = [[int(row == col) for col in range(depth)] for row in range(depth)]
+        for action in actions:
+            composed = _multiply(cls.get_action_matrix(action, depth), composed)
+
+        matrix_transform = cls(
+            [value for row in composed for value in row], comps=[comp]
+        )
+        matrix_transform.composed_actions = list(actions)
+        return matrix_transform
+
+    def decompose(self) -> List[TiramisuAction]:
+        """
+        Decomposes the matrix transform back into readable actions.
+
+        A transform composed with `from_actions` returns its original actions.
+        Otherwise, signed permutation matrices are decomposed into reversals
+        followed by interchanges.
+        """
+        from tiralib.tiramisu.tiramisu_actions.interchange import Interchange
+        from tiralib.tiramisu.tiramisu_actions.reversal import Reversal
+
+        if self.composed_actions is not None:
+            return list(self.composed_actions)
+
+        comp = self.comps[0]
+        depth = len(self.matrix)
+        # column of the non zero coefficient of every row
+        permutation = []
+        for row in self.matrix:
+            non_zeros = [col for col, value in enumerate(row) if value != 0]
+            if len(non_zeros) != 1 or abs(row[non_zeros[0]]) != 1:
+                raise CannotApplyException(
+                    "Only signed permutation matrices can be decomposed"
+                )
+            permutation.append(non_zeros[0])
+
+        actions: List[TiramisuAction] = []
+        # reverse the original loops first
+        for row, col in enumerate(permutation):
+            if self.matrix[row][col] == -1:
+                actions.append(Reversal([(comp, col)], comps=[comp]))
+
+        # then move every loop to its position with interchanges
+        current = list(range(depth))
+        for level in range(depth):
+            if current[level] != permutation[level]:
+                other_level = current.index(permutation[level])
+                current[level], current[other_level] = (
+                    current[other_level],
+                    current[level],
+                )
+                actions.append(
+                    Interchange([(comp, level), (comp, other_level)], comps=[comp])
+                )
+
+        return actions
+
+
+def _multiply(left: List[List[int]], right: List[List[int]]) -> List[List[int]]:
+    return [
+        [
+            sum(left[row][k] * right[k][col] for k in range(len(right)))
+            for col in range(len(right[0]))
+        ]
+        for row in range(len(left))
+    ]
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
-import copy
-from typing import Dict, List
+import math
+import os
+from typing import Dict, List, Tuple
 
+from tiralib.tiramisu.affine_bounds import (
+    AffineExpression,
+    AffineParsingError,
+    TripCountEstimator,
+)
 from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
@@ -17,6 +23,8 @@ class Parallelization(TiramisuAction):
     Parallelization optimization command.
     """
 
+    __slots__ = ("iterator_id",)
+
     def __init__(
         self,
         params: List[IteratorIdentifier],
@@ -36,7 +44,7 @@ class Parallelization(TiramisuAction):
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
         # we save a copy of the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
 
         # user passed a different iteratorId than the main one
         if self.iterator_id not in tiramisu_tree.iterators:
@@ -47,12 +55,9 @@ class Parallelization(TiramisuAction):
             iterator = tiramisu_tree.iterators[self.iterator_id]
 
             self.comps = tiramisu_tree.get_iterator_subtree_computations(iterator.id)
-            # order the computations by their absolute order
-            self.comps.sort(
-                key=lambda comp: tiramisu_tree.computations_absolute_order[comp]
-            )
 
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.iterator_id is not None
@@ -107,3 +112,188 @@ class Parallelization(TiramisuAction):
             )
 
         return candidates
+
+    @classmethod
+    def rank_candidates(
+        cls,
+        program_tree: TiramisuTree,
+        nbr_cores: int | None = None,
+        parameters: Dict[str, int] | None = None,
+        fork_cost: float = 1000,
+    ) -> Dict[IteratorIdentifier, List[Tuple[List[IteratorIdentifier], float]]]:
+        """
+        Ranks the parallelization candidates of each root by their expected
+        speedup, the most promising first.
+
+        The score of a candidate is the sum over its loops of the fraction
+        of the work of the root done in the loop times:
+            - the occupancy of the cores: the iterations of the loop
+              divided by the iterations the cores could run in the same
+              number of rounds (a 10 iterations loop uses 10 of 64 cores),
+            - the load balance of a static schedule when the bounds of the
+              nested loops depend on the loop (triangular loops), from the
+              work of its first and last iterations,
+            - the amortization of the cost of starting the parallel loop,
+              paid once per iteration of the enclosing loops.
+        The scores are between 0 and 1. Loops with unknown trip counts are
+        assumed to occupy all the cores.
+
+        Parameters:
+        ----------
+        `program_tree`: `TiramisuTree`
+            The Tiramisu tree of the program.
+        `nbr_cores`: `int | None`
+            The number of cores, `os.cpu_count()` by default.
+        `parameters`: `Dict[str, int] | None`
+            The values of the symbolic parameters used in the bounds.
+        `fork_cost`: `float`
+            The cost of starting a parallel loop, in computation executions.
+
+        Returns:
+        -------
+        `Dict`
+            Dictionary of the candidates of each root with their score,
+            sorted by decreasing score.
+        """
+        nbr_cores = nbr_cores or os.cpu_count() or 1
+        trip_counts = TripCountEstimator.get_loop_trip_counts(program_tree, parameters)
+        computation_counts = TripCountEstimator.get_computation_trip_counts(
+            program_tree, parameters
+        )
+
+        def get_work(iterator_id: IteratorIdentifier) -> float:
+            return sum(
+                computation_counts[comp]
+                for comp in program_tree.get_iterator_subtree_computations(iterator_id)
+            )
+
+        ranked_candidates = {}
+        for root, candidates in cls.get_candidates(program_tree).items():
+            root_work = get_work(root)
+            scored_candidates = []
+            for candidate in candidates:
+                score = 0.0
+                for iterator_id in candidate:
+                    work = get_work(iterator_id)
+                    trip_count = trip_counts[iterator_id]
+                    if math.isnan(work) or math.isnan(root_work) or not root_work:
+                        # unknown bounds, only the position of the loop counts
+                        score += 1 / (1 + program_tree.iterators[iterator_id].level)
+                        continue
+                    # the loop is started once per iteration of its parents
+                    nbr_forks = 1.0
+                    parent = program_tree.iterators[iterator_id].parent_iterator
+                    while parent is not None:
+                        nbr_forks *= trip_counts[parent]
+                        parent = program_tree.iterators[parent].parent_iterator
+                    work_per_fork = work / nbr_forks
+
+                    occupancy = 1.0
+                    balance = 1.0
+                    if trip_count > 0:
+                        occupancy = trip_count / (
+                            math.ceil(trip_count / nbr_cores) * nbr_cores
+                        )
+                        balance = cls._get_load_balance(
+                            program_tree,
+                            iterator_id,
+                            min(nbr_cores, trip_count),
+                            parameters or {},
+                        )
+                    score += (
+                        work
+                        / root_work
+                        * occupancy
+                        * balance
+                        * work_per_fork
+                        / (work_per_fork + fork_cost)
+                    )
+                scored_candidates.append((candidate, score))
+
+            # stable sort, the outermost candidates first on ties
+            ranked_candidates[root] = sorted(
+                scored_candidates, key=lambda item: -item[1]
+            )
+
+        return ranked_candidates
+
+    @classmethod
+    def _get_load_balance(
+        cls,
+        program_tree: TiramisuTree,
+        iterator_id: IteratorIdentifier,
+        nbr_chunks: float,
+        parameters: Dict[str, int],
+    ) -> float:
+        # mean work of the chunks over the work of the largest chunk for a
+        # work varying linearly between the first and the last iteration
+        path = []
+        node_id: IteratorIdentifier | None = iterator_id
+        while node_id is not None:
+            path.append(node_id)
+            node_id = program_tree.iterators[node_id].parent_iterator
+
+        values: Dict[str, float] = dict(parameters)
+        for ancestor in reversed(path[1:]):
+            _, _, mean = cls._evaluate_loop(program_tree, ancestor, values)
+            values[program_tree.iterators[ancestor].name] = mean
+
+        node = program_tree.iterators[iterator_id]
+        first, trip_count, _ = cls._evaluate_loop(program_tree, iterator_id, values)
+        last = first + node.step * (trip_count - 1)
+        first_work = cls._get_iteration_work(
+            program_tree, iterator_id, {**values, node.name: first}
+        )
+        last_work = cls._get_iteration_work(
+            program_tree, iterator_id, {**values, node.name: last}
+        )
+        if math.isnan(first_work) or math.isnan(last_work) or nbr_chunks < 1:
+            return 1.0
+
+        largest_chunk = max(first_work, last_work) - abs(last_work - first_work) / (
+            2 * nbr_chunks
+        )
+        if largest_chunk <= 0:
+            return 1.0
+        return (first_work + last_work) / 2 / largest_chunk
+
+    @classmethod
+    def _get_iteration_work(
+        cls,
+        program_tree: TiramisuTree,
+        iterator_id: IteratorIdentifier,
+        values: Dict[str, float],
+    ) -> float:
+        # computation executions in one iteration of a loop, the nested
+        # loops being evaluated at the mean values of their parents
+        node = program_tree.iterators[iterator_id]
+        work = float(len(node.computations_list))
+        for child in node.child_iterators:
+            _, trip_count, mean = cls._evaluate_loop(program_tree, child, values)
+            work += trip_count * cls._get_iteration_work(
+                program_tree,
+                child,
+                {**values, program_tree.iterators[child].name: mean},
+            )
+        return work
+
+    @classmethod
+    def _evaluate_loop(
+        cls,
+        program_tree: TiramisuTree,
+        iterator_id: IteratorIdentifier,
+        values: Dict[str, float],
+    ) -> Tuple[float, float, float]:
+        # first value, trip count and mean value of a loop
+        node = program_tree.iterators[iterator_id]
+        try:
+            _, lower_pieces = AffineExpression.parse_bound(node.lower_bound)
+            _, upper_pieces = AffineExpression.parse_bound(node.upper_bound)
+        except AffineParsingError:
+            return math.nan, math.nan, math.nan
+        lower_bound = max(piece.evaluate(values) for piece in lower_pieces)
+        upper_bound = min(piece.evaluate(values) for piece in upper_pieces)
+        inclusive = 1 if program_tree.upper_bounds_are_inclusive else 0
+        extent = (upper_bound - lower_bound + inclusive) / node.step
+        trip_count = max(math.ceil(extent) if node.step > 1 else extent, 0)
+        return lower_bound, trip_count, lower_bound + node.step * (trip_count - 1) / 2
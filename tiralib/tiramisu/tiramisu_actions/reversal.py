@@ -17,6 +17,8 @@ class Reversal(TiramisuAction):
     Reversal optimization command.
     """
 
+    __slots__ = ("iterator_id",)
+
     def __init__(
         self, params: List[IteratorIdentifier], comps: List[str] | None = None
     ):
@@ -29,8 +31,7 @@ class Reversal(TiramisuAction):
         super().__init__(type=TiramisuActionType.REVERSAL, params=params, comps=comps)
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
 
         # user passed a different iteratorId than the main one
         if self.iterator_id not in tiramisu_tree.iterators:
@@ -42,12 +43,9 @@ class Reversal(TiramisuAction):
             iterator = tiramisu_tree.iterators[self.iterator_id]
 
             self.comps = tiramisu_tree.get_iterator_subtree_computations(iterator.id)
-            # order the computations by their absolute order
-            self.comps.sort(
-                key=lambda comp: tiramisu_tree.computations_absolute_order[comp]
-            )
 
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.iterator_id is not None
@@ -83,8 +81,17 @@ class Reversal(TiramisuAction):
 
         return candidates
 
-    def transform_tree(self, program_tree: TiramisuTree):
-        node = program_tree.iterators[self.params[0]]
+    def transform_tree(self, program_tree: TiramisuTree) -> TiramisuTree:
+        """
+        Returns a copy of the tree where the bounds of the reversed loop are
+        reversed. The given tree, which may be shared with the schedules and
+        the actions initialized for it, is left unchanged.
+        """
+        transformed_tree = copy.deepcopy(program_tree)
+        iterator_id = self.params[0]
+        if iterator_id not in transformed_tree.iterators:
+            iterator_id = transformed_tree.get_iterator_of_computation(*iterator_id).id
+        node = transformed_tree.iterators[iterator_id]
 
         # Reverse the loop bounds
         if isinstance(node.lower_bound, int) and isinstance(node.upper_bound, int):
@@ -98,3 +105,6 @@ class Reversal(TiramisuAction):
                 node.upper_bound,
                 node.lower_bound,
             )
+
+        transformed_tree.invalidate_node(iterator_id)
+        return transformed_tree
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import copy
 import itertools
 from typing import TYPE_CHECKING, Dict, List, Tuple
 
-from tiralib.tiramisu.compiling_service import CompilingService
+from tiralib.tiramisu.skewing_solver_cache import SkewingSolverCache
 from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
@@ -22,6 +21,8 @@ class Skewing(TiramisuAction):
     Skewing optimization command.
     """
 
+    __slots__ = ("iterators", "factors")
+
     def __init__(
         self,
         params: List[IteratorIdentifier | int],
@@ -45,8 +46,7 @@ class Skewing(TiramisuAction):
         )
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
         for idx, iterator in enumerate(self.iterators):
             if iterator not in tiramisu_tree.iterators:
                 self.iterators[idx] = self.tree.get_iterator_of_computation(
@@ -62,12 +62,9 @@ class Skewing(TiramisuAction):
             self.comps = self.tree.get_iterator_subtree_computations(
                 outermost_iterator.id
             )
-            # sort the computations according to the absolute order
-            self.comps.sort(
-                key=lambda comp: self.tree.computations_absolute_order[comp]
-            )
 
-        self.set_string_representations(self.tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.iterators is not None
@@ -116,11 +113,45 @@ class Skewing(TiramisuAction):
         schedule: Schedule,
         loop_levels: List[int],
         comps_skewed_loops: List[str],
-    ) -> Tuple[int, int]:
-        factors = CompilingService.call_skewing_solver(
-            schedule, loop_levels, comps_skewed_loops
+        solver_cache: SkewingSolverCache | None = None,
+    ) -> Tuple[int, int] | None:
+        """
+        Returns the skewing factors found by the skewing solver for the loops
+        of the schedule, or `None` when the solver has no solution. The
+        results are memoised in `solver_cache`, the shared cache by default.
+        """
+        if solver_cache is None:
+            solver_cache = SkewingSolverCache.get_default()
+        return solver_cache.get_factors(schedule, loop_levels, comps_skewed_loops)
+
+    @classmethod
+    def prefetch_factors(
+        cls,
+        schedule: Schedule,
+        candidates: List[Tuple[IteratorIdentifier, IteratorIdentifier]],
+        solver_cache: SkewingSolverCache | None = None,
+        max_workers: int | None = None,
+    ) -> Dict[Tuple[IteratorIdentifier, IteratorIdentifier], Tuple[int, int] | None]:
+        """
+        Runs the skewing solver in parallel for the candidates of a section
+        (as returned by `get_candidates`) whose factors are not cached yet,
+        and returns the factors of every candidate.
+        """
+        if solver_cache is None:
+            solver_cache = SkewingSolverCache.get_default()
+        assert schedule.tree
+
+        queries = {
+            candidate: (
+                schedule.tree.get_iterator_levels(list(candidate)),
+                schedule.tree.get_iterator_subtree_computations(candidate[0]),
+            )
+            for candidate in candidates
+        }
+        results = solver_cache.prefetch(
+            schedule, list(queries.values()), max_workers=max_workers
         )
-        if factors is not None:
-            return factors
-        else:
-            return None
+        return {
+            candidate: results[solver_cache.get_key(schedule, *query)]
+            for candidate, query in queries.items()
+        }
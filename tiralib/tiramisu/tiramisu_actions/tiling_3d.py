@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-import copy
 import itertools
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
@@ -13,12 +12,17 @@ from tiralib.tiramisu.tiramisu_actions.tiramisu_action import (
     TiramisuActionType,
 )
 
+if TYPE_CHECKING:
+    from tiralib.tiramisu.tile_sizes import TileSizeGenerator
+
 
 class Tiling3D(TiramisuAction):
     """
     3D Tiling optimization command.
     """
 
+    __slots__ = ("iterators", "tile_sizes")
+
     def __init__(
         self,
         params: List[IteratorIdentifier | int],
@@ -53,8 +57,7 @@ class Tiling3D(TiramisuAction):
         super().__init__(type=TiramisuActionType.TILING_3D, params=params, comps=comps)
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
         for idx, iterator in enumerate(self.iterators):
             if iterator not in tiramisu_tree.iterators:
                 self.iterators[idx] = self.tree.get_iterator_of_computation(
@@ -74,24 +77,20 @@ class Tiling3D(TiramisuAction):
                 outermost_iterator.id
             )
 
-            # sort the computations according to the absolute order
-            self.comps.sort(
-                key=lambda comp: self.tree.computations_absolute_order[comp]
-            )
-
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert len(self.params) == 6
         assert self.iterators is not None
         assert self.comps is not None
 
-        all_comps = tiramisu_tree.computations
+        all_comps = sorted(
+            tiramisu_tree.computations,
+            key=lambda comp: tiramisu_tree.computations_absolute_order[comp],
+        )
 
         if len(all_comps) > 1:
-            all_comps.sort(
-                key=lambda comp: tiramisu_tree.computations_absolute_order[comp]
-            )
             fusion_levels = self.get_fusion_levels(all_comps, tiramisu_tree)
 
         self.tiramisu_optim_str = ""
@@ -142,6 +141,20 @@ class Tiling3D(TiramisuAction):
 
         return candidates
 
+    @classmethod
+    def from_candidate(
+        cls,
+        candidate: Tuple[IteratorIdentifier, ...],
+        tiramisu_tree: TiramisuTree,
+        tile_size_generator: TileSizeGenerator,
+    ) -> "Tiling3D":
+        """
+        Returns the tiling of a candidate with the best tile sizes proposed
+        by `tile_size_generator`.
+        """
+        proposal = tile_size_generator.propose(tiramisu_tree, list(candidate), top_k=1)
+        return Tiling3D(list(candidate) + list(proposal[0].tile_sizes))
+
     def get_fusion_levels(
         self,
         ordered_computations: List[str],
@@ -152,34 +165,11 @@ class Tiling3D(TiramisuAction):
         # get the shared iterator level
         for comp1, comp2 in itertools.pairwise(ordered_computations):
             # get the shared iterator level
-            iter_comp_1 = tiramisu_tree.get_iterator_of_computation(comp1)
-            iter_comp_2 = tiramisu_tree.get_iterator_of_computation(comp2)
-            fusion_level: int | None = None
-
-            # get the shared iterator level
-            while iter_comp_1.name != iter_comp_2.name:
-                if iter_comp_1.level > iter_comp_2.level:
-                    # if parent is None then
-                    # the iterators don't have a common parent
-                    if iter_comp_1.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_1 = tiramisu_tree.iterators[
-                            iter_comp_1.parent_iterator
-                        ]
-                else:
-                    if iter_comp_2.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_2 = tiramisu_tree.iterators[
-                            iter_comp_2.parent_iterator
-                        ]
-
-            # same iterator
-            if fusion_level is None:
-                fusion_level = iter_comp_1.level
+            shared_iterator = tiramisu_tree.get_shared_iterator_of_computations(
+                comp1, comp2
+            )
+            # -1 if the computations don't have a common iterator
+            fusion_level = shared_iterator.level if shared_iterator else -1
 
             if comp1 in self.comps and comp2 in self.comps:
                 fusion_level += 3
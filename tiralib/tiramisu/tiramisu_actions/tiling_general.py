@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import copy
 import itertools
 import random
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
 from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
@@ -14,12 +13,17 @@ from tiralib.tiramisu.tiramisu_actions.tiramisu_action import (
     TiramisuActionType,
 )
 
+if TYPE_CHECKING:
+    from tiralib.tiramisu.tile_sizes import TileSizeGenerator
+
 
 class TilingGeneral(TiramisuAction):
     """
     General Tiling for non perfectly nested loops optimization command.
     """
 
+    __slots__ = ("iterators", "tile_sizes", "nbr_iterators", "tile_sizes_dict")
+
     def __init__(
         self,
         params: list[IteratorIdentifier | int],
@@ -49,8 +53,7 @@ class TilingGeneral(TiramisuAction):
         )
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
         for idx, iterator in enumerate(self.iterators):
             if iterator not in tiramisu_tree.iterators:
                 self.iterators[idx] = self.tree.get_iterator_of_computation(
@@ -67,7 +70,8 @@ class TilingGeneral(TiramisuAction):
             for iterator in self.iterators:
                 self.comps.extend(tiramisu_tree.iterators[iterator].computations_list)
 
-        self.set_string_representations(self.tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.comps is not None
@@ -75,12 +79,6 @@ class TilingGeneral(TiramisuAction):
         assert self.tile_sizes_dict is not None
         assert self.iterators is not None
 
-        all_comps = tiramisu_tree.computations
-        if len(all_comps) > 1:
-            all_comps.sort(
-                key=lambda comp: tiramisu_tree.computations_absolute_order[comp]
-            )
-
         self.tiramisu_optim_str = ""
 
         for comp in self.comps:
@@ -178,38 +176,15 @@ class TilingGeneral(TiramisuAction):
         # get the shared iterator level
         for comp1, comp2 in itertools.pairwise(ordered_computations):
             # get the shared iterator level
-            iter_comp_1 = tiramisu_tree.get_iterator_of_computation(comp1)
-            iter_comp_2 = tiramisu_tree.get_iterator_of_computation(comp2)
-            fusion_level: int | None = None
-
-            # get the shared iterator level
-            while iter_comp_1.name != iter_comp_2.name:
-                if iter_comp_1.level > iter_comp_2.level:
-                    # parent is None ->
-                    # the iterators don't have a common parent
-                    if iter_comp_1.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_1 = tiramisu_tree.iterators[
-                            iter_comp_1.parent_iterator
-                        ]
-                else:
-                    if iter_comp_2.parent_iterator is None:
-                        fusion_level = -1
-                        break
-                    else:
-                        iter_comp_2 = tiramisu_tree.iterators[
-                            iter_comp_2.parent_iterator
-                        ]
-
-            # same iterator
-            if fusion_level is None:
-                fusion_level = iter_comp_1.level
+            shared_iterator = tiramisu_tree.get_shared_iterator_of_computations(
+                comp1, comp2
+            )
+            # -1 if the computations don't have a common iterator
+            fusion_level = shared_iterator.level if shared_iterator else -1
 
             if comp1 in self.comps and comp2 in self.comps:
                 nbr_addition = 0
-                tmp_iterator = iter_comp_1
+                tmp_iterator = shared_iterator
                 while tmp_iterator is not None:
                     if tmp_iterator.id in self.iterators:
                         nbr_addition += 1
@@ -232,7 +207,7 @@ class TilingGeneral(TiramisuAction):
     ) -> dict[IteratorIdentifier, list[list[IteratorIdentifier]]]:
         """
         Returns a dictionary with lists of candidate sections for
-        each root iterator.
+        each root iterator. The sections are memoized on the tree.
 
         Returns:
         -------
@@ -240,7 +215,15 @@ class TilingGeneral(TiramisuAction):
         `candidate_sections`: `dict[str, list[list[str]]]`
             Dictionary with lists of candidate sections for each root iterator.
         """
+        return tiramisu_tree.get_analysis(
+            "imperfect_candidate_sections", cls._compute_imperfect_candidate_sections
+        )
 
+    @classmethod
+    def _compute_imperfect_candidate_sections(
+        cls,
+        tiramisu_tree: TiramisuTree,
+    ) -> dict[IteratorIdentifier, list[list[IteratorIdentifier]]]:
         candidate_sections = {}
         for root in tiramisu_tree.roots:
             nodes_to_visit = [root]
@@ -286,10 +269,16 @@ class TilingGeneral(TiramisuAction):
         candidate: list[str],
         tiramisu_tree: TiramisuTree,
         random_tile_sizes: list[int] = [2, 4, 8, 10, 16, 32, 64],
+        tile_size_generator: TileSizeGenerator | None = None,
     ):
         iterators = [
             tiramisu_tree.get_iterator_id_from_name(iterator_name)
             for iterator_name in candidate
         ]
-        tile_sizes = [random.choice(random_tile_sizes) for _ in iterators]
+        if tile_size_generator is not None:
+            # best proposal of the generator instead of random sizes
+            proposal = tile_size_generator.propose(tiramisu_tree, iterators, top_k=1)
+            tile_sizes = list(proposal[0].tile_sizes)
+        else:
+            tile_sizes = [random.choice(random_tile_sizes) for _ in iterators]
         return TilingGeneral(iterators + tile_sizes)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 from enum import Enum
 from typing import List  # ,TYPE_CHECKING
 
@@ -21,6 +22,7 @@ class TiramisuActionType(Enum):
     EXPANSION = 9
     TILING_GENERAL = 10
     MATRIX_TRANSFORM = 11
+    VECTORIZATION = 12
     # WHENEVER YOU ADD AN ACTION GO EDIT THE NUMBER OF ACTIONS TEST
 
 
@@ -28,31 +30,69 @@ class TiramisuAction:
     """
     Base class for all optimization commands.
 
+    Two actions are equal when they have the same type, parameters and
+    computations, the computations being the ones resolved from the tree
+    once the actions are initialized. The hash only uses the type and the
+    parameters, which can not be changed after the action is created, so
+    an action keeps its hash when it is initialized. The computations and
+    the tree are filled in when the action is initialized for a tree, after
+    which the action is frozen: its attributes can not be assigned anymore,
+    and a schedule given an action that is already initialized initializes
+    a `copy` of it. The string representations are derived from the tree
+    the first time they are read. Actions use `__slots__` and share the
+    tree they are initialized with instead of copying it: they must not
+    modify it, and the methods of the actions that transform a tree (like
+    `Reversal.transform_tree`) return a new tree.
+
     Attributes:
     ----------
 
     `type`: `TiramisuActionType`
         The type of the optimization command.
 
-    `params`: `list`
-        The parameters of the optimization command.
+    `params`: `tuple`
+        The parameters of the optimization command, lists are converted to
+        tuples.
 
     `comps`: `list`
-        The computations that are concerned by the optimization command.
+        The computations that are concerned by the optimization command,
+        resolved from the tree when the action is initialized if they were
+        not given.
 
     """
 
+    __slots__ = (
+        "type",
+        "params",
+        "comps",
+        "tree",
+        "_hash",
+        "_frozen",
+        "_strings_tree",
+        "_tiramisu_optim_str",
+        "_str_representation",
+        "_legality_check_string",
+    )
+
     def __init__(
         self,
         type: TiramisuActionType,
         params: list | dict,
         comps: List[str] | List[List[str]],
     ):
-        self.params = params
+        self.params = tuple(params) if isinstance(params, list) else params
         # A list of concerned computations of the actions
         self.comps = comps
         # The type of the action
         self.type = type
+        # The tree the action is initialized for
+        self.tree: TiramisuTree | None = None
+        # Equal actions have the same type and parameters
+        self._hash = hash((type, _freeze(self.params)))
+        # Set once the action is initialized for a tree
+        self._frozen = False
+        # The tree the string representations are still to be derived from
+        self._strings_tree: TiramisuTree | None = None
         # The tiramisu code that represents the action
         self.tiramisu_optim_str = ""
         # The str representation of the action
@@ -60,10 +100,82 @@ class TiramisuAction:
         # The legality string of the action
         self.legality_check_string = ""
 
+    def __setattr__(self, name: str, value) -> None:
+        if name in ("type", "params") and hasattr(self, "_hash"):
+            raise AttributeError(f"can't set {name} of an action once created")
+        if getattr(self, "_frozen", False) and name not in _LAZY_ATTRIBUTES:
+            raise AttributeError(
+                f"can't set {name} of an action initialized for a tree, "
+                "initialize a copy of the action instead"
+            )
+        super().__setattr__(name, value)
+
+    def freeze(self) -> None:
+        """
+        Prevents the attributes of the action from being assigned, called
+        once the action is initialized for a tree.
+        """
+        self._frozen = True
+
+    @property
+    def tiramisu_optim_str(self) -> str:
+        self._update_string_representations()
+        return self._tiramisu_optim_str
+
+    @tiramisu_optim_str.setter
+    def tiramisu_optim_str(self, value: str) -> None:
+        self._tiramisu_optim_str = value
+
+    @property
+    def str_representation(self) -> str:
+        self._update_string_representations()
+        return self._str_representation
+
+    @str_representation.setter
+    def str_representation(self, value: str) -> None:
+        self._str_representation = value
+
+    @property
+    def legality_check_string(self) -> str:
+        self._update_string_representations()
+        return self._legality_check_string
+
+    @legality_check_string.setter
+    def legality_check_string(self, value: str) -> None:
+        self._legality_check_string = value
+
+    def defer_string_representations(self, tiramisu_tree: TiramisuTree) -> None:
+        """
+        Marks the string representations to be derived from `tiramisu_tree`
+        the next time one of them is read.
+        """
+        self._strings_tree = tiramisu_tree
+
+    def _update_string_representations(self) -> None:
+        tiramisu_tree = self._strings_tree
+        if tiramisu_tree is not None:
+            # cleared first as set_string_representations reads the strings
+            self._strings_tree = None
+            self.set_string_representations(tiramisu_tree)
+
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
         """Initialize the optimization command for the Tiramisu program."""
         raise NotImplementedError
 
+    def copy(self) -> TiramisuAction:
+        """
+        Returns a copy of the action, equal to it, that can be initialized
+        for another tree without changing this action.
+        """
+        action = copy.copy(self)
+        object.__setattr__(action, "_frozen", False)
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                value = getattr(self, slot, None)
+                if isinstance(value, list):
+                    object.__setattr__(action, slot, list(value))
+        return action
+
     def set_string_representations(self, tiramisu_tree: TiramisuTree) -> str:
         """Convert the optimization command into Tiramisu code.
         Returns:
@@ -89,6 +201,9 @@ class TiramisuAction:
     def is_unrolling(self) -> bool:
         return self.type == TiramisuActionType.UNROLLING
 
+    def is_vectorization(self) -> bool:
+        return self.type == TiramisuActionType.VECTORIZATION
+
     def is_fusion(self) -> bool:
         return self.type == TiramisuActionType.FUSION
 
@@ -121,15 +236,48 @@ class TiramisuAction:
     def __repr__(self) -> str:
         return f"Action(type={self.type}, params={self.params}, comps={self.comps})"  # noqa: E501
 
+    def canonical_key(self) -> tuple:
+        """
+        Returns a hashable key made of the fields compared by `__eq__`
+        (type, parameters and resolved computations) that is stable across
+        processes. Two equal actions have the same canonical key.
+        """
+        return (self.type.value, _freeze(self.params), _freeze(self.comps))
+
     def __eq__(self, __value: object) -> bool:
         if not isinstance(__value, TiramisuAction):
             return False
         return (
-            self.type == __value.type
+            self._hash == __value._hash
+            and self.type == __value.type
             and self.params == __value.params
             and self.comps == __value.comps
         )
 
+    def __hash__(self) -> int:
+        return self._hash
+
+
+# The attributes that are still set once the action is frozen
+_LAZY_ATTRIBUTES = (
+    "_strings_tree",
+    "tiramisu_optim_str",
+    "str_representation",
+    "legality_check_string",
+    "_tiramisu_optim_str",
+    "_str_representation",
+    "_legality_check_string",
+)
+
+
+def _freeze(value):
+    """Recursively converts lists and dicts into tuples so they can be hashed."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    return value
+
 
 class CannotApplyException(Exception):
     pass
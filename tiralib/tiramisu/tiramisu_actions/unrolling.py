@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import copy
-from typing import List
+import math
+from typing import Dict, List
 
+from tiralib.tiramisu.affine_bounds import TripCountEstimator
 from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
@@ -17,6 +18,8 @@ class Unrolling(TiramisuAction):
     Unrolling optimization command.
     """
 
+    __slots__ = ("iterator_id", "unrolling_factor")
+
     def __init__(
         self,
         params: List[IteratorIdentifier | int],
@@ -37,8 +40,7 @@ class Unrolling(TiramisuAction):
         super().__init__(type=TiramisuActionType.UNROLLING, params=params, comps=comps)
 
     def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
-        # clone the tree to be able to restore it later
-        self.tree = copy.deepcopy(tiramisu_tree)
+        self.tree = tiramisu_tree
         if self.iterator_id not in tiramisu_tree.iterators:
             self.iterator_id = self.tree.get_iterator_of_computation(
                 *self.iterator_id
@@ -49,12 +51,9 @@ class Unrolling(TiramisuAction):
 
             # Get the computations that are in the loop to be unrolled
             self.comps = tiramisu_tree.get_iterator_subtree_computations(iterator.id)
-            # order the computations by their absolute order
-            self.comps.sort(
-                key=lambda comp: tiramisu_tree.computations_absolute_order[comp]
-            )
 
-        self.set_string_representations(tiramisu_tree)
+        self.defer_string_representations(self.tree)
+        self.freeze()
 
     def set_string_representations(self, tiramisu_tree: TiramisuTree):
         assert self.iterator_id is not None
@@ -84,3 +83,78 @@ class Unrolling(TiramisuAction):
                 candidates.append(program_tree.iterators[iterator].id)
 
         return candidates
+
+    @classmethod
+    def propose_factors(
+        cls,
+        tree: TiramisuTree,
+        candidate: IteratorIdentifier,
+        parameters: Dict[str, int] | None = None,
+        max_factors: int = 3,
+        max_unrolled_statements: int = 64,
+    ) -> List[int]:
+        """
+        Returns a ranked list of unrolling factors for a candidate loop.
+
+        The factors are limited by the size of the unrolled body: the
+        number of computations of the loop times the factor must not exceed
+        `max_unrolled_statements`. Loops with few iterations are fully
+        unrolled first, then the factors dividing the trip count (no
+        remainder loop) are preferred, largest first. When the trip count
+        is symbolic, or only estimated (bounds depending on outer loops),
+        powers of two are proposed from 4 outwards.
+
+        Parameters
+        ----------
+        `tree` : `TiramisuTree`
+            The tree of the program.
+        `candidate` : `IteratorIdentifier`
+            The loop to unroll, as given by `get_candidates`.
+        `parameters` : `Dict[str, int] | None`
+            The values of the symbolic parameters used in the bounds.
+        `max_factors` : `int`
+            The maximum number of factors returned.
+        `max_unrolled_statements` : `int`
+            The maximum number of statements of the unrolled body.
+        """
+        nbr_statements = max(len(tree.get_iterator_subtree_computations(candidate)), 1)
+        max_factor = max(max_unrolled_statements // nbr_statements, 2)
+        powers = [2**power for power in range(1, max_factor.bit_length())]
+
+        trip_count = TripCountEstimator.get_loop_trip_counts(tree, parameters).get(
+            candidate, math.nan
+        )
+        if math.isnan(trip_count):
+            # unknown trip count, moderate factors first
+            factors = sorted(
+                powers, key=lambda factor: (abs(factor.bit_length() - 3), -factor)
+            )
+            return factors[:max_factors]
+        if trip_count < 2:
+            return []
+        if trip_count != int(trip_count):
+            # estimated trip count, the remainders are unknown
+            factors = [factor for factor in powers if factor <= trip_count]
+            return factors[::-1][:max_factors]
+
+        trip_count = int(trip_count)
+        factors = []
+        if trip_count <= max_factor:
+            factors.append(trip_count)
+        factors.extend(
+            factor
+            for factor in range(min(trip_count // 2, max_factor), 1, -1)
+            if trip_count % factor == 0
+        )
+        # factors leaving a remainder loop, the shortest remainder first
+        factors.extend(
+            sorted(
+                (
+                    factor
+                    for factor in powers
+                    if factor < trip_count and factor not in factors
+                ),
+                key=lambda factor: (trip_count % factor, -factor),
+            )
+        )
+        return factors[:max_factors]
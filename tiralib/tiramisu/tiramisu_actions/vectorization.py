@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import math
+from typing import List
+
+from tiralib.tiramisu.affine_bounds import TripCountEstimator
+from tiralib.tiramisu.tiramisu_iterator_node import IteratorIdentifier
+from tiralib.tiramisu.tiramisu_tree import TiramisuTree
+
+from tiralib.tiramisu.tiramisu_actions.tiramisu_action import (
+    TiramisuAction,
+    TiramisuActionType,
+)
+
+
+class Vectorization(TiramisuAction):
+    """
+    Vectorization optimization command.
+    """
+
+    __slots__ = ("iterator_id", "vector_width")
+
+    def __init__(
+        self,
+        params: List[IteratorIdentifier | int],
+        comps: List[str] | None = None,
+    ):
+        # Vectorization takes 2 parameters: the iterator to vectorize and the
+        # vector width
+        assert len(params) == 2
+        assert isinstance(params[0], tuple) and isinstance(params[1], int), (
+            f"Invalid vectorization parameters: {params}"
+        )
+        self.iterator_id = params[0]
+        self.vector_width = params[1]
+
+        self.params = params
+        self.comps = comps
+
+        super().__init__(
+            type=TiramisuActionType.VECTORIZATION, params=params, comps=comps
+        )
+
+    def initialize_action_for_tree(self, tiramisu_tree: TiramisuTree):
+        self.tree = tiramisu_tree
+        if self.iterator_id not in tiramisu_tree.iterators:
+            self.iterator_id = self.tree.get_iterator_of_computation(
+                *self.iterator_id
+            ).id
+
+        if self.comps is None:
+            iterator = tiramisu_tree.iterators[self.iterator_id]
+
+            # Get the computations that are in the loop to be vectorized
+            self.comps = tiramisu_tree.get_iterator_subtree_computations(iterator.id)
+
+        self.defer_string_representations(self.tree)
+        self.freeze()
+
+    def set_string_representations(self, tiramisu_tree: TiramisuTree):
+        assert self.iterator_id is not None
+        assert self.vector_width is not None
+        assert self.comps is not None
+
+        loop_level = self.iterator_id[1]
+        vector_width = self.vector_width
+        self.tiramisu_optim_str = "\n    ".join(
+            [f"{comp}.vectorize({loop_level},{vector_width});" for comp in self.comps]
+        )
+        self.str_representation = (
+            f"V(L{str(loop_level)},{str(vector_width)},comps={self.comps})"
+        )
+
+        self.legality_check_string = f"prepare_schedules_for_legality_checks(true);\n    is_legal &= loop_vectorization_is_legal({loop_level}, {{{', '.join([f'&{comp}' for comp in self.comps])}}});\n    {self.tiramisu_optim_str}"  # noqa: E501
+
+    @classmethod
+    def get_candidates(
+        cls,
+        program_tree: TiramisuTree,
+        annotations: dict | None = None,
+        vector_width: int = 8,
+    ) -> List[IteratorIdentifier]:
+        """
+        Returns the innermost loops worth vectorizing: the loops with
+        computations and no nested loops that run at least `vector_width`
+        iterations (loops with unknown trip counts are kept).
+
+        When the annotations of the program are given, the loops whose
+        computations access memory with a stride (the loop appears in
+        another dimension than the last one, or with a coefficient other
+        than 1 in the last one) are left out as they would need gathers.
+        The columns of the access matrices are matched with the levels of
+        the loops, which is exact on trees that were not reordered.
+        """
+        trip_counts = TripCountEstimator.get_loop_trip_counts(program_tree)
+        candidates: List[IteratorIdentifier] = []
+
+        for iterator_id, iterator_node in program_tree.iterators.items():
+            if iterator_node.child_iterators or not iterator_node.computations_list:
+                continue
+            trip_count = trip_counts[iterator_id]
+            if not math.isnan(trip_count) and trip_count < vector_width:
+                continue
+            if annotations and not all(
+                cls._has_unit_stride(
+                    annotations["computations"][comp], iterator_node.level
+                )
+                for comp in iterator_node.computations_list
+                if comp in annotations["computations"]
+            ):
+                continue
+            candidates.append(iterator_id)
+
+        return candidates
+
+    @classmethod
+    def _has_unit_stride(cls, comp_dict: dict, level: int) -> bool:
+        # every access is either invariant in the loop or contiguous
+        for access in comp_dict["accesses"]:
+            matrix = access["access_matrix"]
+            if not matrix or level >= len(matrix[0]) - 1:
+                continue
+            outer_rows = [row[level] for row in matrix[:-1]]
+            if any(outer_rows) or abs(matrix[-1][level]) > 1:
+                return False
+        return True
@@ -1,9 +1,25 @@
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
 IteratorIdentifier = Tuple[str, int]
 
 
 class IteratorNode:
+    __slots__ = (
+        "name",
+        "id",
+        "parent_iterator",
+        "lower_bound",
+        "upper_bound",
+        "child_iterators",
+        "computations_list",
+        "level",
+        "step",
+        "_owner",
+    )
+
     def __init__(
         self,
         name: str,
@@ -14,6 +30,7 @@ class IteratorNode:
         computations_list: list[str],
         level: int,
         id: IteratorIdentifier = None,
+        step: int = 1,
     ):
         self.name = name
         self.id: IteratorIdentifier = id
@@ -23,12 +40,22 @@ class IteratorNode:
         self.child_iterators = child_iterators
         self.computations_list = computations_list
         self.level = level
+        self.step = step
+        # the tree that indexed the node, its indexes are dropped when the
+        # node is edited through its methods
+        self._owner: TiramisuTree | None = None
 
     def add_child(self, child: str) -> None:
         self.child_iterators.append(child)
+        self._invalidate_owner()
 
     def add_computation(self, comp: str) -> None:
         self.computations_list.append(comp)
+        self._invalidate_owner()
+
+    def _invalidate_owner(self) -> None:
+        if self._owner is not None:
+            self._owner.invalidate_indexes()
 
     def has_non_rectangular(self) -> bool:
         return (
@@ -56,6 +83,7 @@ class IteratorNode:
             child_iterators=[child + suffix for child in self.child_iterators],
             computations_list=[comp + suffix for comp in self.computations_list],
             level=self.level,
+            step=self.step,
         )
 
     def __str__(self) -> str:
@@ -1,13 +1,17 @@
+import hashlib
 import json
 import random
 import re
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
 from tiralib.tiramisu.compiling_service import CompilingService
 from tiralib.tiramisu.function_server import FunctionServer
 from tiralib.tiramisu.tiramisu_tree import TiramisuTree
 
+if TYPE_CHECKING:
+    from tiralib.tiramisu.dependence_analysis import DependenceAnalysis
+
 
 class TiramisuProgram:
     """This class represents a tiramisu function. It contains all the neccessary
@@ -53,6 +57,7 @@ class TiramisuProgram:
         self.tree: TiramisuTree = None
         self.wrapper_obj: bytes | None = None
         self.server: FunctionServer | None = None
+        self._dependence_analysis: DependenceAnalysis | None = None
 
     @classmethod
     def from_dict(
@@ -277,6 +282,34 @@ class TiramisuProgram:
 
         return wrapper_cpp_code, wrapper_h_code
 
+    def get_dependence_analysis(self) -> "DependenceAnalysis":
+        """Returns the dependences of the program, extracted once from its
+        annotations. The annotations are queried from the function server or
+        compiled if they were not loaded.
+        """
+        # imported here as the actions import the schedule,
+        # which imports this module
+        from tiralib.tiramisu.dependence_analysis import DependenceAnalysis
+
+        if self._dependence_analysis is None:
+            if self.annotations is None:
+                if self.server:
+                    annotations_str = self.server.get_annotations()
+                else:
+                    annotations_str = CompilingService.compile_annotations(self)
+                self.annotations = json.loads(annotations_str)
+            self._dependence_analysis = DependenceAnalysis.from_annotations(
+                self.annotations
+            )
+        return self._dependence_analysis
+
+    def get_source_hash(self) -> str:
+        """Returns a hash of the name and the code of the program that is
+        stable across processes, used to key the results cached for it.
+        """
+        source = self.original_str or ""
+        return hashlib.sha256(f"{self.name}\n{source}".encode()).hexdigest()
+
     def __str__(self) -> str:
         return f"TiramisuProgram(name={self.name})"
 
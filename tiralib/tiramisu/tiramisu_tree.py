@@ -1,5 +1,6 @@
-import re
-from typing import Tuple
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Tuple
 
 from tiralib.tiramisu.tiramisu_iterator_node import (
     IteratorIdentifier,
@@ -7,6 +8,47 @@ from tiralib.tiramisu.tiramisu_iterator_node import (
 )
 
 
+@dataclass
+class TreeDiff:
+    """Differences between two trees, as returned by `TiramisuTree.diff`.
+
+    Attributes:
+    ----------
+    `added_iterators`: `set[IteratorIdentifier]`
+        Iterators that are only in the new tree.
+    `removed_iterators`: `set[IteratorIdentifier]`
+        Iterators that are only in the old tree.
+    `modified_iterators`: `set[IteratorIdentifier]`
+        Iterators of both trees whose name, bounds, level, parent, children
+        or computations changed.
+    `moved_computations`: `dict[str, tuple[IteratorIdentifier | None, IteratorIdentifier | None]]`
+        Computations whose iterator changed, with their iterator in the old
+        and in the new tree (None if the computation is not in that tree).
+    `reordered_computations`: `set[str]`
+        Computations whose absolute order changed.
+    """  # noqa: E501
+
+    added_iterators: set = field(default_factory=set)
+    removed_iterators: set = field(default_factory=set)
+    modified_iterators: set = field(default_factory=set)
+    moved_computations: dict = field(default_factory=dict)
+    reordered_computations: set = field(default_factory=set)
+
+    @property
+    def affected_iterators(self) -> set:
+        """
+        The iterators whose subtree has to be recomputed.
+        """
+        return self.added_iterators | self.removed_iterators | self.modified_iterators
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.affected_iterators
+            or self.moved_computations
+            or self.reordered_computations
+        )
+
+
 class TiramisuTree:
     """This class represents the tree structure of a Tiramisu program.
     It is composed of a list of IteratorNode objects, each of which represents
@@ -23,6 +65,22 @@ class TiramisuTree:
         the iterator.
     `computations`: `list[str]`
         list of names of the computations in the Tiramisu program.
+    `upper_bounds_are_inclusive`: `bool`
+        Whether the upper bounds of the iterators are inclusive (trees built
+        from the ISL AST) or exclusive (trees built from the annotations).
+
+    Lookups by computation, iterator name, root and level go through hash
+    indexes that are built on first use and dropped whenever `roots` or
+    `iterators` are replaced or modified through the tree's methods, or a
+    node is edited through `IteratorNode.add_child` and
+    `IteratorNode.add_computation` (the nodes keep a reference to the tree
+    that indexed them). Any other edit of the nodes, like assigning their
+    ids, names, bounds or lists directly, is not seen by the tree: the code
+    doing it must call `invalidate_indexes` or `invalidate_node` itself.
+
+    Analyses of the tree that the candidate generators share, like the
+    candidate sections, are memoized on the tree (see `get_analysis`) and
+    dropped with the indexes.
     """
 
     def __init__(self) -> None:
@@ -30,12 +88,155 @@ class TiramisuTree:
         self.iterators: dict[IteratorIdentifier, IteratorNode] = {}
         self.computations: list[str] = []
         self.computations_absolute_order: dict[str, int] = {}
+        # the ISL AST gives inclusive upper bounds (i <= N - 1) while the
+        # annotations give exclusive ones (i < N)
+        self.upper_bounds_are_inclusive = False
+
+    @property
+    def roots(self) -> list[IteratorIdentifier]:
+        return self._roots
+
+    @roots.setter
+    def roots(self, roots: list[IteratorIdentifier]) -> None:
+        self._roots = roots
+        self.invalidate_indexes()
+
+    @property
+    def iterators(self) -> dict[IteratorIdentifier, IteratorNode]:
+        return self._iterators
+
+    @iterators.setter
+    def iterators(self, iterators: dict[IteratorIdentifier, IteratorNode]) -> None:
+        self._iterators = iterators
+        self.invalidate_indexes()
 
     def add_root(self, root: IteratorIdentifier) -> None:
         self.roots.append(root)
+        self.invalidate_indexes()
+
+    def add_iterator(self, iterator: IteratorNode) -> None:
+        self.iterators[iterator.id] = iterator
+        self.invalidate_indexes()
 
     def add_computation(self, comp: str) -> None:
         self.computations.append(comp)
+        self.invalidate_indexes()
+
+    def invalidate_indexes(self) -> None:
+        """
+        Drops the lookup indexes, the fingerprints and the memoized
+        analyses, they are rebuilt on the next lookup.
+        """
+        self._indexes_are_valid = False
+        self._node_fingerprints: dict[IteratorIdentifier, bytes] = {}
+        self._analyses: dict[str, Any] = {}
+
+    def invalidate_node(self, iterator_id: IteratorIdentifier) -> None:
+        """
+        Drops the fingerprints of an iterator whose bounds, name or
+        computations were edited in place, and of its ancestors, along with
+        the memoized analyses. Structural edits (moving iterators) need
+        `invalidate_indexes` instead.
+        """
+        self._analyses = {}
+        while iterator_id is not None and iterator_id in self._node_fingerprints:
+            del self._node_fingerprints[iterator_id]
+            iterator_id = self.iterators[iterator_id].parent_iterator
+
+    def _build_indexes(self) -> None:
+        # computation -> iterator directly containing it
+        self._computation_index: dict[str, IteratorIdentifier] = {}
+        # iterator name -> iterator id
+        self._name_index: dict[str, IteratorIdentifier] = {}
+        # level -> ids of the iterators at that level
+        self._level_index: dict[int, list[IteratorIdentifier]] = {}
+        # iterator id -> id of its root
+        self._root_index: dict[IteratorIdentifier, IteratorIdentifier] = {}
+
+        # setdefault keeps the first match in the iteration order of the
+        # iterators, which is what the linear scans used to return
+        for iterator_id, iterator in self._iterators.items():
+            iterator._owner = self
+            self._name_index.setdefault(iterator.name, iterator_id)
+            self._level_index.setdefault(iterator.level, []).append(iterator_id)
+            for comp in iterator.computations_list:
+                self._computation_index.setdefault(comp, iterator_id)
+
+        for root in self._roots:
+            nodes_to_visit = [root]
+            while nodes_to_visit:
+                node_id = nodes_to_visit.pop()
+                if node_id in self._root_index or node_id not in self._iterators:
+                    continue
+                self._root_index[node_id] = root
+                nodes_to_visit.extend(self._iterators[node_id].child_iterators)
+
+        self._build_subtree_intervals()
+        self._indexes_are_valid = True
+
+    def _build_subtree_intervals(self) -> None:
+        # Pre-order walk of the tree where the computations and the children of
+        # each node are visited by absolute order. The computations of the
+        # subtree of a node are then the contiguous slice
+        # _subtree_computations[start:end] of the walk.
+        self._subtree_computations: list[str] = []
+        self._subtree_intervals: dict[IteratorIdentifier, tuple[int, int]] = {}
+        # entry and exit times of the nodes in the walk, a node is an ancestor
+        # of another one iff its interval contains the other's interval
+        self._node_intervals: dict[IteratorIdentifier, tuple[int, int]] = {}
+        # binary lifting table: _ancestors[node][k] is the 2^k-th ancestor
+        self._ancestors: dict[IteratorIdentifier, list[IteratorIdentifier]] = {}
+        absolute_order = self.computations_absolute_order
+        time = 0
+
+        def order_key(item: tuple) -> float:
+            name = item[1] if item[0] == "comp" else item[1][0]
+            return absolute_order.get(name, float("inf"))
+
+        items_to_visit: list[tuple] = [
+            ("enter", root, None) for root in reversed(self._roots)
+        ]
+        while items_to_visit:
+            kind, item, parent = items_to_visit.pop()
+            if kind == "comp":
+                self._subtree_computations.append(item)
+            elif kind == "exit":
+                self._subtree_intervals[item] = (
+                    self._subtree_intervals[item][0],
+                    len(self._subtree_computations),
+                )
+                self._node_intervals[item] = (self._node_intervals[item][0], time)
+            elif item in self._iterators and item not in self._subtree_intervals:
+                node = self._iterators[item]
+                self._subtree_intervals[item] = (len(self._subtree_computations), -1)
+                self._node_intervals[item] = (time, -1)
+                time += 1
+
+                ancestors = []
+                while parent is not None:
+                    ancestors.append(parent)
+                    parent_ancestors = self._ancestors[parent]
+                    parent = (
+                        parent_ancestors[len(ancestors) - 1]
+                        if len(ancestors) <= len(parent_ancestors)
+                        else None
+                    )
+                self._ancestors[item] = ancestors
+
+                node_items = sorted(
+                    [("comp", comp, item) for comp in node.computations_list]
+                    + [("enter", child, item) for child in node.child_iterators],
+                    key=order_key,
+                )
+                items_to_visit.append(("exit", item, None))
+                items_to_visit.extend(reversed(node_items))
+
+        # The slices are already ordered when the walk follows the absolute
+        # order, which is the case for trees built from a program
+        orders = [absolute_order.get(comp) for comp in self._subtree_computations]
+        self._subtree_slices_are_ordered = None not in orders and all(
+            previous <= current for previous, current in zip(orders, orders[1:])
+        )
 
     @classmethod
     def from_annotations(cls, annotations: dict) -> "TiramisuTree":
@@ -70,19 +271,21 @@ class TiramisuTree:
             )
         ]
 
+        # The id of an iterator is given by the first computation (in absolute
+        # order) that is nested in it and the index of the iterator in that
+        # computation's iterators. Inverting the computations' iterators once
+        # gives all the ids without searching each computation per iterator.
         iterator_name_to_id = {}
-        for iterator in iterators:
-            for computation in tiramisu_space.computations:
-                # get index of the iterator in the computation iterators
-                comp_iterators: list[str] = annotations["computations"][computation][
-                    "iterators"
-                ]
-                try:
-                    iterator_index = comp_iterators.index(iterator)
-                except ValueError:
-                    continue
-                iterator_name_to_id[iterator] = (computation, iterator_index)
-                break
+        for computation in tiramisu_space.computations:
+            comp_iterators: list[str] = annotations["computations"][computation][
+                "iterators"
+            ]
+            for iterator_index, iterator in enumerate(comp_iterators):
+                iterator_name_to_id.setdefault(iterator, (computation, iterator_index))
+
+        computation_position = {
+            comp: position for position, comp in enumerate(tiramisu_space.computations)
+        }
 
         for iterator in iterators:
             iterator_id = iterator_name_to_id[iterator]
@@ -99,11 +302,14 @@ class TiramisuTree:
 
             # get the computations that are associated with this iterator
             # ordered by their absolute order
-            ordered_node_comps = [
-                comp
-                for comp in tiramisu_space.computations
-                if comp in iterators[iterator]["computations_list"]
-            ]
+            ordered_node_comps = sorted(
+                {
+                    comp
+                    for comp in iterators[iterator]["computations_list"]
+                    if comp in computation_position
+                },
+                key=computation_position.__getitem__,
+            )
 
             try:
                 # integer bounds
@@ -143,6 +349,7 @@ class TiramisuTree:
         tiramisu_space.roots = [
             root for root, _ in sorted(root_with_order, key=lambda item: item[1])
         ]
+        tiramisu_space._build_indexes()
         return tiramisu_space
 
     @classmethod
@@ -152,15 +359,27 @@ class TiramisuTree:
         tiramisu_tree.computations = []
         tiramisu_tree.iterators = {}
         tiramisu_tree.roots = []
+        tiramisu_tree.upper_bounds_are_inclusive = True
+
+        # Split every line once and resolve the first computation that follows
+        # each line in a single reverse pass, the id of an iterator being the
+        # first computation nested in it
+        split_lines = [str_line.split("|") for str_line in isl_ast_string_list]
+        next_computation: list[str] = [""] * len(split_lines)
+        first_comp = ""
+        for line_idx in range(len(split_lines) - 1, -1, -1):
+            next_computation[line_idx] = first_comp
+            line = split_lines[line_idx]
+            if len(line) == 3 and line[1] == "computation":
+                first_comp = line[2]
 
         name_to_iterator_identifier: dict[str, IteratorIdentifier] = {}
 
         level_iterator_map: dict[int, list[str]] = {}
         current_absolute_order = 1
-        upper_bound_regex = r".*<=\s*(.*)"
         iterator_duplicates: dict[str, int] = {}
-        for line_idx, str_line in enumerate(isl_ast_string_list):
-            if "|iterator|" in str_line:
+        for line_idx, line in enumerate(split_lines):
+            if len(line) == 6 and line[1] == "iterator":
                 (
                     iterator_level_str,
                     _,
@@ -168,8 +387,13 @@ class TiramisuTree:
                     lower_bound_str,
                     loop_condition,
                     increment,
-                ) = str_line.split("|")
+                ) = line
                 iterator_level = int(iterator_level_str)
+                try:
+                    step = int(increment)
+                except ValueError:
+                    step = 1
+                lower_bound = lower_bound_str
                 try:
                     lower_bound = int(lower_bound_str)
                 except ValueError:
@@ -177,11 +401,10 @@ class TiramisuTree:
                     pass
 
                 # Get the upper bound from the loop condition
-                matched_upper_bound = re.match(upper_bound_regex, loop_condition)
-                if matched_upper_bound:
-                    upper_bound = matched_upper_bound.group(1)
-                else:
-                    upper_bound = loop_condition
+                # (what follows the last "<=")
+                _, separator, upper_bound = loop_condition.rpartition("<=")
+                if separator:
+                    upper_bound = upper_bound.lstrip()
                 try:
                     upper_bound = int(upper_bound)
                 except ValueError:
@@ -197,12 +420,7 @@ class TiramisuTree:
                 else:
                     iterator_duplicates[iterator_name] = 0
 
-                first_comp: str = ""
-                for j in range(line_idx + 1, len(isl_ast_string_list)):
-                    if "|computation|" in isl_ast_string_list[j]:
-                        first_comp = isl_ast_string_list[j].split("|")[2]
-                        break
-                iterator_id = (first_comp, iterator_level)
+                iterator_id = (next_computation[line_idx], iterator_level)
                 name_to_iterator_identifier[iterator_name] = iterator_id
 
                 tiramisu_tree.iterators[iterator_id] = IteratorNode(
@@ -218,6 +436,7 @@ class TiramisuTree:
                         else level_iterator_map[iterator_level - 1][-1]
                     ),
                     level=iterator_level,
+                    step=step,
                 )
                 if iterator_level not in level_iterator_map:
                     level_iterator_map[iterator_level] = []
@@ -232,8 +451,8 @@ class TiramisuTree:
                         level_iterator_map[iterator_level - 1][-1]
                     ].child_iterators.append(iterator_id)
 
-            elif "|computation|" in str_line:
-                level_str, _, comp_name = str_line.split("|")
+            elif len(line) == 3 and line[1] == "computation":
+                level_str, _, comp_name = line
                 line_idx = int(level_str)
                 tiramisu_tree.computations.append(comp_name)
 
@@ -252,6 +471,7 @@ class TiramisuTree:
                     current_absolute_order
                 )
                 current_absolute_order += 1
+        tiramisu_tree._build_indexes()
         return tiramisu_tree
 
     def _get_subtree_representation(self, node_id: IteratorIdentifier) -> str:
@@ -292,12 +512,33 @@ class TiramisuTree:
                 representation += self._get_subtree_representation(comp_or_iterator)
         return representation
 
+    def get_analysis(self, name: str, compute: Callable[["TiramisuTree"], Any]) -> Any:
+        """
+        Returns the result of an analysis of the tree, computed on first use
+        and memoized until the tree is modified.
+
+        Parameters:
+        ----------
+        `name`: `str`
+            The name under which the result is memoized.
+        `compute`: `Callable[[TiramisuTree], Any]`
+            The function computing the analysis from the tree.
+
+        Returns:
+        -------
+        The result of `compute`, shared between callers, which must not
+        modify it.
+        """
+        if name not in self._analyses:
+            self._analyses[name] = compute(self)
+        return self._analyses[name]
+
     def get_candidate_sections(
         self,
     ) -> dict[IteratorIdentifier, list[list[IteratorIdentifier]]]:
         """
         Returns a dictionary with lists of candidate sections for each
-        root iterator.
+        root iterator. The sections are computed once per tree state.
 
         Returns:
         -------
@@ -305,7 +546,13 @@ class TiramisuTree:
         `candidate_sections`: `dict[IteratorIdentifier, list[list[IteratorIdentifier]]]`
             Dictionary with lists of candidate sections for each root iterator.
         """
+        return self.get_analysis(
+            "candidate_sections", TiramisuTree._compute_candidate_sections
+        )
 
+    def _compute_candidate_sections(
+        self,
+    ) -> dict[IteratorIdentifier, list[list[IteratorIdentifier]]]:
         candidate_sections = {}
         for root in self.roots:
             nodes_to_visit = [root]
@@ -333,32 +580,81 @@ class TiramisuTree:
             return candidate_section, current_node.child_iterators
         return candidate_section, []
 
+    def get_sibling_groups(self) -> list[list[IteratorIdentifier]]:
+        """
+        Returns the groups of sibling iterators (the roots, then the children
+        of each iterator) that have more than one member, each group ordered
+        by execution order. The groups are computed once per tree state.
+
+        Returns:
+        -------
+
+        `sibling_groups`: `list[list[IteratorIdentifier]]`
+            The groups of sibling iterators in execution order.
+        """
+        return self.get_analysis("sibling_groups", TiramisuTree._compute_sibling_groups)
+
+    def _compute_sibling_groups(self) -> list[list[IteratorIdentifier]]:
+        if not self._indexes_are_valid:
+            self._build_indexes()
+
+        # the pre-order walk visits the children of a node by execution order
+        def entry_time(iterator_id: IteratorIdentifier) -> float:
+            if iterator_id in self._node_intervals:
+                return self._node_intervals[iterator_id][0]
+            return float("inf")
+
+        sibling_groups = []
+        for siblings in [self._roots] + [
+            iterator.child_iterators for iterator in self._iterators.values()
+        ]:
+            if len(siblings) > 1:
+                sibling_groups.append(sorted(siblings, key=entry_time))
+        return sibling_groups
+
     def get_iterator_subtree_computations(
         self, candidate_node_id: IteratorIdentifier
     ) -> list[str]:
-        """Get the list of computations impacted by this node
+        """Get the list of computations impacted by this node, ordered by
+        their absolute order
 
         Parameters:
         ----------
-        `candidate_node`: `IteratorNode`
-            The candidate node for parallelization.
-
-        `program_tree`: `TiramisuTree`
-            The Tiramisu tree of the program.
+        `candidate_node_id`: `IteratorIdentifier`
+            The id of the node.
 
         Returns:
         -------
         `list`
             list of computations impacted by the node
         """
+        if not self._indexes_are_valid:
+            self._build_indexes()
+
+        if candidate_node_id in self._subtree_intervals:
+            start, end = self._subtree_intervals[candidate_node_id]
+            computations = self._subtree_computations[start:end]
+            if self._subtree_slices_are_ordered:
+                return computations
+        else:
+            # the node is not reachable from the roots
+            computations = self._collect_subtree_computations(candidate_node_id)
+
+        computations.sort(
+            key=lambda comp: self.computations_absolute_order.get(comp, float("inf"))
+        )
+        return computations
 
+    def _collect_subtree_computations(
+        self, candidate_node_id: IteratorIdentifier
+    ) -> list[str]:
         computations: list[str] = []
         candidate_node = self.iterators[candidate_node_id]
 
         computations += candidate_node.computations_list
 
         for child in candidate_node.child_iterators:
-            computations += self.get_iterator_subtree_computations(child)
+            computations += self._collect_subtree_computations(child)
 
         return computations
 
@@ -372,6 +668,12 @@ class TiramisuTree:
 
     def get_root_of_node(self, iterator_id: IteratorIdentifier) -> IteratorIdentifier:
         # Get the root node of the iterator
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        if iterator_id in self._root_index:
+            return self._root_index[iterator_id]
+
+        # the iterator is not reachable from the roots
         current_node_id = iterator_id
 
         while self.iterators[current_node_id].parent_iterator:
@@ -388,15 +690,13 @@ class TiramisuTree:
         """
         This function returns the iterator of the computation
         """
-        computation_iterator = None
-        for iterator in self.iterators:
-            if computation_name in self.iterators[iterator].computations_list:
-                computation_iterator = self.iterators[iterator]
-                break
-
-        if computation_iterator is None:
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        if computation_name not in self._computation_index:
             raise ValueError("The computation is not in the tree")
 
+        computation_iterator = self.iterators[self._computation_index[computation_name]]
+
         if level is not None:
             while computation_iterator.level != level:
                 computation_iterator = self.iterators[
@@ -405,17 +705,104 @@ class TiramisuTree:
 
         return computation_iterator
 
+    def is_ancestor(
+        self, ancestor_id: IteratorIdentifier, iterator_id: IteratorIdentifier
+    ) -> bool:
+        """
+        Returns whether `ancestor_id` is `iterator_id` or one of its ancestors
+        """
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        if (
+            ancestor_id not in self._node_intervals
+            or iterator_id not in self._node_intervals
+        ):
+            # the iterators are not reachable from the roots
+            while iterator_id is not None and iterator_id != ancestor_id:
+                iterator_id = self.iterators[iterator_id].parent_iterator
+            return iterator_id is not None
+
+        ancestor_entry, ancestor_exit = self._node_intervals[ancestor_id]
+        entry, exit = self._node_intervals[iterator_id]
+        return ancestor_entry <= entry and exit <= ancestor_exit
+
+    def get_lowest_common_ancestor(
+        self, first_id: IteratorIdentifier, second_id: IteratorIdentifier
+    ) -> IteratorIdentifier | None:
+        """
+        Returns the id of the innermost iterator that contains both
+        iterators, or None if they are in different roots
+        """
+        if self.is_ancestor(first_id, second_id):
+            return first_id
+        if self.is_ancestor(second_id, first_id):
+            return second_id
+
+        if first_id not in self._ancestors or second_id not in self._ancestors:
+            # the iterators are not reachable from the roots
+            while first_id is not None and not self.is_ancestor(first_id, second_id):
+                first_id = self.iterators[first_id].parent_iterator
+            return first_id
+
+        # climb from the first iterator to the highest ancestor that does not
+        # contain the second one, its parent is the lowest common ancestor
+        for power in range(len(self._ancestors[first_id]) - 1, -1, -1):
+            ancestors = self._ancestors[first_id]
+            if power < len(ancestors) and not self.is_ancestor(
+                ancestors[power], second_id
+            ):
+                first_id = ancestors[power]
+
+        ancestors = self._ancestors[first_id]
+        return ancestors[0] if ancestors else None
+
+    def get_shared_iterator_of_computations(
+        self, first_comp: str, second_comp: str
+    ) -> IteratorNode | None:
+        """
+        Returns the innermost iterator shared by two computations, or None if
+        they are in different roots
+        """
+        shared_iterator_id = self.get_lowest_common_ancestor(
+            self.get_iterator_of_computation(first_comp).id,
+            self.get_iterator_of_computation(second_comp).id,
+        )
+        if shared_iterator_id is None:
+            return None
+        return self.iterators[shared_iterator_id]
+
     def get_iterator_id_from_name(self, iterator_name: str) -> IteratorIdentifier:
         """
         This function returns the id of the iterator
         """
-        for iterator in self.iterators:
-            if self.iterators[iterator].name == iterator_name:
-                return iterator
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        return self._name_index.get(iterator_name)
+
+    def get_iterators_at_level(self, level: int) -> list[IteratorIdentifier]:
+        """
+        This function returns the ids of the iterators at the given level
+        """
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        return list(self._level_index.get(level, []))
+
+    def get_levels(self) -> list[int]:
+        """
+        This function returns the sorted list of the levels of the iterators
+        """
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        return sorted(self._level_index)
 
     def set_iterator_ids(self) -> None:
+        """
+        Sets the id of every iterator node from its name. The ids are edited
+        directly on the nodes, so the indexes are invalidated afterwards.
+        """
         for iterator in self.iterators.values():
             iterator.id = self.get_iterator_id_from_name(iterator.name)
+        self.invalidate_indexes()
 
     def __repr__(self) -> str:
         representation = ""
@@ -425,6 +812,147 @@ class TiramisuTree:
 
         return representation
 
+    def diff(self, other: "TiramisuTree") -> TreeDiff:
+        """
+        Computes the differences between this tree and a new version of it.
+        Iterators are matched by their identifier and subtrees with the same
+        fingerprint in both trees are skipped.
+
+        Parameters:
+        ----------
+        `other`: `TiramisuTree`
+            The new tree.
+
+        Returns:
+        -------
+        `tree_diff`: `TreeDiff`
+        """
+        tree_diff = TreeDiff()
+
+        tree_diff.added_iterators = other.iterators.keys() - self.iterators.keys()
+        tree_diff.removed_iterators = self.iterators.keys() - other.iterators.keys()
+
+        # compare the iterators of both trees top-down, the iterators below
+        # an iterator with the same fingerprint in both trees are identical.
+        # The walk starts from every common iterator whose parent is not a
+        # common one or differs, as the fingerprint of an iterator does not
+        # cover its parent and the ancestors of a moved iterator can be new.
+        self.get_fingerprint()
+        other.get_fingerprint()
+        common_iterators = self.iterators.keys() & other.iterators.keys()
+        nodes_to_visit = [
+            node_id
+            for node_id in common_iterators
+            if self.iterators[node_id].parent_iterator not in common_iterators
+            or other.iterators[node_id].parent_iterator
+            != self.iterators[node_id].parent_iterator
+        ]
+        visited = set()
+        while nodes_to_visit:
+            node_id = nodes_to_visit.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            node = self.iterators[node_id]
+            other_node = other.iterators[node_id]
+            if node.parent_iterator != other_node.parent_iterator:
+                tree_diff.modified_iterators.add(node_id)
+            if self._node_fingerprints.get(node_id) == other._node_fingerprints.get(
+                node_id
+            ):
+                continue
+
+            if (
+                node.name != other_node.name
+                or node.lower_bound != other_node.lower_bound
+                or node.upper_bound != other_node.upper_bound
+                or node.level != other_node.level
+                or node.step != other_node.step
+                or node.child_iterators != other_node.child_iterators
+                or node.computations_list != other_node.computations_list
+            ):
+                tree_diff.modified_iterators.add(node_id)
+            nodes_to_visit.extend(
+                child for child in other_node.child_iterators if child in self.iterators
+            )
+
+        if not self._indexes_are_valid:
+            self._build_indexes()
+        if not other._indexes_are_valid:
+            other._build_indexes()
+        for comp in self._computation_index.keys() | other._computation_index.keys():
+            iterator_id = self._computation_index.get(comp)
+            other_iterator_id = other._computation_index.get(comp)
+            if iterator_id != other_iterator_id:
+                tree_diff.moved_computations[comp] = (iterator_id, other_iterator_id)
+
+        for comp in (
+            self.computations_absolute_order.keys()
+            | other.computations_absolute_order.keys()
+        ):
+            if self.computations_absolute_order.get(
+                comp
+            ) != other.computations_absolute_order.get(comp):
+                tree_diff.reordered_computations.add(comp)
+
+        return tree_diff
+
+    def get_fingerprint(self) -> str:
+        """
+        Returns a stable structural hash of the tree.
+
+        The hash of each iterator covers its id, name, bounds, level,
+        computations and the hashes of its children, in order, and the hash
+        of the tree combines the hashes of the roots with the order of the
+        computations. Two trees with the same fingerprint have the same loop
+        nest, so it can be used as a cache key across schedules. Iterator
+        hashes are kept between calls and only the edited iterators and their
+        ancestors are hashed again (see `invalidate_node`).
+        """
+        for root in self.roots:
+            self._compute_node_fingerprint(root)
+
+        tree_hash = hashlib.blake2b(digest_size=16)
+        for root in self.roots:
+            tree_hash.update(self._node_fingerprints[root])
+        tree_hash.update(
+            repr(
+                (self.computations, sorted(self.computations_absolute_order.items()))
+            ).encode()
+        )
+        return tree_hash.hexdigest()
+
+    def _compute_node_fingerprint(self, root: IteratorIdentifier) -> None:
+        # iterative post-order, children are hashed before their parent
+        nodes_to_visit = [(root, False)]
+        while nodes_to_visit:
+            node_id, children_done = nodes_to_visit.pop()
+            if node_id in self._node_fingerprints:
+                continue
+            node = self.iterators[node_id]
+            if not children_done:
+                nodes_to_visit.append((node_id, True))
+                nodes_to_visit.extend((child, False) for child in node.child_iterators)
+                continue
+
+            node_hash = hashlib.blake2b(digest_size=16)
+            node_hash.update(
+                repr(
+                    (
+                        node_id,
+                        node.name,
+                        node.lower_bound,
+                        node.upper_bound,
+                        node.level,
+                        node.step,
+                        node.computations_list,
+                    )
+                ).encode()
+            )
+            for child in node.child_iterators:
+                node_hash.update(self._node_fingerprints[child])
+            self._node_fingerprints[node_id] = node_hash.digest()
+
     @property
     def depth(self) -> int:
         return max([iterator.level for iterator in self.iterators.values()]) + 1